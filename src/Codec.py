@@ -0,0 +1,19 @@
+class Codec:
+    """
+    Base class for a codec which encodes a list of non-negative integers to bytes and decodes it back
+    """
+
+    def encode(self, num_list):
+        """
+        Encodes a list of integers and returns the bytearray and its size in bytes
+        list num_list: List of non-negative integers
+        """
+        raise NotImplementedError
+
+    def decode(self, list_buffer, count):
+        """
+        Decodes a buffer and returns the NumPy array of integers
+        buffer list_buffer: Buffer holding exactly the integers written by encode
+        int count: Number of integers in the buffer
+        """
+        raise NotImplementedError
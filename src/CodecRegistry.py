@@ -0,0 +1,37 @@
+# Import src files
+from VByteCodec import VByteCodec
+from PForDeltaCodec import PForDeltaCodec
+from Simple8bCodec import Simple8bCodec
+from EliasGammaCodec import EliasGammaCodec
+
+
+class CodecRegistry:
+    """
+    Class which maps the names of integer codecs used in the configuration to the codecs
+    """
+
+    codecs = {
+        'vbyte': VByteCodec,
+        'pfordelta': PForDeltaCodec,
+        'simple8b': Simple8bCodec,
+        'elias_gamma': EliasGammaCodec
+    }
+
+    @classmethod
+    def register(cls, name, codec_class):
+        """
+        Adds a codec to the registry
+        str name: Name of the codec in the configuration
+        class codec_class: Subclass of Codec
+        """
+        cls.codecs[name] = codec_class
+
+    @classmethod
+    def get_codec(cls, name):
+        """
+        Returns an instance of the codec with the given name
+        str name: Name of the codec in the configuration
+        """
+        if name not in cls.codecs:
+            raise ValueError('Unknown codec {}, available codecs are {}'.format(name, ', '.join(sorted(cls.codecs))))
+        return cls.codecs[name]()
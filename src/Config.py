@@ -6,52 +6,117 @@ class Config:
     """
     Class to create a configuration for the inverted index
     """
+
+    # Params which decide how the index is stored on disk, they can't change once the index is built
+    index_format_params = ('doc_gaps_codec', 'dtfs_codec', 'positions_codec')
+
     def __init__(
         self,
         data_file_name,
         compressed=1,
         in_memory=False,
+        lazy_lists=0,
+        pin_lists=1,
+        mmap_lists=1,
+        list_cache_size=0,
+        result_cache_size=0,
+        result_cache_ttl=300,
+        memory_budget=0,
+        workers=1,
+        merge_factor=10,
+        impact_ordered=0,
+        impact_bits=8,
+        index_generation=None,
+        doc_gaps_codec='vbyte',
+        dtfs_codec='vbyte',
+        positions_codec='vbyte',
         retrieval_model='raw_counts',
         data_dir='data',
         index_dir='index',
         compressed_dir='compressed',
         uncompressed_dir='uncompressed',
+        runs_dir='runs',
+        segments_dir='segments',
+        impact_dir='impact_ordered',
         config_file_name='config',
         inverted_lists_file_name='inverted_lists',
         lookup_table_file_name='lookup_table',
         docs_meta_file_name='docs_meta',
         collection_stats_file_name='collection_stats',
-        document_vectors_file_name='document_vectors'
+        document_vectors_file_name='document_vectors',
+        segment_meta_file_name='segment_meta',
+        impact_meta_file_name='impact_meta'
     ):
         """
         str data_file_name: Name of the data file to build the index from
         int compressed: Flag to check if compressed index is to be used
         int in_memory: Flag to check if index is to be loaded in memory
+        int lazy_lists: Flag to read the inverted lists of an in-memory index on first access instead of when it is loaded
+        int pin_lists: Flag to keep a lazily read inverted list in memory after its first access
+        int mmap_lists: Flag to check if the on-disk inverted lists file is to be memory-mapped
+        int list_cache_size: Memory (in MB) for an LRU cache of inverted lists read from disk, 0 disables the cache
+        int result_cache_size: Number of query results held in the result cache, 0 disables the cache
+        float result_cache_ttl: Number of seconds a cached query result stays valid
+        int memory_budget: Memory (in MB) for postings after which a block is flushed to a run file, 0 builds in memory
+        int workers: Number of processes used to build the index
+        int merge_factor: Number of adjacent segments of the same size level which are merged into one segment
+        int impact_ordered: Flag to also build an impact-ordered index of quantized BM25 scores for score-at-a-time querying
+        int impact_bits: Number of bits of a quantized impact in the impact-ordered index
+        str index_generation: ID of the index on disk, replaced whenever the index is built or documents are added
+        str doc_gaps_codec: Name of the codec for the doc_id gaps of the compressed index, see CodecRegistry
+        str dtfs_codec: Name of the codec for the dtfs of the compressed index
+        str positions_codec: Name of the codec for the position gaps of the compressed index
         str retrieval_model: Scoring model to be used for querying
         str data_dir: Directory where data is stored
         str index_dir: Directory where index is stored
         str compressed_dir: Directory where compressed index is stored
         str uncompressed_dir: Directory where uncompressed is stored
+        str runs_dir: Directory under index_dir where run files of a block-based build are stored
+        str segments_dir: Directory under compressed_dir / uncompressed_dir where segments of added documents are stored
+        str impact_dir: Directory under index_dir where the impact-ordered index is stored
         str config_file_name: Name of the config file on disk
         str inverted_lists_file_name: Name of the inverted lists file on disk
         str lookup_table_file_name: Name of the lookup table file on disk
         str docs_meta_file_name: Name of the docs meta file on disk
         str collection_stats_file_name: Name of the collection stats file on disk
+        str document_vectors_file_name: Name of the document vectors file on disk
+        str segment_meta_file_name: Name of the file holding the doc-id range of a segment on disk
+        str impact_meta_file_name: Name of the file holding the quantization of the impact-ordered index on disk
         """
         self.data_file_name = data_file_name
         self.compressed = int(compressed)
         self.in_memory = int(in_memory)
+        self.lazy_lists = int(lazy_lists)
+        self.pin_lists = int(pin_lists)
+        self.mmap_lists = int(mmap_lists)
+        self.list_cache_size = int(list_cache_size)
+        self.result_cache_size = int(result_cache_size)
+        self.result_cache_ttl = float(result_cache_ttl)
+        self.memory_budget = int(memory_budget)
+        self.workers = int(workers)
+        self.merge_factor = int(merge_factor)
+        self.impact_ordered = int(impact_ordered)
+        self.impact_bits = int(impact_bits)
+        self.index_generation = index_generation
+        self.doc_gaps_codec = doc_gaps_codec
+        self.dtfs_codec = dtfs_codec
+        self.positions_codec = positions_codec
         self.retrieval_model = retrieval_model
         self.data_dir = data_dir
         self.index_dir = index_dir
         self.compressed_dir = compressed_dir
         self.uncompressed_dir = uncompressed_dir
+        self.runs_dir = runs_dir
+        self.segments_dir = segments_dir
+        self.impact_dir = impact_dir
         self.config_file_name = config_file_name
         self.inverted_lists_file_name = inverted_lists_file_name
         self.lookup_table_file_name = lookup_table_file_name
         self.docs_meta_file_name = docs_meta_file_name
         self.collection_stats_file_name = collection_stats_file_name
         self.document_vectors_file_name = document_vectors_file_name
+        self.segment_meta_file_name = segment_meta_file_name
+        self.impact_meta_file_name = impact_meta_file_name
 
     def get_params(self):
         """
@@ -61,15 +126,35 @@ class Config:
             'data_file_name': self.data_file_name,
             'compressed': self.compressed,
             'in_memory': self.in_memory,
+            'lazy_lists': self.lazy_lists,
+            'pin_lists': self.pin_lists,
+            'mmap_lists': self.mmap_lists,
+            'list_cache_size': self.list_cache_size,
+            'result_cache_size': self.result_cache_size,
+            'result_cache_ttl': self.result_cache_ttl,
+            'memory_budget': self.memory_budget,
+            'workers': self.workers,
+            'merge_factor': self.merge_factor,
+            'impact_ordered': self.impact_ordered,
+            'impact_bits': self.impact_bits,
+            'index_generation': self.index_generation,
+            'doc_gaps_codec': self.doc_gaps_codec,
+            'dtfs_codec': self.dtfs_codec,
+            'positions_codec': self.positions_codec,
             'retrieval_model': self.retrieval_model,
             'data_dir': self.data_dir,
             'index_dir': self.index_dir,
             'compressed_dir': self.compressed_dir,
             'uncompressed_dir': self.uncompressed_dir,
+            'runs_dir': self.runs_dir,
+            'segments_dir': self.segments_dir,
+            'impact_dir': self.impact_dir,
             'config_file_name': self.config_file_name,
             'inverted_lists_file_name': self.inverted_lists_file_name,
             'lookup_table_file_name': self.lookup_table_file_name,
             'docs_meta_file_name': self.docs_meta_file_name,
             'collection_stats_file_name': self.collection_stats_file_name,
-            'document_vectors_file_name': self.document_vectors_file_name
+            'document_vectors_file_name': self.document_vectors_file_name,
+            'segment_meta_file_name': self.segment_meta_file_name,
+            'impact_meta_file_name': self.impact_meta_file_name
         }
@@ -0,0 +1,171 @@
+# Import built-in libraries
+import sys
+import struct
+from array import array
+
+
+class DocsMeta:
+    """
+    Class which exposes APIs for the meta info of documents stored as typed columns indexed by doc_id
+    playId and sceneId are stored once in an interned string table and referenced by their ID
+    """
+
+    # Magic bytes, number of documents and number of strings in the string table
+    format_header = '<4s4xqq'
+    magic = b'DOCM'
+    # The columns are stored little-endian, so they are byte-swapped on big-endian hosts
+    swap_bytes = sys.byteorder == 'big'
+
+    def __init__(self):
+        self._scene_lengths = array('i')
+        self._scene_nums = array('i')
+        self._play_ids = array('i')
+        self._scene_ids = array('i')
+        self._document_vector_positions = array('q')
+        self._document_vector_sizes = array('i')
+        self._strings = []
+        self._string_ids = {}
+
+    def get_string_id(self, string):
+        """
+        Returns the ID of a string in the string table, adding it if it is not present
+        str string: String to intern
+        """
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(sys.intern(string))
+            self._string_ids[string] = string_id
+        return string_id
+
+    def update_doc_meta(self, doc_id, doc_meta):
+        """
+        Adds or replaces the meta info of a document, doc_ids are expected to be added in order
+        int doc_id: ID of the document
+        dict doc_meta: Dictionary of playId, sceneId, sceneNum, sceneLength and optionally document vector info
+        """
+        row = (
+            doc_meta['sceneLength'],
+            doc_meta['sceneNum'],
+            self.get_string_id(doc_meta['playId']),
+            self.get_string_id(doc_meta['sceneId']),
+            doc_meta.get('document_vector_position', -1),
+            doc_meta.get('document_vector_size', -1)
+        )
+        columns = self.get_columns()
+        if doc_id == len(self):
+            for column, value in zip(columns, row):
+                column.append(value)
+        else:
+            for column, value in zip(columns, row):
+                column[doc_id] = value
+
+    def get_columns(self):
+        """
+        Returns the numeric columns in the order they are stored on disk
+        """
+        return (
+            self._scene_lengths,
+            self._scene_nums,
+            self._play_ids,
+            self._scene_ids,
+            self._document_vector_positions,
+            self._document_vector_sizes
+        )
+
+    def get_doc_meta(self, doc_id):
+        """
+        Returns the meta info of a document as a dictionary
+        int doc_id: ID of the document to lookup
+        """
+        doc_meta = {
+            'playId': self._strings[self._play_ids[doc_id]],
+            'sceneId': self._strings[self._scene_ids[doc_id]],
+            'sceneNum': self._scene_nums[doc_id],
+            'sceneLength': self._scene_lengths[doc_id]
+        }
+        if self._document_vector_positions[doc_id] != -1:
+            doc_meta['document_vector_position'] = self._document_vector_positions[doc_id]
+            doc_meta['document_vector_size'] = self._document_vector_sizes[doc_id]
+        return doc_meta
+
+    def get_doc_length(self, doc_id):
+        """
+        Returns the length of a document
+        int doc_id: ID of the document to lookup
+        """
+        return self._scene_lengths[doc_id]
+
+    def get_doc_lengths(self):
+        """
+        Returns the array of document lengths indexed by doc_id
+        """
+        return self._scene_lengths
+
+    def items(self):
+        """
+        Returns an iterator over (doc_id, doc_meta) pairs
+        """
+        for doc_id in range(len(self)):
+            yield (doc_id, self.get_doc_meta(doc_id))
+
+    def __len__(self):
+        return len(self._scene_lengths)
+
+    def column_to_bytes(self, column):
+        """
+        Returns the little-endian bytes of a column
+        array column: Column to convert
+        """
+        if self.swap_bytes:
+            column = array(column.typecode, column)
+            column.byteswap()
+        return column.tobytes()
+
+    def column_from_bytes(self, column, column_binary):
+        """
+        Replaces the values of a column with the ones in little-endian bytes
+        array column: Column to fill
+        bytes column_binary: Bytes written by column_to_bytes
+        """
+        del column[:]
+        column.frombytes(column_binary)
+        if self.swap_bytes:
+            column.byteswap()
+
+    def dump(self, file_buffer):
+        """
+        Writes the columns and the string table to a buffer
+        buffer file_buffer: Buffer for the docs meta file opened in binary mode
+        """
+        file_buffer.write(struct.pack(self.format_header, self.magic, len(self), len(self._strings)))
+        for column in self.get_columns():
+            file_buffer.write(self.column_to_bytes(column))
+        encoded_strings = [string.encode('utf-8') for string in self._strings]
+        string_lengths = array('i', [len(encoded_string) for encoded_string in encoded_strings])
+        file_buffer.write(self.column_to_bytes(string_lengths))
+        file_buffer.write(b''.join(encoded_strings))
+
+    def load(self, file_buffer):
+        """
+        Reads the columns and the string table from a buffer
+        buffer file_buffer: Buffer for the docs meta file opened in binary mode
+        """
+        header = file_buffer.read(struct.calcsize(self.format_header))
+        magic, num_docs, num_strings = struct.unpack(self.format_header, header)
+        if magic != self.magic:
+            raise ValueError('Not a binary docs meta file')
+        for column in self.get_columns():
+            self.column_from_bytes(column, file_buffer.read(num_docs * column.itemsize))
+
+        string_lengths = array('i')
+        self.column_from_bytes(string_lengths, file_buffer.read(num_strings * string_lengths.itemsize))
+        strings_binary = file_buffer.read(sum(string_lengths))
+        self._strings = []
+        self._string_ids = {}
+        position = 0
+        for string_length in string_lengths:
+            string = strings_binary[position: position + string_length].decode('utf-8')
+            self._string_ids[string] = len(self._strings)
+            self._strings.append(sys.intern(string))
+            position += string_length
@@ -0,0 +1,44 @@
+# Import third-party libraries
+import numpy as np
+
+# Import src files
+from Codec import Codec
+
+
+class EliasGammaCodec(Codec):
+    """
+    Codec for Elias-gamma encoding, a bit-level code for small integers
+    An integer n >= 1 is written as floor(log2(n)) zero bits followed by n in binary, so every integer
+    is incremented by one before it is encoded to support 0. The bits are padded with zeros to a byte
+    """
+
+    def encode(self, num_list):
+        """
+        Encodes a list of integers and returns the bytearray and its size in bytes
+        list num_list: List of non-negative integers
+        """
+        codes = []
+        for num in num_list:
+            binary = bin(num + 1)[2:]
+            codes.append('0' * (len(binary) - 1) + binary)
+        bit_string = ''.join(codes)
+        size_in_bytes = (len(bit_string) + 7) // 8
+        bit_string += '0' * (8 * size_in_bytes - len(bit_string))
+        list_buffer = bytearray(int(bit_string, 2).to_bytes(size_in_bytes, 'big')) if size_in_bytes else bytearray()
+        return (list_buffer, size_in_bytes)
+
+    def decode(self, list_buffer, count):
+        """
+        Decodes a buffer and returns the NumPy array of integers
+        buffer list_buffer: Buffer holding exactly the integers written by encode
+        int count: Number of integers in the buffer
+        """
+        bit_string = bin(int.from_bytes(list_buffer, 'big'))[2:].zfill(8 * len(list_buffer))
+        num_list = []
+        pointer = 0
+        for _ in range(count):
+            # The number of zeros before the first one bit is the number of bits after it
+            length = bit_string.index('1', pointer) - pointer
+            num_list.append(int(bit_string[pointer + length: pointer + 2 * length + 1], 2) - 1)
+            pointer += 2 * length + 1
+        return np.array(num_list, dtype=np.int64)
@@ -0,0 +1,116 @@
+# Import third-party libraries
+import numpy as np
+
+# Import src files
+import utils
+
+
+class ImpactOrderedList:
+    """
+    Class for the inverted list of a term in an impact-ordered index
+    The postings are grouped into segments of documents sharing the same quantized impact (score of the term
+    in the document), sorted by descending impact. The doc_ids of a segment are in ascending order
+    Impacts are signed, terms occurring in most documents have a negative BM25 IDF and negative impacts
+    A list read from disk keeps the encoded doc_id gaps of each segment and decodes a segment on first access
+    """
+
+    # Version of the format of the lists on disk, an impact-ordered index of another version is rebuilt
+    format_version = 2
+
+    def __init__(self):
+        self._impacts = []
+        self._counts = []
+        self._segment_binaries = []
+        self._doc_ids = []
+
+    def add_segment(self, impact, doc_ids):
+        """
+        Appends a segment of postings, segments are to be added in descending order of impact
+        int impact: Quantized impact of every posting in the segment
+        array doc_ids: NumPy array of the doc_ids of the postings in ascending order
+        """
+        self._impacts.append(impact)
+        self._counts.append(len(doc_ids))
+        self._segment_binaries.append(None)
+        self._doc_ids.append(doc_ids)
+
+    def get_number_of_segments(self):
+        """
+        Returns the number of impact segments in the list
+        """
+        return len(self._impacts)
+
+    def get_impact(self, segment_index):
+        """
+        Returns the quantized impact of the postings of a segment
+        int segment_index: Index of the segment in descending order of impact
+        """
+        return self._impacts[segment_index]
+
+    def get_number_of_postings(self, segment_index):
+        """
+        Returns the number of postings in a segment without decoding it
+        int segment_index: Index of the segment in descending order of impact
+        """
+        return self._counts[segment_index]
+
+    def get_df(self):
+        """
+        Returns the number of postings in the list - Document Frequency of the postings with a non-zero impact
+        """
+        return sum(self._counts)
+
+    def get_max_impact(self):
+        """
+        Returns the impact of the first segment, 0 if the list is empty
+        """
+        return self._impacts[0] if self._impacts else 0
+
+    def get_doc_ids(self, segment_index):
+        """
+        Returns the NumPy array of the doc_ids of a segment, decoding it on first access
+        int segment_index: Index of the segment in descending order of impact
+        """
+        doc_ids = self._doc_ids[segment_index]
+        if doc_ids is None:
+            doc_ids = utils.delta_decode(utils.vbyte_decode(self._segment_binaries[segment_index]))
+            self._doc_ids[segment_index] = doc_ids
+            self._segment_binaries[segment_index] = None
+        return doc_ids
+
+    def postings_to_bytearray(self):
+        """
+        Converts the list to a bytearray and returns the bytearray and its size in bytes
+        The list holds a header of the number of segments followed by the impact, number of postings and size
+        in bytes of every segment, then the vbyte encoded doc_id gaps of every segment, all vbyte encoded
+        Impacts are zigzag encoded first (0, -1, 1, -2, ... become 0, 1, 2, 3, ...), vbyte only holds non-negative integers
+        """
+        header = [len(self._impacts)]
+        segments_binary = bytearray()
+        for segment_index, impact in enumerate(self._impacts):
+            doc_gaps = np.diff(self.get_doc_ids(segment_index), prepend=0)
+            doc_gaps_binary, size_in_bytes = utils.vbyte_encode(doc_gaps.tolist())
+            header += [2 * impact if impact >= 0 else -2 * impact - 1, self._counts[segment_index], size_in_bytes]
+            segments_binary += doc_gaps_binary
+        list_binary, size_in_bytes = utils.vbyte_encode(header)
+        list_binary += segments_binary
+        return (list_binary, size_in_bytes + len(segments_binary))
+
+    def bytearray_to_segments(self, list_binary):
+        """
+        Sets the segments of the list from a bytearray, see postings_to_bytearray
+        Only the header is read here, a segment is decoded when its doc_ids are first needed
+        buffer list_binary: A buffer for the list read from disk
+        """
+        number_of_segments, pointer = utils.vbyte_decode_count(list_binary, 1)
+        header, pointer = utils.vbyte_decode_count(list_binary, 3 * number_of_segments[0], pointer)
+        # Copy the segments, the buffer may be a view of a memory-mapped file which is released after this call
+        segments_binary = memoryview(bytes(list_binary[pointer:]))
+        self._impacts = [(impact >> 1) ^ -(impact & 1) for impact in header[0::3]]
+        self._counts = header[1::3]
+        self._segment_binaries = []
+        self._doc_ids = [None] * len(self._impacts)
+        segment_position = 0
+        for size_in_bytes in header[2::3]:
+            self._segment_binaries.append(segments_binary[segment_position: segment_position + size_in_bytes])
+            segment_position += size_in_bytes
@@ -1,10 +1,18 @@
 # Import built-in libraries
 import os
+import gzip
 import json
 import math
+import heapq
 import random
+import shutil
 import struct
-from collections import defaultdict
+import threading
+import uuid
+from itertools import groupby, islice, repeat
+from operator import itemgetter
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
 # Import third-part libraries
 import numpy as np
@@ -12,8 +20,14 @@ import numpy as np
 # Import src files
 from Config import Config
 from InvertedList import InvertedList
+from ImpactOrderedList import ImpactOrderedList
 from InvertedIndex import InvertedIndex
+from Segment import Segment
+from DocsMeta import DocsMeta
+from LookupTable import LookupTable
 from DocumentVector import DocumentVector
+from RetrievalModels import RetrievalModels
+import utils
 
 
 class Indexer:
@@ -21,14 +35,33 @@ class Indexer:
     Class to create, store and load an inverted index
     """
 
+    # Rough in-memory cost (bytes) of a new term, a new posting and a position while building the map
+    # A term holds an InvertedList with three arrays, a posting and a position are ints in those arrays
+    term_size_estimate = 500
+    posting_size_estimate = 12
+    position_size_estimate = 6
+    # Number of scenes in a shard handed to a worker process in a parallel build
+    scenes_per_shard = 128
+    # Largest number of run files merged at once, more runs are merged in several passes
+    max_merge_fan_in = 64
+    # Held while segments are loaded or swapped on disk, shared by all indexers in the process
+    segments_lock = threading.Lock()
+
     def __init__(self, new_config):
         """
         Namespace config: Arguments passed on the command line
         """
         self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         stored_config = self.get_config(new_config)
+        # An index can only be read with the format it was built with, so the stored format is kept
+        index_format = {param: stored_config[param] for param in Config.index_format_params if param in stored_config}
         stored_config.update(vars(new_config))
+        stored_config.update(index_format)
         self.config = Config(**stored_config)
+        # Sorted run files of partial inverted lists waiting to be merged (block-based build only)
+        self.run_file_names = []
+        # Thread merging segments of added documents in the background
+        self.merge_thread = None
 
     def get_config(self, params):
         """
@@ -46,47 +79,357 @@ class Indexer:
 
         return config
 
-    def load_data(self):
+    def stream_data(self, data_file_name=None):
         """
-        Loads a data file from the disk for any extension, currently only .json is supported
+        Yields scenes one at a time from a .json, .jsonl (JSON-lines) or gzipped .json.gz / .jsonl.gz data file
+        str data_file_name: Name of the data file in the data directory, defaults to the configured data file
         """
+        if data_file_name is None:
+            data_file_name = self.config.data_file_name
         data_file = self.root_dir + '/' + self.config.data_dir + \
-            '/' + self.config.data_file_name
-        with open(data_file, 'r') as f:
-            root, ext = os.path.splitext(data_file)
-            # Check if file extension is .json
+            '/' + data_file_name
+        root, ext = os.path.splitext(data_file)
+        opener = open
+        # Gzipped files are decompressed on the fly, the extension before .gz decides the format
+        if ext == '.gz':
+            opener = gzip.open
+            root, ext = os.path.splitext(root)
+        with opener(data_file, 'rt', encoding='utf-8') as f:
             if ext == '.json':
-                # Load json data from file and return
-                return json.load(f)
+                yield from utils.stream_json_array(f)
+            elif ext == '.jsonl':
+                yield from utils.stream_json_lines(f)
+
+    def load_data(self):
+        """
+        Loads a data file from the disk, any format supported by stream_data can be used
+        """
+        return {'corpus': list(self.stream_data())}
+
+    def index_scene(self, inverted_index, doc_id, scene):
+        """
+        Adds the terms of a scene to the map of an index and returns the scene's meta info and terms
+        class inverted_index: Instance of the inverted index being built
+        int doc_id: ID of the scene
+        dict scene: Scene read from the data file
+        """
+        scene_text = scene['text']
+        # Filter None removes empty strings from the list after the split on space
+        terms = list(filter(None, scene_text.split()))
+        doc_meta = {
+            'playId': scene['playId'],
+            'sceneId': scene['sceneId'],
+            'sceneNum': scene['sceneNum'],
+            'sceneLength': len(terms)
+        }
+        for position, term in enumerate(terms):
+            inverted_index.update_map(term, doc_id, position)
+        return (doc_meta, terms)
 
     def create_inverted_index(self, compressed):
         """
         Creates and returns an inverted index
+        If a memory budget is configured, partial inverted lists are flushed to sorted run files
+        whenever the budget is reached and are merged when the index is dumped to disk
+        If more than one worker is configured, the index is built in parallel instead
         bool compressed: Flag to choose between a compressed / uncompressed index
         """
+        if self.config.workers > 1:
+            return self.create_inverted_index_in_parallel(compressed)
         inverted_index = InvertedIndex(self.config, compressed)
-        data = self.load_data()
+        memory_budget = self.config.memory_budget * 1024 * 1024
+        block_size = 0
+        self.run_file_names = []
         doc_id = -1
-        for scene in data['corpus']:
+        for scene in self.stream_data():
             doc_id += 1
-            scene_text = scene['text']
-            # Filter None removes empty strings from the list after the split on space
-            terms = list(filter(None, scene_text.split()))
-            doc_meta = {
-                'playId': scene['playId'],
-                'sceneId': scene['sceneId'],
-                'sceneNum': scene['sceneNum'],
-                'sceneLength': len(terms)
-            }
+            number_of_terms = len(inverted_index.get_map())
+            doc_meta, terms = self.index_scene(inverted_index, doc_id, scene)
             inverted_index.update_docs_meta(doc_id, doc_meta)
             inverted_index.update_collection_stats(
                 doc_length=doc_meta['sceneLength'])
-            for position, term in enumerate(terms):
-                inverted_index.update_map(term, doc_id, position)
+            if memory_budget:
+                # Estimate the memory taken by the map for this block and flush it if it is over budget
+                block_size += (len(inverted_index.get_map()) - number_of_terms) * self.term_size_estimate
+                block_size += len(set(terms)) * self.posting_size_estimate
+                block_size += len(terms) * self.position_size_estimate
+                if block_size >= memory_budget:
+                    self.add_run(inverted_index)
+                    block_size = 0
+        if self.run_file_names and inverted_index.get_map():
+            self.add_run(inverted_index)
         inverted_index.update_collection_stats(average_length=True)
         inverted_index.load_vocabulary()
         return inverted_index
 
+    def create_inverted_index_in_parallel(self, compressed):
+        """
+        Creates and returns an inverted index using a pool of worker processes
+        The corpus is split into shards of consecutive doc_ids, each worker indexes a shard into a run file
+        and the shards are combined in doc_id order. The workers also merge the runs, see merge_runs_to_disk
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        # The executor pickles this indexer, which cannot hold a running thread
+        self.wait_for_merge()
+        inverted_index = InvertedIndex(self.config, compressed)
+        self.run_file_names = []
+        pending_shards = deque()
+        with ProcessPoolExecutor(max_workers=self.config.workers) as executor:
+            scenes = self.stream_data()
+            first_doc_id = 0
+            while True:
+                shard = list(islice(scenes, self.scenes_per_shard))
+                if not shard:
+                    break
+                run_file_name = self.get_run_file_name(len(self.run_file_names))
+                self.run_file_names.append(run_file_name)
+                pending_shards.append(executor.submit(
+                    self.create_shard_inverted_index, compressed, first_doc_id, shard, run_file_name))
+                first_doc_id += len(shard)
+                # Bound the number of shards held in memory while the workers catch up
+                if len(pending_shards) >= 2 * self.config.workers:
+                    self.add_shard(inverted_index, pending_shards.popleft().result())
+            while pending_shards:
+                self.add_shard(inverted_index, pending_shards.popleft().result())
+        inverted_index.update_collection_stats(average_length=True)
+        inverted_index.load_vocabulary()
+        return inverted_index
+
+    def create_shard_inverted_index(self, compressed, first_doc_id, scenes, run_file_name):
+        """
+        Indexes a shard of scenes into a run file, this runs in a worker process
+        Returns the docs meta of the shard and the ctf of every term in it
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        int first_doc_id: ID of the first scene in the shard
+        list scenes: Scenes of the shard in doc_id order
+        str run_file_name: Name of the run file to write the shard's inverted lists to
+        """
+        inverted_index = InvertedIndex(self.config, compressed)
+        docs_meta = []
+        for doc_id, scene in enumerate(scenes, first_doc_id):
+            doc_meta, _ = self.index_scene(inverted_index, doc_id, scene)
+            docs_meta.append(doc_meta)
+        self.dump_run_to_disk(inverted_index, run_file_name)
+        ctfs = {term: term_stats['ctf'] for term, term_stats in inverted_index.get_lookup_table().items()}
+        return (first_doc_id, docs_meta, ctfs)
+
+    def add_shard(self, inverted_index, shard):
+        """
+        Adds the docs meta, collection stats and term counts of an indexed shard to the index
+        class inverted_index: Instance of the inverted index being built
+        tuple shard: First doc_id, docs meta and ctfs returned by create_shard_inverted_index
+        """
+        first_doc_id, docs_meta, ctfs = shard
+        for doc_id, doc_meta in enumerate(docs_meta, first_doc_id):
+            inverted_index.update_docs_meta(doc_id, doc_meta)
+            inverted_index.update_collection_stats(
+                doc_length=doc_meta['sceneLength'])
+        # DF is set from the merged inverted lists when the runs are merged
+        for term, ctf in ctfs.items():
+            inverted_index.add_to_lookup_table(term, df=0, ctf=ctf)
+
+    def get_run_file_name(self, run_number, prefix='run'):
+        """
+        Returns the path of a run file, creating the runs directory if it doesn't exist
+        int run_number: Number of the run
+        str prefix: Prefix of the file name, runs of later merge passes and parts of the final merge have their own
+        """
+        runs_dir = self.root_dir + '/' + self.config.index_dir + '/' + self.config.runs_dir
+        if not os.path.exists(runs_dir):
+            os.makedirs(runs_dir, exist_ok=True)
+        return runs_dir + '/' + prefix + '-' + str(run_number)
+
+    def add_run(self, inverted_index):
+        """
+        Flushes the map of the index to the next run file of a block-based build
+        class inverted_index: Instance of the inverted index being built
+        """
+        run_file_name = self.get_run_file_name(len(self.run_file_names))
+        self.dump_run_to_disk(inverted_index, run_file_name)
+        self.run_file_names.append(run_file_name)
+
+    def dump_run_to_disk(self, inverted_index, run_file_name):
+        """
+        Writes the inverted lists in the map to a run file sorted by term and clears the map
+        A record is the term length, df, size of the list in bytes, the term and the uncompressed list
+        class inverted_index: Instance of the inverted index being built
+        str run_file_name: Name of the run file
+        """
+        index_map = inverted_index.get_map()
+        with open(run_file_name, 'wb') as f:
+            for term in sorted(index_map.keys()):
+                self.write_run_record(f, term, index_map[term])
+        inverted_index.load_map(defaultdict(InvertedList))
+
+    def write_run_record(self, file_buffer, term, inverted_list):
+        """
+        Appends the record of a term and its uncompressed inverted list to a run file
+        buffer file_buffer: Buffer for the run file
+        str term: Term of the inverted list
+        class inverted_list: Inverted list of the term
+        """
+        inverted_list_binary, size_in_bytes = inverted_list.postings_to_bytearray(False)
+        term_binary = term.encode('utf-8')
+        file_buffer.write(struct.pack('<iiq', len(term_binary), inverted_list.get_df(), size_in_bytes))
+        file_buffer.write(term_binary)
+        file_buffer.write(inverted_list_binary)
+
+    def read_run_from_disk(self, file_buffer, first_term=None, last_term=None):
+        """
+        Yields (term, df, inverted list binary) records from a run file in term order
+        Only the terms from first_term up to (but not including) last_term are yielded, the lists of the terms
+        before first_term are skipped over without reading them
+        buffer file_buffer: Buffer for the run file
+        str first_term: First term to yield, from the first term of the run if None
+        str last_term: Term to stop at, at the end of the run if None
+        """
+        format_record = '<iiq'
+        record_size = struct.calcsize(format_record)
+        while True:
+            record = file_buffer.read(record_size)
+            if not record:
+                return
+            term_size, df, size_in_bytes = struct.unpack(format_record, record)
+            term = file_buffer.read(term_size).decode('utf-8')
+            if last_term is not None and term >= last_term:
+                return
+            if first_term is not None and term < first_term:
+                file_buffer.seek(size_in_bytes, os.SEEK_CUR)
+                continue
+            yield (term, df, file_buffer.read(size_in_bytes))
+
+    def merge_runs(self, run_file_names, first_term=None, last_term=None):
+        """
+        K-way merges run files and yields (term, inverted list) in term order, see read_run_from_disk for the range
+        Runs hold increasing ranges of doc_ids, so concatenating a term's lists in run order keeps postings sorted
+        list run_file_names: Names of the run files in doc_id order
+        str first_term: First term to merge
+        str last_term: Term to stop at
+        """
+        run_files = [open(run_file_name, 'rb') for run_file_name in run_file_names]
+        try:
+            runs = [self.read_run_from_disk(run_file, first_term, last_term) for run_file in run_files]
+            # heapq.merge is stable, so records of the same term come out in run order
+            for term, records in groupby(heapq.merge(*runs, key=itemgetter(0)), key=itemgetter(0)):
+                inverted_list = InvertedList()
+                for _, df, inverted_list_binary in records:
+                    run_inverted_list = InvertedList()
+                    run_inverted_list.bytearray_to_postings(inverted_list_binary, False, df)
+                    inverted_list.extend(run_inverted_list)
+                yield (term, inverted_list)
+        finally:
+            for run_file in run_files:
+                run_file.close()
+
+    def merge_runs_to_run(self, run_file_names, run_file_name):
+        """
+        Merges run files with consecutive doc_ids into one run file, this runs in a worker process in a parallel build
+        list run_file_names: Names of the run files in doc_id order
+        str run_file_name: Name of the merged run file
+        """
+        with open(run_file_name, 'wb') as f:
+            for term, inverted_list in self.merge_runs(run_file_names):
+                self.write_run_record(f, term, inverted_list)
+
+    def reduce_runs(self):
+        """
+        Merges groups of max_merge_fan_in consecutive runs into one run until at most max_merge_fan_in are left,
+        so no merge has more than max_merge_fan_in run files open. A parallel build merges the groups of a pass
+        in its worker processes
+        """
+        merge_pass = 0
+        while len(self.run_file_names) > self.max_merge_fan_in:
+            merge_pass += 1
+            groups = [self.run_file_names[i: i + self.max_merge_fan_in]
+                      for i in range(0, len(self.run_file_names), self.max_merge_fan_in)]
+            merged_run_file_names = [self.get_run_file_name(i, 'run' + str(merge_pass)) for i in range(len(groups))]
+            if self.config.workers > 1:
+                with ProcessPoolExecutor(max_workers=self.config.workers) as executor:
+                    list(executor.map(self.merge_runs_to_run, groups, merged_run_file_names))
+            else:
+                for group, merged_run_file_name in zip(groups, merged_run_file_names):
+                    self.merge_runs_to_run(group, merged_run_file_name)
+            for run_file_name in self.run_file_names:
+                os.remove(run_file_name)
+            self.run_file_names = merged_run_file_names
+
+    def merge_runs_to_disk(self, file_buffer, inverted_index):
+        """
+        K-way merges the run files into the final inverted lists file, the runs are removed once the index is dumped
+        A parallel build splits the terms into one range per worker, see merge_runs_to_disk_in_parallel
+        buffer file_buffer: Buffer for the inverted lists file
+        class inverted_index: Instance of the inverted index being built
+        """
+        self.reduce_runs()
+        if self.config.workers > 1:
+            self.merge_runs_to_disk_in_parallel(file_buffer, inverted_index)
+            return
+        for term, inverted_list in self.merge_runs(self.run_file_names):
+            inverted_index.set_df(term, inverted_list.get_df())
+            self.dump_inverted_list_to_disk(file_buffer, inverted_index, term, inverted_list)
+
+    def merge_term_range_to_part(self, compressed, docs_meta, first_term, last_term, part_file_name):
+        """
+        Merges the lists of a range of terms from the run files into a part of the inverted lists file and returns
+        the lookup table of the part, this runs in a worker process
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        class docs_meta: Docs meta of the index, document lengths bound the scores stored with the lists
+        str first_term: First term of the range
+        str last_term: Term after the range, None for the last range
+        str part_file_name: Name of the file to write the part to
+        """
+        part_index = InvertedIndex(self.config, compressed)
+        part_index.load_docs_meta(docs_meta)
+        with open(part_file_name, 'wb') as f:
+            for term, inverted_list in self.merge_runs(self.run_file_names, first_term, last_term):
+                part_index.add_to_lookup_table(term, df=inverted_list.get_df(), ctf=inverted_list.get_ctf())
+                self.dump_inverted_list_to_disk(f, part_index, term, inverted_list)
+        return part_index.get_lookup_table()
+
+    def merge_runs_to_disk_in_parallel(self, file_buffer, inverted_index):
+        """
+        Merges the run files into the final inverted lists file with a worker process per range of terms
+        The ranges hold about the same number of positions, each worker merges and encodes the lists of its range
+        into a part and the parts are concatenated in term order
+        buffer file_buffer: Buffer for the inverted lists file
+        class inverted_index: Instance of the inverted index being built
+        """
+        ctfs = {term: term_stats['ctf'] for term, term_stats in inverted_index.get_lookup_table().items()}
+        total_ctf = sum(ctfs.values())
+        first_terms = [None]
+        cumulative_ctf = 0
+        for term in sorted(ctfs):
+            if cumulative_ctf >= total_ctf * len(first_terms) / self.config.workers:
+                first_terms.append(term)
+            cumulative_ctf += ctfs[term]
+        term_ranges = list(zip(first_terms, first_terms[1:] + [None]))
+        part_file_names = [self.get_run_file_name(i, 'part') for i in range(len(term_ranges))]
+        with ProcessPoolExecutor(max_workers=self.config.workers) as executor:
+            part_lookup_tables = list(executor.map(
+                self.merge_term_range_to_part, repeat(inverted_index.compressed), repeat(inverted_index.get_docs_meta()),
+                first_terms, [last_term for _, last_term in term_ranges], part_file_names))
+        for part_file_name, part_lookup_table in zip(part_file_names, part_lookup_tables):
+            part_position = file_buffer.tell()
+            with open(part_file_name, 'rb') as part_file:
+                shutil.copyfileobj(part_file, file_buffer)
+            os.remove(part_file_name)
+            for term, term_stats in part_lookup_table.items():
+                inverted_index.set_df(term, term_stats['df'])
+                inverted_index.update_lookup_table(
+                    term, part_position + term_stats['posting_list_position'], term_stats['posting_list_size'],
+                    term_stats['max_dtf'], term_stats['min_doc_length'])
+
+    def remove_runs_from_disk(self):
+        """
+        Deletes the run files of a block-based build
+        """
+        for run_file_name in self.run_file_names:
+            os.remove(run_file_name)
+        self.run_file_names = []
+        runs_dir = self.root_dir + '/' + self.config.index_dir + '/' + self.config.runs_dir
+        if os.path.exists(runs_dir) and not os.listdir(runs_dir):
+            os.rmdir(runs_dir)
+
     def get_inverted_index(self, compressed):
         """
         Loads an inverted index from file or calls the create method if it doesn't exist
@@ -94,29 +437,63 @@ class Indexer:
         """
         inverted_index = None
         try:
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.collection_stats_file_name, 'rb') as collection_stats_file:
+            with self.segments_lock, open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.collection_stats_file_name, 'rb') as collection_stats_file:
                 with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'rb') as docs_meta_file:
                     if not compressed:
-                        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir + '/' + self.config.lookup_table_file_name, 'r') as lookup_table_file:
+                        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir + '/' + self.config.lookup_table_file_name, 'rb') as lookup_table_file:
                             with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir + '/' + self.config.inverted_lists_file_name, 'rb') as inverted_lists_file:
                                 # Load lookup table, docs meta info and inverted lists(if in_memory is True) from uncompressed version on disk
                                 inverted_index = self.load_inverted_index_in_memory(
                                     collection_stats_file, docs_meta_file, lookup_table_file, inverted_lists_file, False)
                     if compressed:
-                        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir + '/' + self.config.lookup_table_file_name, 'r') as lookup_table_file:
+                        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir + '/' + self.config.lookup_table_file_name, 'rb') as lookup_table_file:
                             with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir + '/' + self.config.inverted_lists_file_name, 'rb') as inverted_lists_file:
                                 # Load lookup table, docs meta info and inverted lists(if in_memory is True) from compressed version on disk
                                 inverted_index = self.load_inverted_index_in_memory(
                                     collection_stats_file, docs_meta_file, lookup_table_file, inverted_lists_file, True)
-        except Exception as e:
-            # Create inverted index
+                # Read under the lock along with the index, so the generation is the one of the files loaded
+                inverted_index.set_generation(self.get_index_generation(compressed))
+        except (FileNotFoundError, ValueError):
+            # Create the inverted index if it is missing or isn't in the binary format, other errors are raised
             inverted_index = self.create_inverted_index(compressed)
+            block_based = bool(self.run_file_names)
             self.dump_inverted_index_to_disk(inverted_index)
+            self.load_lookup_table_from_disk(inverted_index, compressed)
             if not self.config.in_memory:
                 self.remove_inverted_index_from_memory(inverted_index)
+            elif block_based and self.config.lazy_lists:
+                # The map only held the last block, the merged lists are read on first access
+                self.remove_inverted_index_from_memory(inverted_index)
+            elif block_based:
+                # The map only held the last block, so read the merged lists back in
+                with open(inverted_index.get_inverted_lists_file_path(), 'rb') as inverted_lists_file:
+                    self.load_inverted_lists_in_memory(inverted_index, inverted_lists_file, compressed)
+            inverted_index.set_generation(self.get_index_generation(compressed))
 
+        if self.config.impact_ordered:
+            try:
+                inverted_index.get_impact_meta()
+            except ValueError:
+                # The impact-ordered index is missing, in another format or was built before documents were added
+                self.dump_impact_ordered_index_to_disk(inverted_index)
         return inverted_index
 
+    def get_index_generation(self, compressed):
+        """
+        Returns the generation of the index on disk, which changes whenever the index is built or documents are added
+        Both store a new index_generation in the config file, merges of segments leave the postings unchanged and
+        keep it. None is returned for an index built without one
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        config_file_path = self.root_dir + '/' + self.config.index_dir + '/' + self.config.config_file_name
+        if not os.path.exists(config_file_path):
+            return None
+        with open(config_file_path, 'r') as f:
+            index_generation = json.load(f).get('index_generation')
+        if index_generation is None:
+            return None
+        return (config_file_path, bool(compressed), index_generation)
+
     def load_inverted_index_in_memory(self, collection_stats_file, docs_meta_file, lookup_table_file, inverted_lists_file, compressed):
         """
         Loads an inverted index in memory, inverted lists are not loaded by default
@@ -132,38 +509,322 @@ class Indexer:
         inverted_index.load_collection_stats(collection_stats)
 
         # Load meta info for documents
-        docs_meta = json.load(docs_meta_file)
+        docs_meta = DocsMeta()
+        docs_meta.load(docs_meta_file)
         inverted_index.load_docs_meta(docs_meta)
 
-        # Load lookup table
-        lookup_table = json.load(lookup_table_file)
+        # Load lookup table, it is memory-mapped and not parsed, the inverted lists it describes are opened with it
+        lookup_table = LookupTable()
+        lookup_table.load(lookup_table_file)
         inverted_index.load_lookup_table(lookup_table)
+        inverted_index.open_inverted_lists()
+
+        # Load the segments of documents added after the index was built
+        inverted_index.load_segments(self.load_segments_from_disk(compressed))
 
         # Load vocabulary
         inverted_index.load_vocabulary()
 
-        # Load inverted lists only if in_memory is True
-        if self.config.in_memory:
-            index_map = defaultdict(InvertedList)
-            for term, term_stats in lookup_table.items():
-                inverted_list = index_map[term]
-                inverted_list_binary = inverted_index.read_inverted_list_from_file(
-                    inverted_lists_file, term_stats['posting_list_position'], term_stats['posting_list_size'])
-                inverted_list.bytearray_to_postings(
-                    inverted_list_binary, compressed, term_stats['df'])
-            inverted_index.load_map(index_map)
+        # Load inverted lists only if in_memory is True, lazy lists are decoded when they are first asked for
+        if self.config.in_memory and not self.config.lazy_lists:
+            self.load_inverted_lists_in_memory(inverted_index, inverted_lists_file, compressed)
 
         return inverted_index
 
+    def load_inverted_lists_in_memory(self, inverted_index, inverted_lists_file, compressed):
+        """
+        Decodes every inverted list from disk into the map of the index
+        class inverted_index: Instance of the inverted index being used
+        buffer inverted_lists_file: Buffer for the inverted lists file
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        index_map = defaultdict(InvertedList)
+        for term, term_stats in inverted_index.get_lookup_table().items():
+            inverted_list = index_map[term]
+            inverted_list_binary = inverted_index.read_inverted_list_from_file(
+                inverted_lists_file, term_stats['posting_list_position'], term_stats['posting_list_size'])
+            inverted_list.bytearray_to_postings(
+                inverted_list_binary, compressed, term_stats['df'], inverted_index.get_codecs())
+        for segment in inverted_index.get_segments():
+            for term in segment.get_lookup_table().keys():
+                index_map[term].extend(segment.read_inverted_list(term))
+        inverted_index.load_map(index_map)
+
+    def load_lookup_table_from_disk(self, inverted_index, compressed):
+        """
+        Replaces the lookup table built in memory with the binary lookup table stored on disk and opens the
+        inverted lists it describes
+        class inverted_index: Instance of the inverted index being used
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        dir_name = self.config.uncompressed_dir
+        if compressed:
+            dir_name = self.config.compressed_dir
+        with open(self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.lookup_table_file_name, 'rb') as lookup_table_file:
+            lookup_table = LookupTable()
+            lookup_table.load(lookup_table_file)
+            inverted_index.load_lookup_table(lookup_table)
+        inverted_index.open_inverted_lists()
+
+    def get_segments_dir(self, compressed):
+        """
+        Returns the path of the directory holding the segments of the compressed / uncompressed index
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        dir_name = self.config.uncompressed_dir
+        if compressed:
+            dir_name = self.config.compressed_dir
+        return self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.segments_dir
+
+    def get_segment_dir(self, compressed, first_doc_id):
+        """
+        Returns the path of the directory of a segment, segments are named after their doc-id base
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        int first_doc_id: ID of the first document in the segment
+        """
+        return self.get_segments_dir(compressed) + '/segment-' + str(first_doc_id)
+
+    def load_segments_from_disk(self, compressed):
+        """
+        Returns the segments of the compressed / uncompressed index ordered by their doc-id base
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        segments_dir = self.get_segments_dir(compressed)
+        if not os.path.exists(segments_dir):
+            return []
+        segments = []
+        for segment_name in os.listdir(segments_dir):
+            # Directories of segments which are being written or replaced are not part of the index
+            if not segment_name.startswith('segment-') or '.' in segment_name:
+                continue
+            segment = Segment(self.config, compressed, segments_dir + '/' + segment_name)
+            segment.load()
+            segments.append(segment)
+        segments.sort(key=lambda segment: segment.get_first_doc_id())
+        return segments
+
+    def dump_segment_to_disk(self, segment, source_indexes=None, replaced_segments=()):
+        """
+        Writes the inverted lists of a segment, its lookup table and doc-id range to its directory
+        The segment is written to a new directory which then replaces the old one, so readers of the old
+        segment keep their memory-mapped files
+        class segment: Instance of the segment being written
+        list source_indexes: Indexes whose inverted lists are merged into the segment instead of its map
+        list replaced_segments: Segments merged into this one which are removed when it is swapped in
+        """
+        new_segment_dir = segment.segment_dir + '.new'
+        old_segment_dir = segment.segment_dir + '.old'
+        if os.path.exists(new_segment_dir):
+            shutil.rmtree(new_segment_dir)
+        os.makedirs(new_segment_dir)
+        with open(new_segment_dir + '/' + self.config.inverted_lists_file_name, 'wb') as f:
+            if source_indexes is None:
+                self.dump_inverted_lists_to_disk(f, segment)
+            else:
+                self.merge_indexes_to_disk(f, segment, source_indexes)
+        with open(new_segment_dir + '/' + self.config.lookup_table_file_name, 'wb') as f:
+            LookupTable().dump(segment.get_lookup_table(), f)
+        with open(new_segment_dir + '/' + self.config.segment_meta_file_name, 'w') as f:
+            json.dump({'firstDocId': segment.get_first_doc_id(), 'numberOfDocs': segment.get_number_of_docs()}, f)
+        # Readers list the segments under the lock, so they never see both a merged segment and its sources
+        with self.segments_lock:
+            if os.path.exists(segment.segment_dir):
+                os.rename(segment.segment_dir, old_segment_dir)
+            os.rename(new_segment_dir, segment.segment_dir)
+            if os.path.exists(old_segment_dir):
+                shutil.rmtree(old_segment_dir)
+            for replaced_segment in replaced_segments:
+                shutil.rmtree(replaced_segment.segment_dir)
+
+    def merge_indexes_to_disk(self, file_buffer, merged_index, source_indexes):
+        """
+        Writes the concatenated inverted lists of indexes with consecutive doc_id ranges to a buffer
+        The lookup table of the merged index is filled with the merged statistics
+        buffer file_buffer: Buffer for the merged inverted lists file opened in binary mode
+        class merged_index: Instance of the index the merged lists belong to
+        list source_indexes: Indexes (or segments) in the order of their doc_ids
+        """
+        terms = set()
+        for index in source_indexes:
+            terms.update(index.get_lookup_table().keys())
+        for term in sorted(terms):
+            inverted_list = InvertedList()
+            for index in source_indexes:
+                if term in index.get_lookup_table():
+                    inverted_list.extend(index.read_inverted_list(term))
+            merged_index.add_to_lookup_table(term, df=inverted_list.get_df(), ctf=inverted_list.get_ctf())
+            self.dump_inverted_list_to_disk(file_buffer, merged_index, term, inverted_list)
+
+    def add_documents(self, scenes, compressed):
+        """
+        Appends scenes to the index without rebuilding it and returns the updated index
+        The new postings are written to a new segment of every index on disk (compressed and uncompressed)
+        and docs meta and collection stats are updated. Segments are then merged in a background thread
+        following the logarithmic merge policy, see find_segments_to_merge
+        iterable scenes: Scenes to add in the format of the data file
+        bool compressed: Flag to choose between a compressed / uncompressed index to return
+        """
+        self.wait_for_merge()
+        # Update every index that is on disk, the one asked for is created if it doesn't exist
+        inverted_indexes = {}
+        for existing in (False, True):
+            dir_name = self.config.compressed_dir if existing else self.config.uncompressed_dir
+            if existing == bool(compressed) or os.path.exists(self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.lookup_table_file_name):
+                inverted_indexes[existing] = self.get_inverted_index(existing)
+        inverted_index = inverted_indexes[bool(compressed)]
+
+        # Index the new scenes after the last document in the collection
+        first_doc_id = inverted_index.get_total_docs()
+        new_index = InvertedIndex(self.config, False)
+        doc_id = first_doc_id
+        for scene in scenes:
+            doc_meta, _ = self.index_scene(new_index, doc_id, scene)
+            inverted_index.update_docs_meta(doc_id, doc_meta)
+            inverted_index.update_collection_stats(
+                doc_length=doc_meta['sceneLength'])
+            doc_id += 1
+        inverted_index.update_collection_stats(average_length=True)
+        number_of_new_docs = doc_id - first_doc_id
+        if not number_of_new_docs:
+            for existing_index in inverted_indexes.values():
+                existing_index.close()
+            return self.get_inverted_index(compressed)
+
+        # Only the new documents are written, existing segments are left as they are
+        segment_sizes = None
+        for existing, existing_index in inverted_indexes.items():
+            segment = Segment(self.config, existing, self.get_segment_dir(existing, first_doc_id))
+            segment.set_doc_range(first_doc_id, number_of_new_docs)
+            # Document lengths bound the scores stored with the inverted lists of the segment
+            segment.load_docs_meta(inverted_index.get_docs_meta())
+            for term, inverted_list in new_index.get_map().items():
+                segment.add_to_lookup_table(term, df=inverted_list.get_df(), ctf=inverted_list.get_ctf())
+            segment.load_map(new_index.get_map())
+            self.dump_segment_to_disk(segment)
+            segments = existing_index.get_segments()
+            segment_sizes = [segments[0].get_first_doc_id() if segments else first_doc_id]
+            segment_sizes += [old_segment.get_number_of_docs() for old_segment in segments] + [number_of_new_docs]
+
+        with self.segments_lock:
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.collection_stats_file_name, 'w') as f:
+                json.dump(inverted_index.get_collection_stats(), f)
+
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'wb') as f:
+                inverted_index.get_docs_meta().dump(f)
+
+            # Results cached for the index before the documents were added are no longer returned
+            self.config.index_generation = uuid.uuid4().hex
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.config_file_name, 'w') as f:
+                json.dump(self.config.get_params(), f)
+
+        for existing_index in inverted_indexes.values():
+            existing_index.close()
+
+        # Load the updated index before a merge starts, it keeps reading the segments it has mapped
+        inverted_index = self.get_inverted_index(compressed)
+        if self.find_segments_to_merge(segment_sizes):
+            self.merge_thread = threading.Thread(target=self.merge_segments, args=(list(inverted_indexes.keys()),))
+            self.merge_thread.start()
+        return inverted_index
+
+    def get_merge_level(self, number_of_docs):
+        """
+        Returns the size level of a segment, the floor of the logarithm of its size in base merge_factor
+        int number_of_docs: Number of documents in the segment
+        """
+        level = 0
+        while number_of_docs >= self.config.merge_factor:
+            number_of_docs //= self.config.merge_factor
+            level += 1
+        return level
+
+    def find_segments_to_merge(self, segment_sizes):
+        """
+        Returns the (start, end) range of segments to merge next or None if no merge is needed
+        merge_factor adjacent segments of the same size level are merged into one of the next level, so an index
+        of N documents has at most (merge_factor - 1) segments per level and O(log N) segments overall
+        list segment_sizes: Number of documents in the main index followed by the size of every segment in doc_id order
+        """
+        levels = [self.get_merge_level(segment_size) for segment_size in segment_sizes]
+        start = 0
+        while start < len(levels):
+            end = start + 1
+            while end < len(levels) and levels[end] == levels[start]:
+                end += 1
+            if end - start >= self.config.merge_factor:
+                return (start, start + self.config.merge_factor)
+            start = end
+        return None
+
+    def merge_segments(self, variants):
+        """
+        Merges the segments of each given index until the merge policy finds nothing left to merge
+        list variants: List of compressed flags of the indexes to merge
+        """
+        for compressed in variants:
+            while self.merge_next_segments(compressed):
+                pass
+
+    def merge_next_segments(self, compressed):
+        """
+        Runs the next merge chosen by the merge policy on an index and returns False if there was none
+        A range starting at the main index is merged into its inverted lists and lookup table, which are
+        written next to the current ones and swapped in once complete. Other ranges become one segment
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        """
+        with self.segments_lock:
+            main_index = InvertedIndex(self.config, compressed)
+            self.load_lookup_table_from_disk(main_index, compressed)
+            segments = self.load_segments_from_disk(compressed)
+            # Document lengths bound the scores stored with the merged inverted lists
+            docs_meta = DocsMeta()
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'rb') as f:
+                docs_meta.load(f)
+        indexes = [main_index] + segments
+        segment_sizes = [segments[0].get_first_doc_id() if segments else 0]
+        segment_sizes += [segment.get_number_of_docs() for segment in segments]
+        merge_range = self.find_segments_to_merge(segment_sizes) if segments else None
+        if merge_range is not None:
+            start, end = merge_range
+            if start > 0:
+                merged_segment = Segment(self.config, compressed, indexes[start].segment_dir)
+                merged_segment.set_doc_range(indexes[start].get_first_doc_id(), sum(segment_sizes[start: end]))
+                merged_segment.load_docs_meta(docs_meta)
+                self.dump_segment_to_disk(merged_segment, indexes[start: end], indexes[start + 1: end])
+            else:
+                merged_index = InvertedIndex(self.config, compressed)
+                merged_index.load_docs_meta(docs_meta)
+                inverted_lists_file_path = main_index.get_inverted_lists_file_path()
+                lookup_table_file_path = os.path.dirname(inverted_lists_file_path) + '/' + self.config.lookup_table_file_name
+                with open(inverted_lists_file_path + '.merge', 'wb') as f:
+                    self.merge_indexes_to_disk(f, merged_index, indexes[start: end])
+                with open(lookup_table_file_path + '.merge', 'wb') as f:
+                    LookupTable().dump(merged_index.get_lookup_table(), f)
+                with self.segments_lock:
+                    os.replace(inverted_lists_file_path + '.merge', inverted_lists_file_path)
+                    os.replace(lookup_table_file_path + '.merge', lookup_table_file_path)
+                    for segment in indexes[1: end]:
+                        shutil.rmtree(segment.segment_dir)
+        for index in indexes:
+            index.close()
+        return merge_range is not None
+
+    def wait_for_merge(self):
+        """
+        Waits for a background merge of segments to finish
+        """
+        if self.merge_thread is not None:
+            self.merge_thread.join()
+            self.merge_thread = None
+
     def create_document_vectors(self, inverted_index):
         with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.document_vectors_file_name, 'wb') as file_buffer:
-            data = self.load_data()
             doc_id = -1
             vocabulary = inverted_index.get_vocabulary()
-            document_vectors = defaultdict(DocumentVector)
-            for scene in data['corpus']:
+            for scene in self.stream_data():
                 doc_id += 1
-                document_vector = document_vectors[doc_id]
+                # Each vector is written out as soon as it is built, so it is not kept around
+                document_vector = DocumentVector()
                 document_vector.set_doc_id(doc_id)
                 scene_text = scene['text']
                 terms = list(filter(None, scene_text.split()))
@@ -198,8 +859,8 @@ class Indexer:
                 doc_meta['document_vector_size'] = size_in_bytes
                 inverted_index.update_docs_meta(doc_id, doc_meta)
 
-        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'w') as f:
-            json.dump(inverted_index.get_docs_meta(), f)
+        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'wb') as f:
+            inverted_index.get_docs_meta().dump(f)
 
     def get_document_vectors(self, inverted_index):
         number_of_docs = inverted_index.get_total_docs()
@@ -237,17 +898,38 @@ class Indexer:
 
     def dump_inverted_lists_to_disk(self, file_buffer, inverted_index):
         """
-        Stores the inverted lists on disk
+        Stores the inverted lists on disk in term order, merging the run files of a block-based build
+        buffer file_buffer: Buffer for the inverted lists file
+        class inverted_index: Instance of the inverted index being used
+        """
+        if self.run_file_names:
+            self.merge_runs_to_disk(file_buffer, inverted_index)
+            return
+        index_map = inverted_index.get_map()
+        for term in sorted(index_map.keys()):
+            self.dump_inverted_list_to_disk(file_buffer, inverted_index, term, index_map[term])
+
+    def dump_inverted_list_to_disk(self, file_buffer, inverted_index, term, inverted_list):
+        """
+        Appends an inverted list to the inverted lists file and records its position in the lookup table
         buffer file_buffer: Buffer for the inverted lists file
         class inverted_index: Instance of the inverted index being used
+        str term: Term of the inverted list
+        class inverted_list: Inverted list to store
         """
-        for term, inverted_list in inverted_index.get_map().items():
-            position_in_file = file_buffer.tell()
-            inverted_list_binary, size_in_bytes = inverted_list.postings_to_bytearray(
-                inverted_index.compressed)
-            file_buffer.write(inverted_list_binary)
-            inverted_index.update_lookup_table(
-                term, position_in_file, size_in_bytes)
+        position_in_file = file_buffer.tell()
+        doc_lengths = inverted_index.get_doc_lengths_array()
+        inverted_list_binary, size_in_bytes = inverted_list.postings_to_bytearray(
+            inverted_index.compressed, inverted_index.get_codecs(), doc_lengths)
+        file_buffer.write(inverted_list_binary)
+        # The largest dtf and shortest document length bound the score of the term for dynamic pruning,
+        # a shortest length of 0 is a looser bound used when the lengths of the documents aren't known
+        min_doc_length = 0
+        doc_ids = inverted_list.get_doc_ids()
+        if len(doc_ids) and doc_ids[-1] < len(doc_lengths):
+            min_doc_length = int(doc_lengths[doc_ids].min())
+        inverted_index.update_lookup_table(
+            term, position_in_file, size_in_bytes, inverted_list.get_max_dtf(), min_doc_length)
 
     def dump_inverted_index_to_disk(self, inverted_index):
         """
@@ -258,38 +940,118 @@ class Indexer:
         if not os.path.exists(self.root_dir + '/' + self.config.index_dir):
             os.mkdir(self.root_dir + '/' + self.config.index_dir)
 
-        if not self.config.compressed:
-            # Create uncompressed index directory if it doesn't exist
-            if not os.path.exists(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir):
-                os.mkdir(self.root_dir + '/' + self.config.index_dir +
-                         '/' + self.config.uncompressed_dir)
+        dir_name = self.config.uncompressed_dir
+        if inverted_index.compressed:
+            dir_name = self.config.compressed_dir
+        # Create compressed / uncompressed index directory if it doesn't exist
+        if not os.path.exists(self.root_dir + '/' + self.config.index_dir + '/' + dir_name):
+            os.mkdir(self.root_dir + '/' + self.config.index_dir + '/' + dir_name)
+
+        # The inverted lists and lookup table are written next to the current ones and swapped in, the files
+        # are replaced rather than overwritten so indexes which hold the current ones open keep reading them
+        inverted_lists_file_path = self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.inverted_lists_file_name
+        lookup_table_file_path = self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.lookup_table_file_name
+        with open(inverted_lists_file_path + '.new', 'wb') as f:
+            self.dump_inverted_lists_to_disk(f, inverted_index)
 
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir + '/' + self.config.inverted_lists_file_name, 'wb') as f:
-                self.dump_inverted_lists_to_disk(f, inverted_index)
+        with open(lookup_table_file_path + '.new', 'wb') as f:
+            LookupTable().dump(inverted_index.get_lookup_table(), f)
 
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.uncompressed_dir + '/' + self.config.lookup_table_file_name, 'w') as f:
-                json.dump(inverted_index.get_lookup_table(), f)
+        self.remove_runs_from_disk()
 
-        if self.config.compressed:
-            # Create compressed index directory if it doesn't exist
-            if not os.path.exists(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir):
-                os.mkdir(self.root_dir + '/' + self.config.index_dir +
-                         '/' + self.config.compressed_dir)
+        # Indexes are loaded under the lock, so they never see the new lists along with stale files
+        with self.segments_lock:
+            os.replace(inverted_lists_file_path + '.new', inverted_lists_file_path)
+            os.replace(lookup_table_file_path + '.new', lookup_table_file_path)
 
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir + '/' + self.config.inverted_lists_file_name, 'wb') as f:
-                self.dump_inverted_lists_to_disk(f, inverted_index)
+            # A rebuilt index already holds every document, so segments left from before are stale
+            segments_dir = self.get_segments_dir(inverted_index.compressed)
+            if os.path.exists(segments_dir):
+                shutil.rmtree(segments_dir)
+            # So is the impact-ordered index, even if the collection stats it was checked against are unchanged
+            impact_ordered_dir = inverted_index.get_impact_ordered_dir()
+            if os.path.exists(impact_ordered_dir):
+                shutil.rmtree(impact_ordered_dir)
 
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.compressed_dir + '/' + self.config.lookup_table_file_name, 'w') as f:
-                json.dump(inverted_index.get_lookup_table(), f)
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.collection_stats_file_name, 'w') as f:
+                json.dump(inverted_index.get_collection_stats(), f)
 
-        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.collection_stats_file_name, 'w') as f:
-            json.dump(inverted_index.get_collection_stats(), f)
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'wb') as f:
+                inverted_index.get_docs_meta().dump(f)
 
-        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.docs_meta_file_name, 'w') as f:
-            json.dump(inverted_index.get_docs_meta(), f)
+            self.config.index_generation = uuid.uuid4().hex
+            with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.config_file_name, 'w') as f:
+                json.dump(self.config.get_params(), f)
+
+    def dump_impact_ordered_index_to_disk(self, inverted_index):
+        """
+        Stores an impact-ordered index of the inverted index on disk, its lists, lookup table and quantization
+        The impact of a posting is its BM25 score for a query term occurring once, quantized to impact_bits bits
+        plus a sign in steps of the largest score bound (in absolute value) of any term. Terms occurring in most
+        documents have a negative IDF, so their impacts are negative. The magnitude of a score is rounded up,
+        so only postings scoring exactly 0 are left out. The postings of a term are grouped into segments of
+        equal impact sorted by descending impact
+        The files are written next to the current ones and swapped in once complete
+        class inverted_index: Instance of the inverted index being used
+        """
+        vocabulary = inverted_index.get_vocabulary()
+        scoring_model = RetrievalModels(vocabulary, inverted_index, 'bm25')
+        levels = (1 << self.config.impact_bits) - 1
+        max_score = 0.0
+        for term in vocabulary:
+            max_dtf = inverted_index.get_max_dtf(term)
+            min_doc_length = inverted_index.get_min_doc_length(term)
+            max_score = max(max_score, scoring_model.get_max_score(term, max_dtf, min_doc_length),
+                            -scoring_model.get_min_score(term, max_dtf, min_doc_length))
+        # Impacts are scaled back to scores by multiplying them with the size of a step
+        scale = max_score / levels if max_score > 0 else 1.0
 
-        with open(self.root_dir + '/' + self.config.index_dir + '/' + self.config.config_file_name, 'w') as f:
-            json.dump(self.config.get_params(), f)
+        impact_ordered_dir = inverted_index.get_impact_ordered_dir()
+        if not os.path.exists(impact_ordered_dir):
+            os.mkdir(impact_ordered_dir)
+        lookup_table = {}
+        with open(impact_ordered_dir + '/' + self.config.inverted_lists_file_name + '.tmp', 'wb') as f:
+            for term in vocabulary:
+                inverted_list = inverted_index.get_inverted_list(term)
+                doc_ids = inverted_list.get_doc_ids()
+                scores = scoring_model.get_scores(term, doc_ids, inverted_list.get_dtfs())
+                non_zero = scores != 0
+                doc_ids = doc_ids[non_zero]
+                scores = scores[non_zero]
+                impacts = (np.sign(scores) * np.clip(np.ceil(np.abs(scores) / scale), 1, levels)).astype(np.int64)
+                # Sort the postings by descending impact, then by doc_id within an impact
+                order = np.lexsort((doc_ids, -impacts))
+                doc_ids = doc_ids[order]
+                impacts = impacts[order]
+                impact_ordered_list = ImpactOrderedList()
+                segment_starts = np.flatnonzero(np.diff(impacts, prepend=-1)).tolist() + [len(impacts)]
+                for segment_start, segment_end in zip(segment_starts, segment_starts[1:]):
+                    impact_ordered_list.add_segment(int(impacts[segment_start]), doc_ids[segment_start: segment_end])
+                position_in_file = f.tell()
+                list_binary, size_in_bytes = impact_ordered_list.postings_to_bytearray()
+                f.write(list_binary)
+                lookup_table[term] = {
+                    'df': impact_ordered_list.get_df(),
+                    'posting_list_position': position_in_file,
+                    'posting_list_size': size_in_bytes,
+                    'max_impact': impact_ordered_list.get_max_impact()
+                }
+        with open(impact_ordered_dir + '/' + self.config.lookup_table_file_name + '.tmp', 'wb') as f:
+            LookupTable().dump(lookup_table, f)
+        # The impacts only hold for the collection they were computed on, see InvertedIndex.get_impact_meta
+        impact_meta = {
+            'version': ImpactOrderedList.format_version,
+            'bits': self.config.impact_bits,
+            'scale': scale,
+            'k1': scoring_model.k1,
+            'b': scoring_model.b,
+            'numberOfDocs': inverted_index.get_total_docs(),
+            'totalLength': inverted_index.get_collection_length()
+        }
+        with open(impact_ordered_dir + '/' + self.config.impact_meta_file_name + '.tmp', 'w') as f:
+            json.dump(impact_meta, f)
+        for file_name in (self.config.inverted_lists_file_name, self.config.lookup_table_file_name, self.config.impact_meta_file_name):
+            os.replace(impact_ordered_dir + '/' + file_name + '.tmp', impact_ordered_dir + '/' + file_name)
 
     def remove_inverted_index_from_memory(self, inverted_index):
         """
@@ -1,4 +1,7 @@
+# Import src files
 from QueryNode import *
+from QueryResultCache import QueryResultCache
+from TopKCollector import TopKCollector
 
 
 class InferenceNetwork:
@@ -8,7 +11,12 @@ class InferenceNetwork:
         self.structured_query_operator = structured_query_operator
         self.window_size = window_size
         self.prior_type = prior_type
-        self.network_operator = self.get_operator()
+        # The network is built when the documents are retrieved, so a cached result skips reading the lists
+        self.network_operator = None
+        self.result_cache = None
+        config = inverted_index.config
+        if config.result_cache_size and inverted_index.get_generation() is not None:
+            self.result_cache = QueryResultCache.get_shared_cache(config.result_cache_size, config.result_cache_ttl)
 
     def get_operator(self):
         terms = self.query_string.split()
@@ -37,25 +45,83 @@ class InferenceNetwork:
             return MaxNode(self.inverted_index, term_nodes)
 
     def get_documents(self, count=10):
-        scores = defaultdict(int)
-        results = []
+        if self.result_cache is None:
+            return self.retrieve_documents(count)
+        key = (self.inverted_index.get_generation(), QueryResultCache.normalize_query(self.query_string),
+               self.structured_query_operator, self.window_size, self.prior_type, count)
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self.retrieve_documents(count)
+            self.result_cache.put(key, results)
+        return results
 
-        while self.network_operator.has_more():
-            doc = self.network_operator.next_candidate()
-            doc_id = doc.get_doc_id()
-            score = self.network_operator.score(doc)
-            if score:
-                scores[doc_id] = score
-            self.network_operator.skip_to(doc_id + 1)
+    def retrieve_documents(self, count=10):
+        if self.network_operator is None:
+            self.network_operator = self.get_operator()
+        results = []
 
-        scores_list = scores.items()
-        sorted_scores_list = sorted(
-            scores_list, key=lambda x: (x[1], x[0]), reverse=True)
+        top_k_collector = TopKCollector(count)
+        if self.can_use_max_score(count):
+            self.max_score_retrieval(top_k_collector)
+        else:
+            while self.network_operator.has_more():
+                doc = self.network_operator.next_candidate()
+                doc_id = doc.get_doc_id()
+                score = self.network_operator.score(doc)
+                if score:
+                    top_k_collector.add(doc_id, score)
+                self.network_operator.skip_to(doc_id + 1)
 
         # Return the meta info of the top count number of documents
-        for score in sorted_scores_list[:count]:
+        for score in top_k_collector.get_top_documents():
             doc_id = score[0]
             doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
             doc_meta['score'] = score[1]
             results.append(doc_meta)
         return results
+
+    def can_use_max_score(self, count):
+        # Pruning needs a weighted and / sum of term nodes, whose scores are bounded, with positive weights
+        operator = self.network_operator
+        return (count > 0 and isinstance(operator, (WeightedAndNode, WeightedSumNode))
+                and all(isinstance(term_node, TermNode) for term_node in operator.term_nodes)
+                and all(weight > 0 for weight in operator.weights))
+
+    def max_score_retrieval(self, top_k_collector):
+        # MaxScore retrieval of the top documents into a TopKCollector, they are the ones of an exhaustive retrieval
+        # The node scores a document with the posting of its first child on it (see next_candidate), so its
+        # score is at most the score it has when every child scores the upper bound of that child
+        # Children whose bound can't enter the top documents are non-essential, documents are only taken from
+        # the essential children and are only scored on every child once they may enter the top documents
+        operator = self.network_operator
+        children = operator.term_nodes
+        max_scores = [operator.score_from_child_score(child.get_max_score()) for child in children]
+        # Children by increasing upper bound, the first first_essential of them are non-essential
+        by_max_score = sorted(range(len(children)), key=lambda i: max_scores[i])
+        first_essential = 0
+        while True:
+            while first_essential < len(children) and not top_k_collector.may_enter(max_scores[by_max_score[first_essential]]):
+                first_essential += 1
+            essential = [i for i in by_max_score[first_essential:] if children[i].has_more()]
+            if not essential:
+                break
+            doc_id = min(children[i].next_candidate().get_doc_id() for i in essential)
+            candidate = min(i for i in essential if children[i].next_candidate().get_doc_id() == doc_id)
+            doc = children[candidate].next_candidate()
+            # The bound only calls the score of the candidate child, nothing is pruned until the collector is full
+            may_enter = not top_k_collector.is_full() or top_k_collector.may_enter(
+                operator.score_from_child_score(children[candidate].score(doc)))
+            if may_enter:
+                # A non-essential child before the candidate on the document would score it below the threshold
+                for i in by_max_score[:first_essential]:
+                    if i < candidate:
+                        children[i].skip_to(doc_id)
+                        if children[i].next_candidate().get_doc_id() == doc_id:
+                            may_enter = False
+                            break
+            if may_enter:
+                score = operator.score(doc)
+                if score:
+                    top_k_collector.add(doc_id, score)
+            for i in essential:
+                children[i].skip_to(doc_id + 1)
@@ -1,10 +1,21 @@
 # Import built-in libraries
 import os
+import json
+import mmap
 import struct
+import threading
 from collections import defaultdict
 
+# Import third-party libraries
+import numpy as np
+
 # Import src files
 from InvertedList import InvertedList
+from ImpactOrderedList import ImpactOrderedList
+from DocsMeta import DocsMeta
+from LookupTable import LookupTable
+from CodecRegistry import CodecRegistry
+from InvertedListCache import InvertedListCache
 
 
 class InvertedIndex:
@@ -24,12 +35,33 @@ class InvertedIndex:
             'numberOfDocs': 0,
             'averageLength': 0
         }
-        self._docs_meta = {}
+        self._docs_meta = DocsMeta()
+        self._doc_lengths = self._docs_meta.get_doc_lengths()
         self._lookup_table = {}
         self._vocabulary = []
         self.compressed = compressed
         self.root_dir = os.path.dirname(
             os.path.dirname(os.path.abspath(__file__)))
+        self._inverted_lists_file = None
+        self._inverted_lists_mmap = None
+        # Reads of the inverted lists files without a memory map seek the file shared by all of them
+        self._inverted_lists_lock = threading.Lock()
+        self._segments = []
+        self._codecs = None
+        # Normalizations of the document lengths used by scoring models, keyed by the normalization and its params
+        self._doc_length_normalizations = {}
+        self._doc_length_normalization_lists = {}
+        # Generation of the index on disk this index was loaded from, None if it wasn't loaded by an Indexer
+        self._generation = None
+        # Cache of lists read from disk, only used when the lists aren't held in memory
+        self._list_cache = None
+        if config.list_cache_size and not config.in_memory:
+            self._list_cache = InvertedListCache(config.list_cache_size * 1024 * 1024)
+        # Quantization, lookup table and lists file of the impact-ordered index, opened together on first use
+        self._impact_meta = None
+        self._impact_lookup_table = None
+        self._impact_lists_file = None
+        self._impact_lists_mmap = None
 
     def get_collection_stats(self):
         """
@@ -77,16 +109,17 @@ class InvertedIndex:
 
     def get_docs_meta(self):
         """
-        Returns the docs meta dictionary
+        Returns the docs meta store
         """
         return self._docs_meta
 
     def load_docs_meta(self, docs_meta):
         """
-        Loads the docs meta dictionary into the index
-        dict docs_meta: Dictionary containing the meta info for documents in the dataset
+        Loads the docs meta store into the index
+        class docs_meta: Instance of DocsMeta containing the meta info for documents in the dataset
         """
         self._docs_meta = docs_meta
+        self._doc_lengths = docs_meta.get_doc_lengths()
 
     def update_docs_meta(self, doc_id, doc_meta):
         """
@@ -94,21 +127,54 @@ class InvertedIndex:
         int doc_id: ID of the active document
         dict doc_meta: Dictionary of playId, sceneId, sceneNum and sceneLength of the document
         """
-        self._docs_meta[str(doc_id)] = doc_meta
+        self._docs_meta.update_doc_meta(doc_id, doc_meta)
 
     def get_doc_meta(self, doc_id):
         """
         Returns the meta info of the document with the given doc_id
         int doc_id: ID of the document to lookup
         """
-        return self._docs_meta[str(doc_id)]
+        return self._docs_meta.get_doc_meta(doc_id)
 
     def get_doc_length(self, doc_id):
         """
         Returns the length of a document with the given doc_id
         int doc_id: ID of the document to lookup
         """
-        return self._docs_meta[str(doc_id)]['sceneLength']
+        return self._doc_lengths[doc_id]
+
+    def get_doc_length_normalization(self, key, normalize):
+        """
+        Returns the list of a normalization of the length of every document, indexed by doc_id
+        A normalization is computed once for all documents and kept with the index for later queries
+        tuple key: Name of the normalization followed by the params it depends on
+        function normalize: Function from the NumPy array of document lengths to the array of normalized lengths
+        """
+        list_key = key + (len(self._doc_lengths),)
+        doc_length_normalization = self._doc_length_normalization_lists.get(list_key)
+        if doc_length_normalization is None:
+            doc_length_normalization = self.get_doc_length_normalization_array(key, normalize).tolist()
+            self._doc_length_normalization_lists[list_key] = doc_length_normalization
+        return doc_length_normalization
+
+    def get_doc_length_normalization_array(self, key, normalize):
+        """
+        Returns the NumPy array of a normalization of the length of every document, indexed by doc_id
+        tuple key: Name of the normalization followed by the params it depends on
+        function normalize: Function from the NumPy array of document lengths to the array of normalized lengths
+        """
+        array_key = key + (len(self._doc_lengths),)
+        doc_length_normalization = self._doc_length_normalizations.get(array_key)
+        if doc_length_normalization is None:
+            doc_length_normalization = normalize(self.get_doc_lengths_array())
+            self._doc_length_normalizations[array_key] = doc_length_normalization
+        return doc_length_normalization
+
+    def get_doc_lengths_array(self):
+        """
+        Returns a NumPy view of the lengths of every document, indexed by doc_id
+        """
+        return np.frombuffer(self._doc_lengths, dtype=np.int32)
 
     def get_map(self):
         """
@@ -139,7 +205,7 @@ class InvertedIndex:
         # Add or update the InvertedList corresponding to the term
         inverted_list = self._map[term]
         inverted_list.add_posting(doc_id, position)
-        df = len(inverted_list.get_postings())
+        df = inverted_list.get_df()
         self.add_to_lookup_table(term, df=df)
 
     def get_lookup_table(self):
@@ -151,55 +217,144 @@ class InvertedIndex:
     def load_lookup_table(self, lookup_table):
         """
         Loads a lookup table in the index
-        dict lookup_table: Lookup table to load in the index
+        class lookup_table: Instance of the binary LookupTable read from disk to load in the index
         """
         self._lookup_table = lookup_table
 
-    def add_to_lookup_table(self, term, df):
+    def add_to_lookup_table(self, term, df, ctf=1):
         """
         Adds a new {term: term_info} to the lookup table
         str term: Term to add to the lookup table
         int df: Document Frequency of the term
+        int ctf: Number of new occurrences of the term to add to its Collection Term Frequency
         """
         if term not in self._lookup_table:
             self._lookup_table[term] = {
-                'ctf': 1,
+                'ctf': ctf,
                 'df': df
             }
         else:
-            self._lookup_table[term]['ctf'] += 1
+            self._lookup_table[term]['ctf'] += ctf
             self._lookup_table[term]['df'] = df
 
-    def update_lookup_table(self, term, posting_list_position, posting_list_size):
+    def update_lookup_table(self, term, posting_list_position, posting_list_size, max_dtf, min_doc_length):
         """
         Modifies the entry for the given term in the lookup table
         str term: Term for which the info is to be modified
         int posting_list_position: Position of the inverted list in the binary file
         int posting_list_size: Size (in bytes) of the inverted list in the binary file
+        int max_dtf: Largest dtf in the inverted list
+        int min_doc_length: Length of the shortest document in the inverted list, 0 if it isn't known
         """
         self._lookup_table[term]['posting_list_position'] = posting_list_position
         self._lookup_table[term]['posting_list_size'] = posting_list_size
+        self._lookup_table[term]['max_dtf'] = max_dtf
+        self._lookup_table[term]['min_doc_length'] = min_doc_length
+
+    def set_df(self, term, df):
+        """
+        Sets the document frequency of the given term in the lookup table
+        str term: Term for which the DF is to be set
+        int df: Document Frequency of the term
+        """
+        self._lookup_table[term]['df'] = df
 
     def get_ctf(self, term):
         """
         Returns collection term frequency - number of times the word occurs in the collection
         str term: Term to get the CTF for
         """
-        return self._lookup_table[term]['ctf']
+        if not self._segments:
+            return self._lookup_table.get_ctf(term)
+        return self.get_term_stat_from_segments(term, 'ctf')
 
     def get_df(self, term):
         """
         Returns document frequency - number of documents (== postings) in the inverted list
         str term: Term to get the DF for
         """
-        return self._lookup_table[term]['df']
+        if not self._segments:
+            return self._lookup_table.get_df(term)
+        return self.get_term_stat_from_segments(term, 'df')
+
+    def get_max_dtf(self, term):
+        """
+        Returns the largest dtf in the inverted list of the term
+        str term: Term to get the largest dtf for
+        """
+        if not self._segments:
+            return self._lookup_table.get_max_dtf(term)
+        return self.get_term_stat_from_segments(term, 'max_dtf', max)
+
+    def get_min_doc_length(self, term):
+        """
+        Returns the length of the shortest document in the inverted list of the term, 0 if it isn't known
+        str term: Term to get the shortest document length for
+        """
+        if not self._segments:
+            return self._lookup_table.get_min_doc_length(term)
+        return self.get_term_stat_from_segments(term, 'min_doc_length', min)
+
+    def get_term_stat_from_segments(self, term, column, aggregate=sum):
+        """
+        Returns a lookup table column for a term aggregated over this index and its segments
+        Raises KeyError if the term is not present in any of them
+        str term: Term to lookup
+        str column: Name of the lookup table column
+        function aggregate: Function which combines the values of every index, sum by default
+        """
+        values = []
+        for index in [self] + self._segments:
+            lookup_table = index.get_lookup_table()
+            if term in lookup_table:
+                values.append(lookup_table.get_value(term, column))
+        if not values:
+            raise KeyError(term)
+        return aggregate(values)
+
+    def get_segments(self):
+        """
+        Returns the segments whose inverted lists are appended to the lists of this index
+        """
+        return self._segments
+
+    def load_segments(self, segments):
+        """
+        Loads segments into the index, their doc_ids must follow the doc_ids of this index in order
+        list segments: List of Segment instances
+        """
+        self._segments = segments
+        # Cached lists were read without the new segments
+        if self._list_cache is not None:
+            self._list_cache.clear()
+
+    def get_generation(self):
+        """
+        Returns the generation of the index on disk this index was loaded from, None if it is unknown
+        """
+        return self._generation
+
+    def set_generation(self, generation):
+        """
+        Sets the generation of the index on disk this index was loaded from
+        tuple generation: Generation of the index, see Indexer.get_index_generation
+        """
+        self._generation = generation
+
+    def get_list_cache_stats(self):
+        """
+        Returns the statistics of the cache of inverted lists read from disk, None if the cache is not used
+        """
+        if self._list_cache is None:
+            return None
+        return self._list_cache.get_stats()
 
     def get_posting_list_position(self, term):
         """
         Returns starting position of the inverted list in the inverted_lists file
         str term: Term to get the inverted list position for
         """
-        return self._lookup_table[term]['posting_list_position']
+        return self._lookup_table.get_posting_list_position(term)
 
     def set_posting_list_position(self, term, position_in_file):
         """
@@ -214,7 +369,7 @@ class InvertedIndex:
         Returns size of the inverted list in bytes
         str term: Term to get the size of the inverted list for
         """
-        return self._lookup_table[term]['posting_list_size']
+        return self._lookup_table.get_posting_list_size(term)
 
     def read_inverted_list_from_file(self, inverted_lists_file, posting_list_position, posting_list_size):
         """
@@ -228,24 +383,226 @@ class InvertedIndex:
             inverted_lists_file.read(posting_list_size))
         return inverted_list_binary
 
+    def get_inverted_lists_file_path(self):
+        """
+        Returns the path of the inverted lists file for this index on disk
+        """
+        dir_name = self.config.uncompressed_dir
+        if self.compressed:
+            dir_name = self.config.compressed_dir
+        return self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.inverted_lists_file_name
+
+    def open_inverted_lists(self):
+        """
+        Opens the inverted lists file, memory-mapped if mmap_lists is set, and holds it until the index is closed
+        It is opened along with the lookup table, so the lists are read from the file the lookup table describes
+        even once a merge or a rebuild replaces that file on disk. The file system keeps a replaced file until
+        the last index holding it is closed
+        """
+        if self._inverted_lists_file is None:
+            self._inverted_lists_file = open(self.get_inverted_lists_file_path(), 'rb')
+        if self.config.mmap_lists:
+            self.open_inverted_lists_mmap()
+
+    def open_inverted_lists_mmap(self):
+        """
+        Memory-maps the inverted lists file once and returns the map, it is reused by all later reads
+        """
+        if self._inverted_lists_mmap is None:
+            if self._inverted_lists_file is None:
+                self._inverted_lists_file = open(self.get_inverted_lists_file_path(), 'rb')
+            # An empty file cannot be memory-mapped, so fall back to an empty buffer
+            if os.fstat(self._inverted_lists_file.fileno()).st_size:
+                self._inverted_lists_mmap = mmap.mmap(self._inverted_lists_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._inverted_lists_mmap = b''
+        return self._inverted_lists_mmap
+
+    def read_inverted_list_from_mmap(self, posting_list_position, posting_list_size):
+        """
+        Returns a zero-copy view of an inverted list in the memory-mapped inverted lists file
+        int posting_list_position: Position of the inverted list in the binary file
+        int posting_list_size: Size of the inverted list in bytes
+        """
+        inverted_lists_mmap = self.open_inverted_lists_mmap()
+        return memoryview(inverted_lists_mmap)[posting_list_position: posting_list_position + posting_list_size]
+
+    def close(self):
+        """
+        Closes the memory-mapped inverted lists and lookup table files if they are open, along with the ones
+        of the impact-ordered index
+        """
+        if isinstance(self._lookup_table, LookupTable):
+            self._lookup_table.close()
+        for segment in self._segments:
+            segment.close()
+        if isinstance(self._inverted_lists_mmap, mmap.mmap):
+            self._inverted_lists_mmap.close()
+        self._inverted_lists_mmap = None
+        if self._inverted_lists_file is not None:
+            self._inverted_lists_file.close()
+            self._inverted_lists_file = None
+        if self._impact_lookup_table is not None:
+            self._impact_lookup_table.close()
+            self._impact_lookup_table = None
+            self._impact_meta = None
+        if isinstance(self._impact_lists_mmap, mmap.mmap):
+            self._impact_lists_mmap.close()
+        self._impact_lists_mmap = None
+        if self._impact_lists_file is not None:
+            self._impact_lists_file.close()
+            self._impact_lists_file = None
+
+    def get_codecs(self):
+        """
+        Returns the codecs for doc_id gaps, dtfs and position gaps of the compressed inverted lists
+        """
+        if self._codecs is None:
+            self._codecs = (
+                CodecRegistry.get_codec(self.config.doc_gaps_codec),
+                CodecRegistry.get_codec(self.config.dtfs_codec),
+                CodecRegistry.get_codec(self.config.positions_codec)
+            )
+        return self._codecs
+
+    def read_inverted_list(self, term):
+        """
+        Returns the inverted list for the given term read from the inverted lists file of this index
+        str term: Term to get the inverted list for
+        """
+        posting_list_position = self._lookup_table.get_posting_list_position(term)
+        posting_list_size = self._lookup_table.get_posting_list_size(term)
+        df = self._lookup_table.get_df(term)
+        inverted_list = InvertedList()
+        if self.config.mmap_lists:
+            # Decode straight from the memory map, the view is released once the postings are built
+            inverted_list_binary = self.read_inverted_list_from_mmap(posting_list_position, posting_list_size)
+            inverted_list.bytearray_to_postings(inverted_list_binary, self.compressed, df, self.get_codecs())
+            inverted_list_binary.release()
+            return inverted_list
+        self.open_inverted_lists()
+        with self._inverted_lists_lock:
+            inverted_list_binary = self.read_inverted_list_from_file(
+                self._inverted_lists_file, posting_list_position, posting_list_size)
+        inverted_list.bytearray_to_postings(inverted_list_binary, self.compressed, df, self.get_codecs())
+        return inverted_list
+
+    def read_inverted_list_with_segments(self, term):
+        """
+        Returns the inverted list for the given term read from the disk
+        The postings of the term in every segment are appended after the postings in this index
+        str term: Term to get the inverted list for
+        """
+        if not self._segments:
+            return self.read_inverted_list(term)
+        # Raises KeyError if the term is not present anywhere
+        self.get_df(term)
+        inverted_list = InvertedList()
+        for index in [self] + self._segments:
+            if term in index.get_lookup_table():
+                inverted_list.extend(index.read_inverted_list(term))
+        return inverted_list
+
     def get_inverted_list(self, term):
         """
         Returns an inverted list read from the disk for the given term
+        If a list cache is configured, recently used lists are returned from it along with the blocks
+        they have already decoded
         str term: Term to get the inverted list for
         """
         if not self.config.in_memory:
-            term_stats = self._lookup_table[term]
-            dir_name = self.config.uncompressed_dir
-            if self.compressed:
-                dir_name = self.config.compressed_dir
-            with open(self.root_dir + '/' + self.config.index_dir + '/' + dir_name + '/' + self.config.inverted_lists_file_name, 'rb') as inverted_lists_file:
-                inverted_list_binary = self.read_inverted_list_from_file(inverted_lists_file, term_stats['posting_list_position'], term_stats['posting_list_size'])
-                inverted_list = InvertedList()
-                inverted_list.bytearray_to_postings(inverted_list_binary, self.compressed, term_stats['df'])
-                return inverted_list
+            if self._list_cache is None:
+                return self.read_inverted_list_with_segments(term)
+            inverted_list = self._list_cache.get(term)
+            if inverted_list is None:
+                inverted_list = self.read_inverted_list_with_segments(term)
+                self._list_cache.put(term, inverted_list, self.get_df(term), self.get_ctf(term))
+            return inverted_list
+        elif self.config.lazy_lists and term not in self._map:
+            return self.load_inverted_list_lazily(term)
         else:
             return self._map[term]
 
+    def load_inverted_list_lazily(self, term):
+        """
+        Returns the inverted list of a term of a lazily loaded in-memory index, read from the disk on first access
+        The list is kept in the map if lists are pinned, otherwise it is read again on the next access
+        A term which is not in the index gets an empty list, like any other term missing from the map
+        str term: Term to get the inverted list for
+        """
+        if term not in self._lookup_table and not any(term in segment.get_lookup_table() for segment in self._segments):
+            return InvertedList()
+        inverted_list = self.read_inverted_list_with_segments(term)
+        if self.config.pin_lists:
+            self._map[term] = inverted_list
+        return inverted_list
+
+    def get_impact_ordered_dir(self):
+        """
+        Returns the path of the directory of the impact-ordered index on disk
+        """
+        return self.root_dir + '/' + self.config.index_dir + '/' + self.config.impact_dir
+
+    def get_impact_meta(self):
+        """
+        Returns the quantization of the impact-ordered index, which is loaded with its lookup table on first call
+        The lists file is opened along with the lookup table and held until the index is closed, like the inverted lists
+        Raises ValueError if the impact-ordered index hasn't been built, is in another format or doesn't hold the
+        documents of this index
+        """
+        if self._impact_meta is None:
+            impact_ordered_dir = self.get_impact_ordered_dir()
+            try:
+                with open(impact_ordered_dir + '/' + self.config.impact_meta_file_name, 'r') as impact_meta_file:
+                    impact_meta = json.load(impact_meta_file)
+            except FileNotFoundError:
+                raise ValueError('The impact-ordered index has not been built, build the index with impact_ordered set')
+            if impact_meta.get('version') != ImpactOrderedList.format_version:
+                raise ValueError('The impact-ordered index is in another format, load the index with impact_ordered set to rebuild it')
+            # Adding documents changes the collection stats, the impacts are then rebuilt by the next Indexer
+            if (impact_meta['numberOfDocs'], impact_meta['totalLength']) != (self.get_total_docs(), self.get_collection_length()):
+                raise ValueError('The impact-ordered index is stale, load the index with impact_ordered set to rebuild it')
+            with open(impact_ordered_dir + '/' + self.config.lookup_table_file_name, 'rb') as lookup_table_file:
+                self._impact_lookup_table = LookupTable()
+                self._impact_lookup_table.load(lookup_table_file)
+            self._impact_lists_file = open(impact_ordered_dir + '/' + self.config.inverted_lists_file_name, 'rb')
+            if self.config.mmap_lists:
+                self.open_impact_lists_mmap()
+            self._impact_meta = impact_meta
+        return self._impact_meta
+
+    def open_impact_lists_mmap(self):
+        """
+        Memory-maps the lists file of the impact-ordered index once and returns the map
+        """
+        if self._impact_lists_mmap is None:
+            # An empty file cannot be memory-mapped, so fall back to an empty buffer
+            if os.fstat(self._impact_lists_file.fileno()).st_size:
+                self._impact_lists_mmap = mmap.mmap(self._impact_lists_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._impact_lists_mmap = b''
+        return self._impact_lists_mmap
+
+    def get_impact_ordered_list(self, term):
+        """
+        Returns the impact-ordered list of a term read from the impact-ordered index on disk
+        A term whose postings all score 0 has an empty list
+        str term: Term to get the impact-ordered list for
+        """
+        self.get_impact_meta()
+        posting_list_position = self._impact_lookup_table.get_posting_list_position(term)
+        posting_list_size = self._impact_lookup_table.get_posting_list_size(term)
+        impact_ordered_list = ImpactOrderedList()
+        if self.config.mmap_lists:
+            list_binary = memoryview(self.open_impact_lists_mmap())[posting_list_position: posting_list_position + posting_list_size]
+            impact_ordered_list.bytearray_to_segments(list_binary)
+            list_binary.release()
+            return impact_ordered_list
+        with self._inverted_lists_lock:
+            list_binary = self.read_inverted_list_from_file(self._impact_lists_file, posting_list_position, posting_list_size)
+        impact_ordered_list.bytearray_to_segments(list_binary)
+        return impact_ordered_list
+
     def get_prior(self, prior_type, doc_id):
         """
         Returns the prior for a doc with the given doc ID
@@ -267,7 +624,10 @@ class InvertedIndex:
         """
         Loads the vocabulary in the index
         """
-        self._vocabulary = list(self._lookup_table.keys())
+        vocabulary = set(self._lookup_table.keys())
+        for segment in self._segments:
+            vocabulary.update(segment.get_lookup_table().keys())
+        self._vocabulary = list(vocabulary)
         self._vocabulary.sort()
 
     def get_vocabulary(self):
@@ -1,18 +1,42 @@
 # Import built-in libraries
-import struct
+from array import array
+
+# Import third-party libraries
+import numpy as np
 
 # Import src files
-from Posting import Posting
+from PostingsBlock import PostingsBlock
+from PostingsCursor import PostingsCursor
+from VByteCodec import VByteCodec
 import utils
 
 
 class InvertedList:
     """
     Class which exposes APIs for operation on an inverted list
+    The postings are held as parallel arrays of doc_ids and dtfs and one flat array of positions instead of an
+    object per posting, and are read through a PostingsCursor
+    On disk the doc_ids and dtfs of a list are stored apart from its positions, so the positions are only
+    decoded when they are asked for. Compressed lists are also stored as blocks of postings behind a skip
+    table, so a block is only decoded once a posting in it is needed. The doc_id gaps, dtfs and position gaps
+    of a compressed block are each encoded with their own codec, vbyte unless other codecs are given
+    The skip table also holds the largest dtf and the shortest document length of every block, which bound the
+    score of the postings in the block without decoding it. Uncompressed lists are split into blocks of the same
+    size once read
     """
 
+    # Number of postings in a block of a compressed inverted list
+    block_size = 128
+    # Codecs for doc_id gaps, dtfs and position gaps when none are given
+    default_codecs = (VByteCodec(), VByteCodec(), VByteCodec())
+
     def __init__(self):
-        self._postings = []
+        # Arrays of a list built in memory, None once the list is made of blocks read from disk
+        self._doc_ids = array('i')
+        self._dtfs = array('i')
+        self._positions = array('i')
+        # Instances of PostingsBlock, for a list built in memory a single block is made from the arrays when needed
+        self._blocks = None
 
     def add_posting(self, doc_id, position):
         """
@@ -20,10 +44,12 @@ class InvertedList:
         int doc_id: ID of the document to be added or modified
         int position: Position of the term in the document
         """
-        if not len(self._postings) or self._postings[-1].get_doc_id() != doc_id:
-            new_posting = Posting(doc_id)
-            self._postings.append(new_posting)
-        self._postings[-1].update_term_positions(position)
+        if not len(self._doc_ids) or self._doc_ids[-1] != doc_id:
+            self._doc_ids.append(doc_id)
+            self._dtfs.append(0)
+        self._dtfs[-1] += 1
+        self._positions.append(position)
+        self._blocks = None
 
     def add_posting_with_positions(self, doc_id, positions):
         """
@@ -31,127 +57,225 @@ class InvertedList:
         int doc_id: ID of the document to be added or modified
         int[] positions: Positions of the term in the document
         """
-        new_posting = Posting(doc_id)
-        new_posting.set_term_positions(positions)
-        self._postings.append(new_posting)
+        self._doc_ids.append(doc_id)
+        self._dtfs.append(len(positions))
+        self._positions.extend(positions)
+        self._blocks = None
+
+    def extend(self, inverted_list):
+        """
+        Appends the postings of another inverted list, its doc_ids must be greater than the doc_ids in this list
+        class inverted_list: Inverted list to append
+        """
+        if self._doc_ids is not None and inverted_list._doc_ids is not None:
+            self._doc_ids.extend(inverted_list._doc_ids)
+            self._dtfs.extend(inverted_list._dtfs)
+            self._positions.extend(inverted_list._positions)
+            self._blocks = None
+            return
+        # Keep the blocks of both lists so the blocks appended are still decoded only when needed
+        self._blocks = self.get_blocks() + inverted_list.get_blocks()
+        self._doc_ids = None
+        self._dtfs = None
+        self._positions = None
+
+    def get_blocks(self):
+        """
+        Returns the list of PostingsBlock of the inverted list, a list built in memory is returned as one block
+        """
+        if self._blocks is None:
+            self._blocks = []
+            if len(self._doc_ids):
+                block = PostingsBlock(self._doc_ids[-1], len(self._doc_ids))
+                block.set_arrays(np.array(self._doc_ids, dtype=np.int64), np.array(self._dtfs, dtype=np.int64),
+                                 np.array(self._positions, dtype=np.int64))
+                self._blocks.append(block)
+        return self._blocks
+
+    def get_cursor(self):
+        """
+        Returns a new PostingsCursor on the first posting of the inverted list
+        """
+        return PostingsCursor(self)
+
+    def get_df(self):
+        """
+        Returns the number of postings in the inverted list - Document Frequency
+        """
+        if self._doc_ids is not None:
+            return len(self._doc_ids)
+        return sum(block.get_number_of_postings() for block in self._blocks)
+
+    def get_ctf(self):
+        """
+        Returns the number of occurrences of the term in the inverted list - Collection Term Frequency
+        """
+        if self._dtfs is not None:
+            return sum(self._dtfs)
+        return sum(int(block.get_dtfs().sum()) for block in self._blocks)
+
+    def get_max_dtf(self):
+        """
+        Returns the largest dtf in the inverted list
+        """
+        return max((block.get_max_dtf() for block in self.get_blocks()), default=0)
+
+    def get_min_doc_length(self, doc_lengths):
+        """
+        Returns the length of the shortest document in the inverted list
+        array doc_lengths: NumPy array of the lengths of every document
+        """
+        return min((block.get_min_doc_length(doc_lengths) for block in self.get_blocks()), default=0)
 
-    def postings_to_bytearray(self, compressed):
+    def get_doc_ids(self):
+        """
+        Returns the NumPy array of doc_ids in the inverted list, every block not decoded yet is decoded
+        """
+        return self.concatenate_blocks(PostingsBlock.get_doc_ids)
+
+    def get_dtfs(self):
+        """
+        Returns the NumPy array of dtfs in the inverted list, every block not decoded yet is decoded
+        """
+        return self.concatenate_blocks(PostingsBlock.get_dtfs)
+
+    def get_positions(self):
+        """
+        Returns the NumPy array of positions of every posting one after the other
+        """
+        return self.concatenate_blocks(PostingsBlock.get_positions)
+
+    def get_position_offsets(self):
+        """
+        Returns the NumPy array of offsets of the positions of every posting in the array of positions
+        The positions of the posting at index i are positions[offsets[i]: offsets[i + 1]]
+        """
+        dtfs = self.get_dtfs()
+        position_offsets = np.zeros(len(dtfs) + 1, dtype=np.int64)
+        np.cumsum(dtfs, out=position_offsets[1:])
+        return position_offsets
+
+    def concatenate_blocks(self, get_array):
+        """
+        Returns the arrays of every block joined into one
+        function get_array: Method of PostingsBlock which returns the array of a block
+        """
+        blocks = self.get_blocks()
+        if len(blocks) == 1:
+            return get_array(blocks[0])
+        if not blocks:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([get_array(block) for block in blocks])
+
+    def postings_to_bytearray(self, compressed, codecs=None, doc_lengths=None):
         """
         Converts the inverted list to a bytearray and returns the bytearray
+        An uncompressed list holds (doc_id, dtf) pairs followed by the positions of every posting
+        A compressed list holds a skip table followed by its blocks, see bytearray_to_postings
         bool compressed: Flag to choose between a compressed / uncompressed inverted list
+        tuple codecs: Codecs for doc_id gaps, dtfs and position gaps of a compressed list, vbyte by default
+        array doc_lengths: NumPy array of the lengths of every document, the shortest document length of
+                           a block is stored as 0 if it isn't given
         """
-        # Initialize an empty bytearray
-        inverted_list_binary = bytearray()
-        size_in_bytes = 0
+        doc_ids = self.get_doc_ids()
+        dtfs = self.get_dtfs()
+        positions = self.get_positions()
+        df = len(doc_ids)
         if not compressed:
             # print('Using uncompressed list for encoding')
-            for posting in self._postings:
-                # Convert document ID to binary using little-endian byte-order and integer format
-                format_doc_id = '<i'
-                doc_id_binary = struct.pack(
-                    format_doc_id, posting.get_doc_id())
-                size_in_bytes += struct.calcsize(format_doc_id)
-
-                # Convert document term frequency to binary
-                format_dtf = '<i'
-                dtf_binary = struct.pack(format_dtf, posting.get_dtf())
-                size_in_bytes += struct.calcsize(format_dtf)
-
-                # Convert term positions to binary
-                format_positions = '<' + str(posting.get_dtf()) + 'i'
-                positions_binary = struct.pack(
-                    format_positions, *posting.get_term_positions())
-                size_in_bytes += struct.calcsize(format_positions)
-
-                inverted_list_binary += doc_id_binary + dtf_binary + positions_binary
+            values = np.empty(2 * df + len(positions), dtype='<i4')
+            values[0: 2 * df: 2] = doc_ids
+            values[1: 2 * df: 2] = dtfs
+            values[2 * df:] = positions
+            # Convert doc IDs, dtfs and term positions to binary using little-endian byte-order and integer format
+            inverted_list_binary = bytearray(values.tobytes())
+            size_in_bytes = len(inverted_list_binary)
         else:
             # print('Using compressed list for encoding')
-            num_list = []
+            # The skip table holds the number of blocks followed by the last doc_id (delta-encoded), number of
+            # postings, largest dtf, shortest document length and sizes in bytes of the doc_id gaps, dtfs and
+            # position gaps of every block
+            doc_gaps_codec, dtfs_codec, positions_codec = codecs or self.default_codecs
+            position_offsets = self.get_position_offsets()
+            # Delta-encode the positions, the deltas start over in every posting
+            position_gaps = np.diff(positions, prepend=0)
+            position_gaps[position_offsets[:-1]] = positions[position_offsets[:-1]]
+            skip_table = [(df + self.block_size - 1) // self.block_size]
+            blocks_binary = bytearray()
             previous_doc_id = 0
-            for posting in self._postings:
-                # Append the delta-encoded doc IDs
-                doc_id = posting.get_doc_id()
-                num_list.append(doc_id - previous_doc_id)
-
-                # Append the dtf next
-                dtf = posting.get_dtf()
-                num_list.append(dtf)
-
-                # Append the delta-encoded positions next
-                positions = posting.get_term_positions()
-                delta_encoded_postions = utils.delta_encode(positions)
-                num_list += delta_encoded_postions
-
-                # Update previous doc_id
-                previous_doc_id = doc_id
-            inverted_list_binary, size_in_bytes = utils.vbyte_encode(num_list)
+            for block_start in range(0, df, self.block_size):
+                block_end = min(block_start + self.block_size, df)
+                block_doc_ids = doc_ids[block_start: block_end]
+                doc_gaps = np.diff(block_doc_ids, prepend=previous_doc_id)
+                block_position_gaps = position_gaps[position_offsets[block_start]: position_offsets[block_end]]
+                doc_gaps_binary, doc_gaps_size_in_bytes = doc_gaps_codec.encode(doc_gaps.tolist())
+                dtfs_binary, dtfs_size_in_bytes = dtfs_codec.encode(dtfs[block_start: block_end].tolist())
+                positions_binary, positions_size_in_bytes = positions_codec.encode(block_position_gaps.tolist())
+                last_doc_id = int(block_doc_ids[-1])
+                max_dtf = int(dtfs[block_start: block_end].max())
+                # A document length of 0 still bounds the score of the block if the lengths aren't known
+                min_doc_length = 0
+                if doc_lengths is not None and last_doc_id < len(doc_lengths):
+                    min_doc_length = int(doc_lengths[block_doc_ids].min())
+                skip_table += [last_doc_id - previous_doc_id, block_end - block_start, max_dtf, min_doc_length,
+                               doc_gaps_size_in_bytes, dtfs_size_in_bytes, positions_size_in_bytes]
+                blocks_binary += doc_gaps_binary + dtfs_binary + positions_binary
+                previous_doc_id = last_doc_id
+            inverted_list_binary, size_in_bytes = utils.vbyte_encode(skip_table)
+            inverted_list_binary += blocks_binary
+            size_in_bytes += len(blocks_binary)
         return (inverted_list_binary, size_in_bytes)
 
-    def bytearray_to_postings(self, inverted_list_binary, compressed, df):
+    def bytearray_to_postings(self, inverted_list_binary, compressed, df, codecs=None):
         """
-        Converts the bytearray to a postings list and sets the postings in the inverted list
+        Sets the postings in the inverted list from a bytearray
+        Only the layout of the list is read here, the postings are decoded when they are first needed
         buffer inverted_list_binary: A buffer for the inverted list read from disk
         bool compressed: Flag to choose between a compressed / uncompressed inverted list
         int df: Number of documents in the inverted list - Document Frequency
+        tuple codecs: Codecs the compressed list was encoded with, vbyte by default
         """
-        # While fetching positions in a document use tuple instead of list - faster than list
-        size_in_bytes = 0
+        self._blocks = []
+        self._doc_ids = None
+        self._dtfs = None
+        self._positions = None
         if not compressed:
             # print('Using uncompressed list for decoding')
-            # Loop over all postings
-            for _ in range(df):
-                # Convert binary to document ID using little-endian byte-order and integer format
-                format_doc_id = '<i'
-                doc_id = struct.unpack_from(
-                    format_doc_id, inverted_list_binary, size_in_bytes)[0]
-                size_in_bytes += struct.calcsize(format_doc_id)
-
-                # Convert binary to document term frequency
-                format_dtf = '<i'
-                dtf = struct.unpack_from(
-                    format_dtf, inverted_list_binary, size_in_bytes)[0]
-                size_in_bytes += struct.calcsize(format_dtf)
-
-                # Convert binary to term positions
-                format_positions = '<' + str(dtf) + 'i'
-                positions = list(struct.unpack_from(
-                    format_positions, inverted_list_binary, size_in_bytes))
-                size_in_bytes += struct.calcsize(format_positions)
-
-                posting = Posting(doc_id)
-                posting.set_term_positions(positions)
-                self._postings.append(posting)
+            # Read the whole list as one array of ints, (doc_id, dtf) pairs are followed by the positions
+            # The arrays are copies, the buffer may be a view of a memory-mapped file which is released after this call
+            values = np.frombuffer(inverted_list_binary, dtype='<i4').astype(np.int64)
+            doc_ids = values[0: 2 * df: 2]
+            dtfs = values[1: 2 * df: 2]
+            positions = values[2 * df:]
+            # Split the list into blocks, so the score of a block can be bounded by its largest dtf
+            block_starts = np.arange(0, df, self.block_size)
+            max_dtfs = np.maximum.reduceat(dtfs, block_starts).tolist()
+            position_offsets = np.zeros(df + 1, dtype=np.int64)
+            np.cumsum(dtfs, out=position_offsets[1:])
+            for block_start, max_dtf in zip(block_starts.tolist(), max_dtfs):
+                block_end = min(block_start + self.block_size, df)
+                block = PostingsBlock(int(doc_ids[block_end - 1]), block_end - block_start, max_dtf=max_dtf)
+                block.set_arrays(doc_ids[block_start: block_end], dtfs[block_start: block_end],
+                                 positions[position_offsets[block_start]: position_offsets[block_end]])
+                self._blocks.append(block)
         else:
             # print('Using compressed list for decoding')
-            vbyte_decoded_inverted_list = utils.vbyte_decode(
-                inverted_list_binary)
-            pointer = 0
+            number_of_blocks, pointer = utils.vbyte_decode_count(inverted_list_binary, 1)
+            skip_table, pointer = utils.vbyte_decode_count(inverted_list_binary, 7 * number_of_blocks[0], pointer)
+            # Copy the blocks, the buffer may be a view of a memory-mapped file which is released after this call
+            blocks_binary = memoryview(bytes(inverted_list_binary[pointer:]))
             previous_doc_id = 0
-            for _ in range(df):
-                # Add delta to the previous doc_id to get current doc_id
-                delta = vbyte_decoded_inverted_list[pointer]
-                doc_id = delta + previous_doc_id
-                pointer += 1
-
-                # Get dtf
-                dtf = vbyte_decoded_inverted_list[pointer]
-                pointer += 1
-
-                # Get delta-decoded positions
-                delta_encoded_positions = vbyte_decoded_inverted_list[pointer: pointer + dtf]
-                positions = utils.delta_decode(delta_encoded_positions)
-                pointer += dtf
-
-                # Create posting
-                posting = Posting(doc_id)
-                posting.set_term_positions(positions)
-                self._postings.append(posting)
-
-                # Update previous doc_id
-                previous_doc_id = doc_id
-
-    def get_postings(self):
-        """
-        Returns the list of postings in the inverted list
-        """
-        return self._postings
+            block_position = 0
+            codecs = codecs or self.default_codecs
+            for i in range(0, len(skip_table), 7):
+                last_doc_id = previous_doc_id + skip_table[i]
+                number_of_postings, max_dtf, min_doc_length = skip_table[i + 1: i + 4]
+                region_binaries = []
+                for size_in_bytes in skip_table[i + 4: i + 7]:
+                    region_binaries.append(blocks_binary[block_position: block_position + size_in_bytes])
+                    block_position += size_in_bytes
+                doc_gaps_binary, dtfs_binary, positions_binary = region_binaries
+                self._blocks.append(PostingsBlock(last_doc_id, number_of_postings, previous_doc_id, codecs,
+                                                  (doc_gaps_binary, dtfs_binary), positions_binary,
+                                                  max_dtf, min_doc_length))
+                previous_doc_id = last_doc_id
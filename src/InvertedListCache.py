@@ -0,0 +1,105 @@
+# Import built-in libraries
+import threading
+from collections import OrderedDict
+
+
+class InvertedListCache:
+    """
+    Class for a least recently used cache of inverted lists read from disk, keyed by term
+    The cache is bounded by the estimated memory taken by its lists, the least recently used lists are
+    evicted once a new list takes it over budget
+    """
+
+    # Rough in-memory cost (bytes) of a cached list, a decoded posting (doc_id, dtf and position offset)
+    # and a decoded position, postings and positions are decoded into int64 arrays
+    list_size_estimate = 500
+    posting_size_estimate = 24
+    position_size_estimate = 8
+
+    def __init__(self, budget):
+        """
+        int budget: Memory (in bytes) the cached lists can take
+        """
+        self.budget = budget
+        self._lists = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        # Queries and background merges may share the index, so the order of the lists is updated under a lock
+        self._lock = threading.Lock()
+
+    def get_size_estimate(self, df, ctf):
+        """
+        Returns the estimated memory (in bytes) taken by an inverted list once it is fully decoded
+        int df: Number of postings in the list
+        int ctf: Number of positions in the list
+        """
+        return self.list_size_estimate + df * self.posting_size_estimate + ctf * self.position_size_estimate
+
+    def get(self, term):
+        """
+        Returns the cached inverted list of a term and marks it as most recently used, None if it isn't cached
+        str term: Term to get the inverted list for
+        """
+        with self._lock:
+            entry = self._lists.get(term)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._lists.move_to_end(term)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, term, inverted_list, df, ctf):
+        """
+        Adds the inverted list of a term to the cache, evicting the least recently used lists if over budget
+        A list larger than the whole budget is not cached
+        str term: Term of the inverted list
+        class inverted_list: Inverted list to cache
+        int df: Number of postings in the list
+        int ctf: Number of positions in the list
+        """
+        size = self.get_size_estimate(df, ctf)
+        if size > self.budget:
+            return
+        with self._lock:
+            if term in self._lists:
+                self._size -= self._lists.pop(term)[1]
+            self._lists[term] = (inverted_list, size)
+            self._size += size
+            while self._size > self.budget:
+                _, (_, evicted_size) = self._lists.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        """
+        Removes every list from the cache, the hit and miss counters are kept
+        """
+        with self._lock:
+            self._lists.clear()
+            self._size = 0
+
+    def get_hits(self):
+        """
+        Returns the number of lookups which found their list in the cache
+        """
+        return self._hits
+
+    def get_misses(self):
+        """
+        Returns the number of lookups which had to read their list from disk
+        """
+        return self._misses
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the hits, misses, number of lists and estimated size in bytes of the cache
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'numberOfLists': len(self._lists),
+                'sizeInBytes': self._size,
+                'budgetInBytes': self.budget
+            }
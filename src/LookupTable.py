@@ -0,0 +1,225 @@
+# Import built-in libraries
+import mmap
+import struct
+
+# Import third-party libraries
+import numpy as np
+
+
+class LookupTable:
+    """
+    Class which exposes APIs for a compact binary lookup table (term dictionary) stored on disk
+    The file holds a header, one fixed-width numeric column per term statistic, an offsets array
+    and a block of sorted terms, so it can be memory-mapped and queried without parsing
+    """
+
+    # Magic bytes, number of terms and number of columns (padded to 8 bytes for alignment)
+    format_header = '<4s4xqq'
+    # Typecode of a column followed by its name
+    format_column = '<c31s'
+    # Offsets into the term block
+    format_offset = 'q'
+    magic = b'LKUP'
+    # Little-endian NumPy types of the column typecodes, the file reads the same whatever the byte order of the host
+    column_dtypes = {'q': '<i8', 'd': '<f8'}
+
+    def __init__(self):
+        self._mmap = None
+        self._num_terms = 0
+        self._columns = {}
+        self._column_names = []
+        self._offsets = None
+        self._terms_position = 0
+
+    def dump(self, lookup_table, file_buffer):
+        """
+        Converts a dictionary lookup table to the binary format and writes it to a buffer
+        dict lookup_table: Dictionary of {term: {column: value}} to store
+        buffer file_buffer: Buffer for the lookup table file opened in binary mode
+        """
+        terms = sorted(lookup_table.keys())
+        columns = []
+        if terms:
+            for column in lookup_table[terms[0]]:
+                # A column holding a float anywhere is stored as floats, the others as integers
+                is_float = any(isinstance(lookup_table[term][column], float) for term in terms)
+                columns.append((column, 'd' if is_float else 'q'))
+
+        file_buffer.write(struct.pack(self.format_header, self.magic, len(terms), len(columns)))
+        for column, typecode in columns:
+            file_buffer.write(struct.pack(self.format_column, typecode.encode('ascii'), column.encode('ascii')))
+
+        # Write each column as a contiguous fixed-width array in term order
+        for column, typecode in columns:
+            values = [lookup_table[term][column] for term in terms]
+            file_buffer.write(struct.pack('<' + str(len(values)) + typecode, *values))
+
+        # Write the offsets of every term in the term block followed by the term block itself
+        encoded_terms = [term.encode('utf-8') for term in terms]
+        offsets = [0]
+        for encoded_term in encoded_terms:
+            offsets.append(offsets[-1] + len(encoded_term))
+        file_buffer.write(struct.pack('<' + str(len(offsets)) + self.format_offset, *offsets))
+        file_buffer.write(b''.join(encoded_terms))
+
+    def load(self, file_buffer):
+        """
+        Memory-maps a binary lookup table, nothing is parsed apart from the fixed size header
+        buffer file_buffer: Buffer for the lookup table file opened in binary mode
+        """
+        self._mmap = mmap.mmap(file_buffer.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._num_terms, num_columns = struct.unpack_from(self.format_header, self._mmap, 0)
+        if magic != self.magic:
+            self.close()
+            raise ValueError('Not a binary lookup table file')
+        position = struct.calcsize(self.format_header)
+
+        column_types = []
+        for _ in range(num_columns):
+            typecode, column = struct.unpack_from(self.format_column, self._mmap, position)
+            position += struct.calcsize(self.format_column)
+            column_types.append((column.rstrip(b'\x00').decode('ascii'), typecode.decode('ascii')))
+
+        self._column_names = []
+        self._columns = {}
+        for column, typecode in column_types:
+            self._columns[column] = np.frombuffer(
+                self._mmap, dtype=self.column_dtypes[typecode], count=self._num_terms, offset=position)
+            self._column_names.append(column)
+            position += self._num_terms * struct.calcsize(typecode)
+
+        self._offsets = np.frombuffer(
+            self._mmap, dtype=self.column_dtypes[self.format_offset], count=self._num_terms + 1, offset=position)
+        self._terms_position = position + (self._num_terms + 1) * struct.calcsize(self.format_offset)
+
+    def close(self):
+        """
+        Releases the memory-mapped lookup table file
+        """
+        if self._mmap is not None:
+            # The columns are views of the map, which can only be closed once they are gone
+            self._columns = {}
+            self._offsets = None
+            self._mmap.close()
+            self._mmap = None
+
+    def get_term(self, term_index):
+        """
+        Returns the term stored at the given index in the sorted term block
+        int term_index: Index of the term in the lookup table
+        """
+        return self.get_encoded_term(term_index).decode('utf-8')
+
+    def get_encoded_term(self, term_index):
+        """
+        Returns the UTF-8 bytes of the term stored at the given index in the sorted term block
+        int term_index: Index of the term in the lookup table
+        """
+        return self._mmap[self._terms_position + int(self._offsets[term_index]): self._terms_position + int(self._offsets[term_index + 1])]
+
+    def find_term(self, term):
+        """
+        Returns the index of a term in the lookup table using binary search, -1 if it is not present
+        str term: Term to search for
+        """
+        encoded_term = term.encode('utf-8')
+        low = 0
+        high = self._num_terms
+        while low < high:
+            mid = (low + high) // 2
+            if self.get_encoded_term(mid) < encoded_term:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._num_terms and self.get_encoded_term(low) == encoded_term:
+            return low
+        return -1
+
+    def get_value(self, term, column):
+        """
+        Returns the value of a column for the given term, raises KeyError if the term is not present
+        str term: Term to lookup
+        str column: Name of the column to read
+        """
+        term_index = self.find_term(term)
+        if term_index == -1:
+            raise KeyError(term)
+        return self._columns[column][term_index].item()
+
+    def get_ctf(self, term):
+        """
+        Returns collection term frequency of the term
+        str term: Term to get the CTF for
+        """
+        return self.get_value(term, 'ctf')
+
+    def get_df(self, term):
+        """
+        Returns document frequency of the term
+        str term: Term to get the DF for
+        """
+        return self.get_value(term, 'df')
+
+    def get_posting_list_position(self, term):
+        """
+        Returns starting position of the inverted list of the term in the inverted_lists file
+        str term: Term to get the inverted list position for
+        """
+        return self.get_value(term, 'posting_list_position')
+
+    def get_posting_list_size(self, term):
+        """
+        Returns size of the inverted list of the term in bytes
+        str term: Term to get the size of the inverted list for
+        """
+        return self.get_value(term, 'posting_list_size')
+
+    def get_max_dtf(self, term):
+        """
+        Returns the largest dtf in the inverted list of the term
+        str term: Term to get the largest dtf for
+        """
+        return self.get_value(term, 'max_dtf')
+
+    def get_min_doc_length(self, term):
+        """
+        Returns the length of the shortest document in the inverted list of the term
+        str term: Term to get the shortest document length for
+        """
+        return self.get_value(term, 'min_doc_length')
+
+    def get_term_stats(self, term):
+        """
+        Returns a dictionary with all the columns for the given term
+        str term: Term to lookup
+        """
+        term_index = self.find_term(term)
+        if term_index == -1:
+            raise KeyError(term)
+        return {column: self._columns[column][term_index].item() for column in self._column_names}
+
+    def __getitem__(self, term):
+        return self.get_term_stats(term)
+
+    def __contains__(self, term):
+        return self.find_term(term) != -1
+
+    def __len__(self):
+        return self._num_terms
+
+    def __iter__(self):
+        for term_index in range(self._num_terms):
+            yield self.get_term(term_index)
+
+    def keys(self):
+        """
+        Returns an iterator over the terms in sorted order
+        """
+        return iter(self)
+
+    def items(self):
+        """
+        Returns an iterator over (term, term_stats) pairs in sorted order
+        """
+        for term_index in range(self._num_terms):
+            yield (self.get_term(term_index), {column: self._columns[column][term_index].item() for column in self._column_names})
@@ -0,0 +1,74 @@
+# Import built-in libraries
+import math
+
+# Import third-party libraries
+import numpy as np
+
+# Import src files
+from Codec import Codec
+import utils
+
+
+class PForDeltaCodec(Codec):
+    """
+    Codec for patched frame-of-reference (PForDelta) encoding in blocks of 128 integers
+    Each block stores its minimum as a reference and the offsets from it in the fewest bits that fit most
+    of them. The offsets that don't fit are exceptions whose high bits are patched in after unpacking
+    """
+
+    # Number of integers in a block
+    block_size = 128
+    # Share of the integers of a block which must fit in the chosen bit width
+    fit_ratio = 0.9
+
+    def encode(self, num_list):
+        """
+        Encodes a list of integers and returns the bytearray and its size in bytes
+        A block holds its reference (vbyte), bit width and number of exceptions (a byte each), the packed
+        low bits of every offset, the indexes of the exceptions (a byte each) and their high bits (vbyte)
+        list num_list: List of non-negative integers
+        """
+        list_buffer = bytearray()
+        for block_start in range(0, len(num_list), self.block_size):
+            block = num_list[block_start: block_start + self.block_size]
+            reference = min(block)
+            offsets = np.array(block, dtype=np.int64) - reference
+            bits = int(np.sort(offsets)[math.ceil(self.fit_ratio * len(block)) - 1]).bit_length()
+            exception_indexes = np.flatnonzero(offsets >> bits)
+
+            list_buffer += utils.vbyte_encode([reference])[0]
+            list_buffer += bytes([bits, len(exception_indexes)])
+            low_bits = (offsets[:, None] >> np.arange(bits)) & 1
+            list_buffer += np.packbits(low_bits.astype(np.uint8).ravel(), bitorder='little').tobytes()
+            list_buffer += bytes(exception_indexes.tolist())
+            list_buffer += utils.vbyte_encode((offsets[exception_indexes] >> bits).tolist())[0]
+        return (list_buffer, len(list_buffer))
+
+    def decode(self, list_buffer, count):
+        """
+        Decodes a buffer and returns the NumPy array of integers, unpacking a whole block at a time
+        buffer list_buffer: Buffer holding exactly the integers written by encode
+        int count: Number of integers in the buffer
+        """
+        list_bytes = np.frombuffer(list_buffer, dtype=np.uint8)
+        num_array = np.empty(count, dtype=np.int64)
+        pointer = 0
+        for block_start in range(0, count, self.block_size):
+            block_length = min(self.block_size, count - block_start)
+            reference, pointer = utils.vbyte_decode_count(list_buffer, 1, pointer)
+            bits = int(list_bytes[pointer])
+            number_of_exceptions = int(list_bytes[pointer + 1])
+            pointer += 2
+
+            packed_size = (block_length * bits + 7) // 8
+            low_bits = np.unpackbits(list_bytes[pointer: pointer + packed_size], count=block_length * bits, bitorder='little')
+            offsets = low_bits.reshape(block_length, bits).astype(np.int64) @ (1 << np.arange(bits, dtype=np.int64))
+            pointer += packed_size
+
+            if number_of_exceptions:
+                exception_indexes = list_bytes[pointer: pointer + number_of_exceptions]
+                pointer += number_of_exceptions
+                high_bits, pointer = utils.vbyte_decode_count(list_buffer, number_of_exceptions, pointer)
+                offsets[exception_indexes] |= np.array(high_bits, dtype=np.int64) << bits
+            num_array[block_start: block_start + block_length] = offsets + reference[0]
+        return num_array
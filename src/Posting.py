@@ -1,14 +1,19 @@
 class Posting:
     """
-    Class which exposes APIs for operation on a posting
+    Class which exposes APIs for operation on a single posting outside of an inverted list
+    Inverted lists hold their postings as arrays read through a PostingsCursor, a Posting is used to score
+    a document in which the term doesn't occur
     """
 
-    def __init__(self, doc_id):
+    __slots__ = ('_doc_id', '_term_positions')
+
+    def __init__(self, doc_id, term_positions=None):
         """
         int doc_id: ID of the document corresponding to this posting
+        int[] term_positions: Positions of the term in the document, none by default
         """
         self._doc_id = doc_id
-        self._term_positions = []
+        self._term_positions = term_positions if term_positions is not None else []
 
     def get_doc_id(self):
         """
@@ -27,16 +32,3 @@ class Posting:
         Returns the document term frequency - number of times the term occurs in the given document
         """
         return len(self._term_positions)
-
-    def update_term_positions(self, position):
-        """
-        Adds to the list the new position where the term occurred in the document
-        int position: Position to be updated of the term in the document
-        """
-        self._term_positions.append(position)
-
-    def set_term_positions(self, positions):
-        """
-        Sets a list of positions of the term in the given document
-        """
-        self._term_positions = positions
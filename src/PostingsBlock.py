@@ -0,0 +1,134 @@
+# Import third-party libraries
+import numpy as np
+
+# Import src files
+import utils
+
+
+class PostingsBlock:
+    """
+    Class for a block of postings of an inverted list stored as parallel arrays of doc_ids, dtfs,
+    position offsets and one flat array of positions
+    A block read from a compressed list keeps its encoded bytes, its doc_ids and dtfs are decoded on
+    first access and its positions only when they are asked for
+    The largest dtf and the shortest document length in a block bound the score of its postings, a block
+    read from a compressed list has them from the skip table so they are known without decoding it
+    """
+
+    __slots__ = ('_last_doc_id', '_base_doc_id', '_number_of_postings', '_max_dtf', '_min_doc_length', '_codecs',
+                 '_doc_binary', '_positions_binary', '_doc_ids', '_dtfs', '_position_offsets', '_positions')
+
+    def __init__(self, last_doc_id, number_of_postings, base_doc_id=0, codecs=None, doc_binary=None, positions_binary=None,
+                 max_dtf=None, min_doc_length=None):
+        """
+        int last_doc_id: doc_id of the last posting in the block
+        int number_of_postings: Number of postings in the block
+        int base_doc_id: doc_id of the last posting before the block, doc_ids in an encoded block are deltas from it
+        tuple codecs: Codecs for doc_id gaps, dtfs and position gaps of an encoded block
+        tuple doc_binary: Buffers for the encoded doc_id gaps and dtfs
+        buffer positions_binary: Buffer for the encoded position gaps
+        int max_dtf: Largest dtf in the block, computed from the dtfs if not given
+        int min_doc_length: Length of the shortest document in the block, computed from the doc_ids if not given
+        """
+        self._last_doc_id = last_doc_id
+        self._base_doc_id = base_doc_id
+        self._number_of_postings = number_of_postings
+        self._max_dtf = max_dtf
+        self._min_doc_length = min_doc_length
+        self._codecs = codecs
+        self._doc_binary = doc_binary
+        self._positions_binary = positions_binary
+        self._doc_ids = None
+        self._dtfs = None
+        self._position_offsets = None
+        self._positions = None
+
+    def set_arrays(self, doc_ids, dtfs, positions):
+        """
+        Sets the decoded arrays of the block
+        array doc_ids: doc_ids of the postings
+        array dtfs: dtfs of the postings
+        array positions: Positions of every posting one after the other
+        """
+        self._doc_ids = doc_ids
+        self._dtfs = dtfs
+        self._positions = positions
+
+    def get_last_doc_id(self):
+        """
+        Returns the doc_id of the last posting in the block without decoding it
+        """
+        return self._last_doc_id
+
+    def get_number_of_postings(self):
+        """
+        Returns the number of postings in the block
+        """
+        return self._number_of_postings
+
+    def get_max_dtf(self):
+        """
+        Returns the largest dtf in the block
+        """
+        if self._max_dtf is None:
+            self._max_dtf = int(self.get_dtfs().max())
+        return self._max_dtf
+
+    def get_min_doc_length(self, doc_lengths):
+        """
+        Returns the length of the shortest document in the block
+        array doc_lengths: NumPy array of the lengths of every document, used if the block doesn't have it yet
+        """
+        if self._min_doc_length is None:
+            self._min_doc_length = int(doc_lengths[self.get_doc_ids()].min())
+        return self._min_doc_length
+
+    def get_doc_ids(self):
+        """
+        Returns the array of doc_ids in the block
+        """
+        if self._doc_ids is None:
+            self.decode_doc_ids()
+        return self._doc_ids
+
+    def get_dtfs(self):
+        """
+        Returns the array of dtfs in the block
+        """
+        if self._dtfs is None:
+            self.decode_doc_ids()
+        return self._dtfs
+
+    def get_position_offsets(self):
+        """
+        Returns the array of offsets of the positions of every posting in the flat positions array
+        The positions of the posting at index i are positions[offsets[i]: offsets[i + 1]]
+        """
+        if self._position_offsets is None:
+            dtfs = self.get_dtfs()
+            self._position_offsets = np.zeros(len(dtfs) + 1, dtype=np.int64)
+            np.cumsum(dtfs, out=self._position_offsets[1:])
+        return self._position_offsets
+
+    def get_positions(self):
+        """
+        Returns the flat array of positions of every posting in the block
+        """
+        if self._positions is None:
+            dtfs = self.get_dtfs()
+            position_gaps = self._codecs[2].decode(self._positions_binary, int(dtfs.sum()))
+            # The position gaps start over in every posting
+            self._positions = utils.delta_decode(position_gaps, dtfs)
+            self._positions_binary = None
+        return self._positions
+
+    def decode_doc_ids(self):
+        """
+        Decodes the doc_ids and dtfs of an encoded block
+        """
+        doc_gaps_binary, dtfs_binary = self._doc_binary
+        doc_gaps = self._codecs[0].decode(doc_gaps_binary, self._number_of_postings)
+        # Add the deltas to the doc_id before the block to get the doc_ids
+        self._doc_ids = self._base_doc_id + utils.delta_decode(doc_gaps)
+        self._dtfs = self._codecs[1].decode(dtfs_binary, self._number_of_postings)
+        self._doc_binary = None
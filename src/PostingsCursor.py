@@ -0,0 +1,102 @@
+# Import src files
+import utils
+
+
+class PostingsCursor:
+    """
+    Class for a cursor over the postings of an inverted list, which is also a view of the posting it is on
+    It has the get_doc_id / get_dtf / get_term_positions APIs of a Posting, so it can be scored without
+    creating an object per posting. Once the postings run out, the doc_id is -1 and the dtf is 0
+    """
+
+    __slots__ = ('_blocks', '_last_doc_ids', '_block_index', '_doc_ids', '_dtfs', '_index')
+
+    def __init__(self, inverted_list):
+        """
+        class inverted_list: Inverted list to move over
+        """
+        self._blocks = inverted_list.get_blocks()
+        # Last doc_id of every block, the skip pointers searched to find the block holding a doc_id
+        self._last_doc_ids = [block.get_last_doc_id() for block in self._blocks]
+        self.load_block(0)
+
+    def load_block(self, block_index):
+        """
+        Moves the cursor to the first posting of a block
+        int block_index: Index of the block
+        """
+        self._block_index = block_index
+        self._index = 0
+        if block_index < len(self._blocks):
+            block = self._blocks[block_index]
+            # Lists of a block are faster to read one item at a time than arrays
+            self._doc_ids = block.get_doc_ids().tolist()
+            self._dtfs = block.get_dtfs().tolist()
+        else:
+            self._doc_ids = []
+            self._dtfs = []
+
+    def has_more(self):
+        """
+        Returns True if the cursor is on a posting
+        """
+        return self._index < len(self._doc_ids)
+
+    def get_doc_id(self):
+        """
+        Returns the doc_id of the current posting, -1 if there are no more postings
+        """
+        if self._index < len(self._doc_ids):
+            return self._doc_ids[self._index]
+        return -1
+
+    def get_dtf(self):
+        """
+        Returns the dtf of the current posting, 0 if there are no more postings
+        """
+        if self._index < len(self._dtfs):
+            return self._dtfs[self._index]
+        return 0
+
+    def get_term_positions(self):
+        """
+        Returns a new list of the positions of the current posting, decoding the positions of its block if needed
+        """
+        if self._index >= len(self._doc_ids):
+            return []
+        block = self._blocks[self._block_index]
+        position_offsets = block.get_position_offsets()
+        return block.get_positions()[position_offsets[self._index]: position_offsets[self._index + 1]].tolist()
+
+    def move_to_next(self):
+        """
+        Moves the cursor to the next posting
+        """
+        self._index += 1
+        if self._index == len(self._doc_ids) and self._block_index + 1 < len(self._blocks):
+            self.load_block(self._block_index + 1)
+
+    def skip_to(self, doc_id):
+        """
+        Moves the cursor to the first posting with a doc_id greater than or equal to the given doc_id
+        Blocks which end before doc_id are jumped over using their last doc_id, so they are never decoded
+        Both the blocks and the postings in a block are searched by galloping from the current one, so short
+        skips stay cheap on long lists
+        int doc_id: doc_id to move to
+        """
+        block_index = self._block_index
+        if block_index + 1 < len(self._blocks) and self._last_doc_ids[block_index] < doc_id:
+            block_index = min(utils.gallop(self._last_doc_ids, doc_id, block_index + 1), len(self._blocks) - 1)
+            self.load_block(block_index)
+        self._index = utils.gallop(self._doc_ids, doc_id, self._index)
+
+    def get_block_of(self, doc_id):
+        """
+        Returns the PostingsBlock which would hold the given doc_id, None if it is past the last block
+        The cursor doesn't move and the blocks are found by their last doc_id, so none of them is decoded
+        int doc_id: doc_id greater than or equal to the doc_id of the current posting
+        """
+        block_index = utils.gallop(self._last_doc_ids, doc_id, self._block_index)
+        if block_index < len(self._blocks):
+            return self._blocks[block_index]
+        return None
@@ -1,10 +1,18 @@
 # Import built-in libraries
+import time
+import heapq
+import math
 from collections import defaultdict
 from copy import deepcopy
 
+# Import third-party libraries
+import numpy as np
+
 # Import src files
 from RetrievalModels import RetrievalModels
 from Posting import Posting
+from QueryResultCache import QueryResultCache
+from TopKCollector import TopKCollector
 
 
 class Query:
@@ -21,7 +29,9 @@ class Query:
                  k2=100,
                  b=0.75,
                  alphaD=0.1,
-                 mu=1500):
+                 mu=1500,
+                 postings_budget=0,
+                 time_budget=0):
         """
         class config: Instance of the configuration of the active inverted index
         class inverted_index: The inverted index to use for querying
@@ -33,6 +43,8 @@ class Query:
         int b: Parameter used in BM25
         int alphaD: Parameter used in Jelinek-Mercer Smoothing
         int mu: Parameter used in Dirichlet Smoothing
+        int postings_budget: Number of postings after which score-at-a-time retrieval stops, 0 for no limit
+        float time_budget: Number of milliseconds after which score-at-a-time retrieval stops, 0 for no limit
         """
         self.config = config
         self.inverted_index = inverted_index
@@ -44,20 +56,50 @@ class Query:
         self.b = b
         self.alphaD = alphaD
         self.mu = mu
+        self.postings_budget = postings_budget
+        self.time_budget = time_budget
+        # Results are only cached for an index loaded from disk, whose generation is known
+        self.result_cache = None
+        if config.result_cache_size and inverted_index.get_generation() is not None:
+            self.result_cache = QueryResultCache.get_shared_cache(config.result_cache_size, config.result_cache_ttl)
 
     def get_documents(self, query_string):
         """
-        Returns a sorted list of documents from the index given a query
+        Returns a sorted list of documents from the index given a query, from the result cache if it is there
+        str query_string: A query of arbitrary number of terms
+        """
+        if self.result_cache is None:
+            return self.retrieve_documents(query_string)
+        key = (self.inverted_index.get_generation(), QueryResultCache.normalize_query(query_string), self.mode,
+               self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu, self.count,
+               self.postings_budget, self.time_budget)
+        results = self.result_cache.get(key)
+        if results is None:
+            results = self.retrieve_documents(query_string)
+            self.result_cache.put(key, results)
+        return results
+
+    def retrieve_documents(self, query_string):
+        """
+        Returns a sorted list of documents from the index given a query using the configured mode
         str query_string: A query of arbitrary number of terms
         """
         if self.mode == 'term':
             return self.term_at_a_time_retrieval(query_string)
+        elif self.mode == 'vectorized_term':
+            return self.vectorized_term_at_a_time_retrieval(query_string)
         elif self.mode == 'doc':
             return self.document_at_a_time_retrieval(query_string)
+        elif self.mode == 'wand':
+            return self.wand_retrieval(query_string)
+        elif self.mode == 'block_max_wand':
+            return self.wand_retrieval(query_string, block_max=True)
         elif self.mode == 'conj_term':
             return self.conjunctive_term_at_a_time_retrieval(query_string)
         elif self.mode == 'conj_doc':
             return self.conjunctive_document_at_a_time_retrieval(query_string)
+        elif self.mode == 'score':
+            return self.score_at_a_time_retrieval(query_string)
 
     def term_at_a_time_retrieval(self, query_string):
         """
@@ -76,27 +118,27 @@ class Query:
         # for query_term in query_terms:
         #     inverted_lists[query_term] = self.inverted_index.get_inverted_list(query_term)
         # for query_term, inverted_list in inverted_lists.items():
-        #     postings = inverted_list.get_postings()
-        #     for posting in postings:
-        #         doc_id = posting.get_doc_id()
-        #         scores[doc_id] += scoring_model.get_score(query_term, posting)
+        #     cursor = inverted_list.get_cursor()
+        #     while cursor.has_more():
+        #         scores[cursor.get_doc_id()] += scoring_model.get_score(query_term, cursor)
+        #         cursor.move_to_next()
 
         # This is probably a more efficient implementation
         for query_term in query_terms:
             inverted_list = self.inverted_index.get_inverted_list(query_term)
-            postings = inverted_list.get_postings()
-            for posting in postings:
-                doc_id = posting.get_doc_id()
-                scores[doc_id] += scoring_model.get_score(query_term, posting)
+            # The cursor is scored as the posting it is on, so no object is made per posting
+            cursor = inverted_list.get_cursor()
+            while cursor.has_more():
+                doc_id = cursor.get_doc_id()
+                scores[doc_id] += scoring_model.get_score(query_term, cursor)
+                cursor.move_to_next()
 
-        scores_list = scores.items()
-        # https://stackoverflow.com/a/613218/6492944 - Sorting a list of tuples by second element in descending order
-        # https://stackoverflow.com/questions/54300715/python-3-list-sorting-with-a-tie-breaker
-        # When sorting two docs with same scores, they are sorted by document ID to maintain consistency
-        sorted_scores_list = sorted(scores_list, key=lambda x: (x[1], x[0]), reverse=True)
+        # Keep the top self.count documents, two docs with same scores are sorted by document ID to maintain consistency
+        top_k_collector = TopKCollector(self.count)
+        top_k_collector.add_all(scores)
 
         # Return the meta info of the top self.count number of documents
-        for score in sorted_scores_list[:self.count]:
+        for score in top_k_collector.get_top_documents():
             doc_id = score[0]
             new_doc_meta = {}
             # doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
@@ -107,62 +149,334 @@ class Query:
             results.append(new_doc_meta)
         return results
 
+    def vectorized_term_at_a_time_retrieval(self, query_string):
+        """
+        Returns documents using the term-at-a-time retrieval algorithm on NumPy arrays
+        All postings of a query term are scored at once and added to a dense array of document scores
+        str query_string: A query of arbitrary number of terms
+        """
+        query_terms = query_string.split()
+        scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
+        results = []
+
+        total_docs = self.inverted_index.get_total_docs()
+        # Raw counts are integers, every other model scores with floats
+        scores = np.zeros(total_docs, dtype=np.int64 if self.retrieval_model == 'raw_counts' else np.float64)
+        # Documents with a posting of at least one query term, only they are ranked
+        scored = np.zeros(total_docs, dtype=bool)
+        for query_term in query_terms:
+            inverted_list = self.inverted_index.get_inverted_list(query_term)
+            doc_ids = inverted_list.get_doc_ids()
+            # The doc_ids of a list are unique, so a fancy-indexed add adds every score once (no np.add.at needed)
+            scores[doc_ids] += scoring_model.get_scores(query_term, doc_ids, inverted_list.get_dtfs())
+            scored[doc_ids] = True
+
+        doc_ids = np.flatnonzero(scored)
+        for doc_id, score in self.get_top_documents(doc_ids, scores[doc_ids]):
+            doc_meta = self.inverted_index.get_doc_meta(doc_id)
+            new_doc_meta = {}
+            for key, value in doc_meta.items():
+                new_doc_meta[key] = value
+            new_doc_meta['score'] = score
+            results.append(new_doc_meta)
+        return results
+
+    def get_top_documents(self, doc_ids, scores):
+        """
+        Returns the top self.count (doc_id, score) pairs sorted by score, ties sorted by doc_id, both descending
+        The top documents are found with a partial sort (argpartition), only they are fully sorted
+        array doc_ids: NumPy array of doc_ids
+        array scores: NumPy array of the scores of those documents
+        """
+        if self.count <= 0:
+            return []
+        if len(scores) > self.count:
+            # Keep every document scoring at least the count-th highest score, so ties on it are all sorted
+            kth_score = scores[np.argpartition(scores, len(scores) - self.count)[len(scores) - self.count]]
+            top = scores >= kth_score
+            doc_ids = doc_ids[top]
+            scores = scores[top]
+        order = np.lexsort((doc_ids, scores))[::-1][:self.count]
+        return list(zip(doc_ids[order].tolist(), scores[order].tolist()))
+
     def document_at_a_time_retrieval(self, query_string):
         """
         Returns documents using the document-at-a-time retrieval algorithm
-        Look at every document in the collection
-        Check if it is present in the inverted list of a query term
-        Update each document's score
+        The cursors of the query terms are merged with a min-heap on their current doc_id, so only documents
+        containing at least one query term are visited
+        Each of them is scored on every query term, terms absent from it add their background score
         str query_string: A query of arbitrary number of terms
         """
-        scores = defaultdict(int)
+        top_k_collector = TopKCollector(self.count)
         query_terms = query_string.split()
         scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
         results = []
 
-        inverted_lists = {}
-        for query_term in set(query_terms):
-            inverted_lists[query_term] = self.inverted_index.get_inverted_list(query_term)
-        for doc_id in range(0, self.inverted_index.get_total_docs()):
+        terms = list(set(query_terms))
+        cursors = [self.inverted_index.get_inverted_list(query_term).get_cursor() for query_term in terms]
+        # Heap of (doc_id, index of the term) for every cursor which has postings left
+        heap = [(cursor.get_doc_id(), i) for i, cursor in enumerate(cursors) if cursor.has_more()]
+        heapq.heapify(heap)
+        while heap:
+            doc_id = heap[0][0]
+            # Pop every cursor on this document, they are moved to their next posting once it is scored
+            term_indexes = []
+            while heap and heap[0][0] == doc_id:
+                term_indexes.append(heapq.heappop(heap)[1])
             score = 0
-            at_least_one_term_present = False
-            for query_term, inverted_list in inverted_lists.items():
-                postings = inverted_list.get_postings()
-                for posting in postings:
-                    if posting.get_doc_id() == doc_id:
-                        at_least_one_term_present = True
-                        score += scoring_model.get_score(query_term, posting)
-                        break
+            for query_term, cursor in zip(terms, cursors):
+                if cursor.get_doc_id() == doc_id:
+                    score += scoring_model.get_score(query_term, cursor)
                 else:
                     posting_without_term_occurrence = Posting(doc_id)
                     score += scoring_model.get_score(query_term, posting_without_term_occurrence)
-            if score and at_least_one_term_present:
-                scores[doc_id] = score
-
-        scores_list = scores.items()
-        # https://stackoverflow.com/a/613218/6492944 - Sorting a list of tuples by second element in descending order
-        # https://stackoverflow.com/questions/54300715/python-3-list-sorting-with-a-tie-breaker
-        # When sorting two docs with same scores, they are sorted by document ID to maintain consistency
-        sorted_scores_list = sorted(scores_list, key=lambda x: (x[1], x[0]), reverse=True)
+            for i in term_indexes:
+                cursors[i].move_to_next()
+                if cursors[i].has_more():
+                    heapq.heappush(heap, (cursors[i].get_doc_id(), i))
+            if score:
+                top_k_collector.add(doc_id, score)
 
         # Return the meta info of the top self.count number of documents
-        for score in sorted_scores_list[:self.count]:
+        for score in top_k_collector.get_top_documents():
             doc_id = score[0]
             doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
             doc_meta['score'] = score[1]
             results.append(doc_meta)
         return results
 
+    def wand_retrieval(self, query_string, block_max=False):
+        """
+        Returns documents using the WAND dynamic pruning algorithm, or Block-Max WAND if block_max is set
+        The cursors are kept sorted by doc_id, the next document scored is the first one (the pivot) whose sum of
+        the upper bounds of the terms before it could still enter the top self.count documents, the cursors
+        before it skip to it and the documents they skip over are never scored
+        Block-Max WAND also bounds the pivot with the maxima of the blocks holding it, if it can't enter the top
+        documents the cursors skip past those blocks without decoding them
+        The results are those of document-at-a-time retrieval, models with no upper bound on their scores fall
+        back to it
+        str query_string: A query of arbitrary number of terms
+        bool block_max: Flag to also bound documents with the maxima of the blocks holding them
+        """
+        if self.retrieval_model not in RetrievalModels.max_score_models:
+            return self.document_at_a_time_retrieval(query_string)
+        query_terms = query_string.split()
+        scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
+        results = []
+        if self.count <= 0:
+            return results
+
+        terms = list(set(query_terms))
+        cursors = [self.inverted_index.get_inverted_list(query_term).get_cursor() for query_term in terms]
+        doc_lengths = self.inverted_index.get_doc_lengths_array()
+        # Indexes of the terms whose cursors have postings left
+        active = [i for i, cursor in enumerate(cursors) if cursor.has_more()]
+        max_scores = {}
+        for i in active:
+            max_scores[i] = scoring_model.get_max_score(terms[i], self.inverted_index.get_max_dtf(terms[i]),
+                                                        self.inverted_index.get_min_doc_length(terms[i]))
+        # Upper bound of every block of a term met so far, a block is bounded once however many pivots it holds
+        block_max_scores = [{} for _ in terms]
+        top_k_collector = TopKCollector(self.count)
+        while active:
+            active.sort(key=lambda i: cursors[i].get_doc_id())
+            bound = 0
+            pivot = 0
+            while pivot < len(active):
+                bound += max_scores[active[pivot]]
+                if top_k_collector.may_enter(bound):
+                    break
+                pivot += 1
+            if pivot == len(active):
+                # Even a document containing every term left can't enter the top documents
+                break
+            pivot_doc_id = cursors[active[pivot]].get_doc_id()
+            # Terms on the pivot after it also score the pivot
+            while pivot + 1 < len(active) and cursors[active[pivot + 1]].get_doc_id() == pivot_doc_id:
+                pivot += 1
+
+            # Nothing is pruned until there are self.count top documents
+            if block_max and top_k_collector.is_full():
+                # Documents before next_doc_id can only hold the terms up to the pivot, in the blocks holding the pivot
+                block_bound = 0
+                next_doc_id = cursors[active[pivot + 1]].get_doc_id() if pivot + 1 < len(active) else math.inf
+                for i in active[: pivot + 1]:
+                    block = cursors[i].get_block_of(pivot_doc_id)
+                    if block is not None:
+                        block_max_score = block_max_scores[i].get(block)
+                        if block_max_score is None:
+                            block_max_score = block_max_scores[i][block] = scoring_model.get_max_score(
+                                terms[i], block.get_max_dtf(), block.get_min_doc_length(doc_lengths))
+                        block_bound += block_max_score
+                        next_doc_id = min(next_doc_id, block.get_last_doc_id() + 1)
+                if not top_k_collector.may_enter(block_bound):
+                    for i in active[: pivot + 1]:
+                        cursors[i].skip_to(next_doc_id)
+                    active = [i for i in active if cursors[i].has_more()]
+                    continue
+
+            if cursors[active[0]].get_doc_id() == pivot_doc_id:
+                # Terms absent from the pivot add a score of 0 with these models, so only the present ones are summed
+                score = 0
+                for query_term, cursor in zip(terms, cursors):
+                    if cursor.get_doc_id() == pivot_doc_id:
+                        score += scoring_model.get_score(query_term, cursor)
+                if score:
+                    top_k_collector.add(pivot_doc_id, score)
+                for i in active[: pivot + 1]:
+                    cursors[i].move_to_next()
+            else:
+                for i in active[: pivot]:
+                    cursors[i].skip_to(pivot_doc_id)
+            active = [i for i in active if cursors[i].has_more()]
+
+        for doc_id, score in top_k_collector.get_top_documents():
+            doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
+            doc_meta['score'] = score
+            results.append(doc_meta)
+        return results
+
     def conjunctive_term_at_a_time_retrieval(self, query_string):
         """
         Returns documents using the conjunctive-term-at-a-time retrieval algorithm
+        Only documents containing every query term are scored. The terms are processed rarest first, the
+        postings of the first term are the candidates and every later term keeps the candidates in its list,
+        adding its score to them. The cursor of a term skips from candidate to candidate, so only the blocks
+        holding candidates are decoded
+        The scores are the ones of conjunctive-document-at-a-time retrieval, a repeated term is scored once with
+        its frequency in the query and documents scoring 0 are left out
         str query_string: A query of arbitrary number of terms
         """
-        pass
+        query_terms = query_string.split()
+        scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
+        results = []
+
+        # Candidates in doc_id order with their scores so far
+        scores = None
+        for query_term in sorted(set(query_terms), key=self.inverted_index.get_df):
+            cursor = self.inverted_index.get_inverted_list(query_term).get_cursor()
+            if scores is None:
+                scores = {}
+                while cursor.has_more():
+                    scores[cursor.get_doc_id()] = scoring_model.get_score(query_term, cursor)
+                    cursor.move_to_next()
+            else:
+                candidate_scores = {}
+                for doc_id, score in scores.items():
+                    cursor.skip_to(doc_id)
+                    if not cursor.has_more():
+                        break
+                    if cursor.get_doc_id() == doc_id:
+                        candidate_scores[doc_id] = score + scoring_model.get_score(query_term, cursor)
+                scores = candidate_scores
+            if not scores:
+                break
+
+        # Keep the top self.count documents, two docs with same scores are sorted by document ID to maintain consistency
+        top_k_collector = TopKCollector(self.count)
+        top_k_collector.add_all({doc_id: score for doc_id, score in (scores or {}).items() if score})
+
+        # Return the meta info of the top self.count number of documents
+        for score in top_k_collector.get_top_documents():
+            doc_id = score[0]
+            doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
+            doc_meta['score'] = score[1]
+            results.append(doc_meta)
+        return results
 
     def conjunctive_document_at_a_time_retrieval(self, query_string):
         """
         Returns documents using the conjunctive-document-at-a-time retrieval algorithm
+        Only documents containing every query term are scored. The cursor of the rarest term gives the
+        candidate, the other cursors skip to it rarest first and once one of them passes it, the rarest cursor
+        skips to where that one stopped. The scores are the ones of document-at-a-time retrieval
+        str query_string: A query of arbitrary number of terms
+        """
+        top_k_collector = TopKCollector(self.count)
+        query_terms = query_string.split()
+        scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
+        results = []
+
+        terms = list(set(query_terms))
+        cursors = [self.inverted_index.get_inverted_list(query_term).get_cursor() for query_term in terms]
+        cursors_by_df = [cursors[i] for i in sorted(range(len(terms)), key=lambda i: self.inverted_index.get_df(terms[i]))]
+        while cursors_by_df and cursors_by_df[0].has_more():
+            doc_id = cursors_by_df[0].get_doc_id()
+            for cursor in cursors_by_df[1:]:
+                cursor.skip_to(doc_id)
+                if cursor.get_doc_id() != doc_id:
+                    break
+            else:
+                score = 0
+                for query_term, cursor in zip(terms, cursors):
+                    score += scoring_model.get_score(query_term, cursor)
+                if score:
+                    top_k_collector.add(doc_id, score)
+                cursors_by_df[0].move_to_next()
+                continue
+            # No document before the one the cursor stopped at holds every term
+            if not cursor.has_more():
+                break
+            cursors_by_df[0].skip_to(cursor.get_doc_id())
+
+        # Return the meta info of the top self.count number of documents
+        for score in top_k_collector.get_top_documents():
+            doc_id = score[0]
+            doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
+            doc_meta['score'] = score[1]
+            results.append(doc_meta)
+        return results
+
+    def score_at_a_time_retrieval(self, query_string):
+        """
+        Returns documents using the score-at-a-time retrieval algorithm on the impact-ordered index
+        The impact segments of all query terms are processed in one order of descending absolute impact (times
+        the BM25 weight of the frequency of the term in the query), adding the impact to the accumulator of
+        every document in them. The postings which change the scores most are processed first, so stopping
+        early after self.postings_budget postings or self.time_budget milliseconds still returns the documents
+        most likely to rank highest
+        Scores approximate the BM25 scores of document-at-a-time retrieval: the impacts are quantized, they are
+        computed with the k1 and b the impact-ordered index was built with, and postings left over once a
+        budget runs out are never added
         str query_string: A query of arbitrary number of terms
         """
-        pass
+        if self.retrieval_model != 'bm25':
+            raise ValueError('Score-at-a-time retrieval needs the bm25 retrieval model, not ' + self.retrieval_model)
+        impact_meta = self.inverted_index.get_impact_meta()
+        query_terms = query_string.split()
+        scoring_model = RetrievalModels(query_terms, self.inverted_index, self.retrieval_model, self.k1, self.k2, self.b, self.alphaD, self.mu)
+        results = []
+
+        terms = list(set(query_terms))
+        impact_ordered_lists = {query_term: self.inverted_index.get_impact_ordered_list(query_term) for query_term in terms}
+        # (weighted impact, term, index of the segment) of every segment, in the order they are processed
+        segments = []
+        for query_term, impact_ordered_list in impact_ordered_lists.items():
+            qtf_weight = scoring_model.get_term_constants(query_term)[1]
+            for segment_index in range(impact_ordered_list.get_number_of_segments()):
+                segments.append((impact_ordered_list.get_impact(segment_index) * qtf_weight, query_term, segment_index))
+        segments.sort(key=lambda segment: -abs(segment[0]))
+
+        total_docs = self.inverted_index.get_total_docs()
+        accumulators = np.zeros(total_docs, dtype=np.float64)
+        # Documents with at least one posting processed, only they are ranked
+        scored = np.zeros(total_docs, dtype=bool)
+        postings_left = self.postings_budget if self.postings_budget > 0 else math.inf
+        deadline = time.perf_counter() + self.time_budget / 1000 if self.time_budget > 0 else math.inf
+        for impact, query_term, segment_index in segments:
+            if postings_left <= 0 or time.perf_counter() >= deadline:
+                break
+            doc_ids = impact_ordered_lists[query_term].get_doc_ids(segment_index)
+            if len(doc_ids) > postings_left:
+                doc_ids = doc_ids[: postings_left]
+            # The doc_ids of a segment are unique, so a fancy-indexed add adds every impact once
+            accumulators[doc_ids] += impact
+            scored[doc_ids] = True
+            postings_left -= len(doc_ids)
+
+        doc_ids = np.flatnonzero(scored)
+        for doc_id, score in self.get_top_documents(doc_ids, accumulators[doc_ids] * impact_meta['scale']):
+            doc_meta = deepcopy(self.inverted_index.get_doc_meta(doc_id))
+            doc_meta['score'] = score
+            results.append(doc_meta)
+        return results
@@ -6,7 +6,6 @@ from copy import deepcopy
 
 # Import src files
 from InvertedList import InvertedList
-from Posting import Posting
 
 
 class QueryNode:
@@ -20,7 +19,7 @@ class QueryNode:
         Returns a Dirichlet smoothed query likelihood score for a document given a query term
         Summation for all query terms is done in the retrieval algorithm
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
         """
         # Frequency of term/window in the document (document term/window frequency - dtf)
         fqiD = doc.get_dtf()
@@ -34,24 +33,36 @@ class QueryNode:
         score = math.log((fqiD + (self.mu * (cqi / cl))) / (dl + self.mu))
         return score
 
-    def get_postings(self):
-        return self.inverted_list.get_postings()
+    def get_max_score(self):
+        """
+        Returns an upper bound on the score of the postings of the node, see score
+        The score grows with the dtf and shrinks with the document length, which is never below the dtf
+        """
+        max_dtf, min_doc_length = self.get_max_score_stats()
+        cl = self.inverted_index.get_collection_length()
+        return math.log((max_dtf + (self.mu * (self.ctf / cl))) / (max(min_doc_length, max_dtf) + self.mu))
+
+    def get_max_score_stats(self):
+        # Largest dtf and shortest document length of the postings
+        return (self.inverted_list.get_max_dtf(),
+                self.inverted_list.get_min_doc_length(self.inverted_index.get_doc_lengths_array()))
 
     def get_positions_in_current_posting(self):
-        return self.postings[self.posting_index].get_term_positions()
+        return self.cursor.get_term_positions()
+
+    def start_cursor(self):
+        # The cursor moves over the blocks of the inverted list and is also the view of its current posting
+        self.cursor = self.inverted_list.get_cursor()
 
     def has_more(self):
-        return self.posting_index < len(self.postings)
+        return self.cursor.has_more()
 
     def next_candidate(self):
-        if self.posting_index < len(self.postings):
-            return self.postings[self.posting_index]
-        # If there are no more postings, return a posting with doc id of -1
-        return Posting(-1)
+        # If there are no more postings, the cursor has a doc id of -1
+        return self.cursor
 
     def skip_to(self, doc_id):
-        while self.posting_index < len(self.postings) and self.postings[self.posting_index].get_doc_id() < doc_id:
-            self.posting_index += 1
+        self.cursor.skip_to(doc_id)
 
 
 class TermNode(QueryNode):
@@ -59,12 +70,15 @@ class TermNode(QueryNode):
         super().__init__(inverted_index)
         self.term = term
         self.inverted_list = self.get_inverted_list()
-        self.postings = self.get_postings()
-        self.posting_index = 0
+        self.start_cursor()
 
     def get_inverted_list(self):
         return self.inverted_index.get_inverted_list(self.term)
 
+    def get_max_score_stats(self):
+        # Precomputed in the lookup table, so the list isn't decoded
+        return (self.inverted_index.get_max_dtf(self.term), self.inverted_index.get_min_doc_length(self.term))
+
 
 class ProximityNode(QueryNode):
     def __init__(self, inverted_index, term_nodes, window_size):
@@ -72,8 +86,7 @@ class ProximityNode(QueryNode):
         self.term_nodes = term_nodes
         self.window_size = window_size
         self.inverted_list = self.get_inverted_list()
-        self.postings = self.get_postings()
-        self.posting_index = 0
+        self.start_cursor()
 
     def all_terms_have_more(self):
         # Check if all terms have more postings left in their respective postings lists
@@ -412,6 +425,10 @@ class WeightedAndNode(BeliefNode):
             total_probability += probability
         return total_probability
 
+    def score_from_child_score(self, child_score):
+        # Score of a document on which every child has the given score
+        return sum(weight * child_score for weight in self.weights)
+
 
 class AndNode(WeightedAndNode):
     def __init__(self, inverted_index, term_nodes):
@@ -434,6 +451,10 @@ class WeightedSumNode(BeliefNode):
             total_weight += weight
         return math.log(total_probability / total_weight)
 
+    def score_from_child_score(self, child_score):
+        # Score of a document on which every child has the given score
+        return math.log(sum(weight * math.exp(child_score) for weight in self.weights) / sum(self.weights))
+
 
 class SumNode(WeightedSumNode):
     def __init__(self, inverted_index, term_nodes):
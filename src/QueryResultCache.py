@@ -0,0 +1,111 @@
+# Import built-in libraries
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryResultCache:
+    """
+    Class for a cache of query results shared by every query in the process
+    Results are keyed by the generation of the index they were computed on along with the query and its
+    parameters, so a rebuilt or updated index never returns stale results. Entries expire after a TTL and
+    the least recently used entries are evicted once the cache is full
+    """
+
+    # Cache shared by all queries, created on the first call to get_shared_cache
+    _shared_cache = None
+    _shared_cache_lock = threading.Lock()
+
+    def __init__(self, max_entries, ttl):
+        """
+        int max_entries: Number of results the cache can hold
+        float ttl: Number of seconds a result stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_shared_cache(cls, max_entries, ttl):
+        """
+        Returns the cache shared by every query in the process, its limits are set to the given ones
+        int max_entries: Number of results the cache can hold
+        float ttl: Number of seconds a result stays valid
+        """
+        with cls._shared_cache_lock:
+            if cls._shared_cache is None:
+                cls._shared_cache = cls(max_entries, ttl)
+            else:
+                cls._shared_cache.set_limits(max_entries, ttl)
+            return cls._shared_cache
+
+    @staticmethod
+    def normalize_query(query_string):
+        """
+        Returns the terms of a query as a tuple, queries differing only in whitespace share a key
+        The order of the terms is kept, it matters to window operators and to the order scores are summed in
+        str query_string: A query of arbitrary number of terms
+        """
+        return tuple(query_string.split())
+
+    def set_limits(self, max_entries, ttl):
+        """
+        Sets the number of results the cache can hold and their TTL, evicting results over the new size
+        int max_entries: Number of results the cache can hold
+        float ttl: Number of seconds a result stays valid
+        """
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns a copy of the cached results for a key, None if they aren't cached or have expired
+        tuple key: Generation of the index followed by the query and its parameters
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return [dict(result) for result in entry[1]]
+
+    def put(self, key, results):
+        """
+        Adds a copy of the results for a key to the cache, evicting the least recently used results if it is full
+        tuple key: Generation of the index followed by the query and its parameters
+        list results: List of result dictionaries
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), [dict(result) for result in results])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every result from the cache, the hit and miss counters are kept
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns a dictionary of the hits, misses and number of results in the cache
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'numberOfResults': len(self._entries),
+                'maxEntries': self.max_entries
+            }
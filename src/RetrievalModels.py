@@ -1,11 +1,20 @@
 # Import built-in libraries
 import math
+from collections import Counter
+
+# Import third-party libraries
+import numpy as np
 
 
 class RetrievalModels():
     """
     Class which exposes APIs to query an inverted index using various modes and scoring models
     """
+
+    # Scoring models whose score for a term is bounded by the largest dtf and shortest document length of
+    # its postings, only these can be used for dynamic pruning
+    max_score_models = ('bm25', 'vector_space')
+
     def __init__(self,
                  query_terms,
                  inverted_index,
@@ -33,101 +42,281 @@ class RetrievalModels():
         self.b = b
         self.alphaD = alphaD
         self.mu = mu
+        # The query is prepared once, scoring a posting is then only arithmetic on its dtf and document length
+        # Frequency of every term in the query
+        self.qtfs = Counter(query_terms)
+        # Constants of every query term scored so far, they are computed when the term is first scored
+        self.term_constants = {}
+        # Number of documents, average document length and total length of all documents in the collection
+        self.N = inverted_index.get_total_docs()
+        self.avdl = inverted_index.get_average_doc_length()
+        self.cl = inverted_index.get_collection_length()
+        self.doc_lengths = inverted_index.get_docs_meta().get_doc_lengths()
+        self.scoring_function = self.__getattribute__(self.retrieval_model)
+        self.prepare_term = self.__getattribute__('prepare_' + self.retrieval_model)
+        # Length normalization of every document, indexed by doc_id
+        self.doc_length_norm_key = None
+        self.doc_length_norms = None
+        if self.retrieval_model == 'bm25':
+            # K of every document
+            self.doc_length_norm_key = ('bm25', self.k1, self.b, self.avdl)
+        elif self.retrieval_model == 'dirichlet':
+            self.doc_length_norm_key = ('dirichlet', self.mu)
+        if self.doc_length_norm_key is not None:
+            self.doc_length_norms = inverted_index.get_doc_length_normalization(
+                self.doc_length_norm_key, self.normalize_doc_lengths)
 
     def get_score(self, query_term, doc):
         """
         Runs a scoring model and returns the score for a doc for a given query term
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
+        """
+        return self.scoring_function(query_term, doc)
+
+    def get_scores(self, query_term, doc_ids, dtfs):
+        """
+        Runs a scoring model on many documents at once and returns the NumPy array of their scores for a query term
+        str query_term: Query Term to calculate the doc scores for
+        array doc_ids: NumPy array of the doc_ids to score
+        array dtfs: NumPy array of the dtfs of the term in those documents
+        """
+        return self.__getattribute__(self.retrieval_model + '_array')(query_term, doc_ids, dtfs)
+
+    def get_max_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns an upper bound on the score for a query term of the postings with at most the given dtf and
+        at least the given document length, only for the models in max_score_models
+        str query_term: Query Term to bound the score of
+        int max_dtf: Largest dtf of the postings
+        int min_doc_length: Length of the shortest document of the postings
+        """
+        return self.__getattribute__(self.retrieval_model + '_max_score')(query_term, max_dtf, min_doc_length)
+
+    def get_min_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns a lower bound on the score for a query term of the postings with at most the given dtf and
+        at least the given document length, only for the models in max_score_models
+        str query_term: Query Term to bound the score of
+        int max_dtf: Largest dtf of the postings
+        int min_doc_length: Length of the shortest document of the postings
+        """
+        return self.__getattribute__(self.retrieval_model + '_min_score')(query_term, max_dtf, min_doc_length)
+
+    def normalize_doc_lengths(self, dl):
+        """
+        Returns the length normalization of the scoring model for an array of document lengths
+        array dl: NumPy array of document lengths
+        """
+        if self.retrieval_model == 'bm25':
+            return self.k1 * ((1 - self.b) + self.b * (dl / self.avdl))
+        return dl + self.mu
+
+    def get_doc_length_norms_array(self):
+        """
+        Returns the NumPy array of the length normalization of every document, indexed by doc_id
+        """
+        return self.inverted_index.get_doc_length_normalization_array(self.doc_length_norm_key, self.normalize_doc_lengths)
+
+    def get_term_constants(self, query_term):
+        """
+        Returns the constants of the scoring model for a query term, they are computed on its first call
+        str query_term: Query Term to get the constants for
         """
-        return self.__getattribute__(self.retrieval_model)(query_term, doc)
+        constants = self.term_constants.get(query_term)
+        if constants is None:
+            constants = self.term_constants[query_term] = self.prepare_term(query_term)
+        return constants
+
+    def prepare_raw_counts(self, query_term):
+        """
+        Returns the frequency of a term in the query
+        str query_term: Query Term to prepare
+        """
+        return self.qtfs[query_term]
 
     def raw_counts(self, query_term, doc):
         """
         Returns a raw count score for a document - the dtf of the document
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
+        """
+        return doc.get_dtf() * self.get_term_constants(query_term)
+
+    def raw_counts_array(self, query_term, doc_ids, dtfs):
+        """
+        Returns the raw count scores of many documents for a query term, see raw_counts
         """
-        return doc.get_dtf() * self.query_terms.count(query_term)
-    
+        return dtfs * self.get_term_constants(query_term)
+
+    def prepare_vector_space(self, query_term):
+        """
+        Returns the IDF of a term, log(N / nk)
+        str query_term: Query Term to prepare
+        """
+        # Number of documents containing the term (document frequency - df)
+        nk = self.inverted_index.get_df(query_term)
+        return math.log(self.N / nk)
+
     def vector_space(self, query_term, doc):
         """
         Returns a Vector Space model score for a document given a query term
         Summation for all query terms is done in the retrieval algorithm
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
         """
+        idf = self.get_term_constants(query_term)
         # Frequency of term in the document (document term frequency - dtf)
         fik = doc.get_dtf()
-        # Number of documents in the collection
-        N = self.inverted_index.get_total_docs()
-        # Number of documents containing the term (document frequency - df)
-        nk = self.inverted_index.get_df(query_term)
-        
+
         score = 0
         if fik:
-            score = (math.log(fik) + 1) * math.log(N / nk)
+            score = (math.log(fik) + 1) * idf
         return score
 
+    def vector_space_array(self, query_term, doc_ids, dtfs):
+        """
+        Returns the Vector Space model scores of many documents for a query term, see vector_space
+        The dtfs of postings are never 0
+        """
+        idf = self.get_term_constants(query_term)
+        return (np.log(dtfs) + 1) * idf
+
+    def vector_space_max_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns an upper bound on the Vector Space model score of postings, see get_max_score
+        The score grows with the dtf and doesn't depend on the document length
+        """
+        idf = self.get_term_constants(query_term)
+        return (math.log(max_dtf) + 1) * idf
+
+    def vector_space_min_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns a lower bound on the Vector Space model score of postings, see get_min_score
+        The IDF is never negative, so neither is the score
+        """
+        return 0.0
+
+    def prepare_bm25(self, query_term):
+        """
+        Returns the IDF of a term and the weight of its frequency in the query
+        str query_term: Query Term to prepare
+        """
+        # Frequency of term in the query
+        qfi = self.qtfs[query_term]
+        # Number of documents containing the term (document frequency - df)
+        ni = self.inverted_index.get_df(query_term)
+        idf = math.log((self.N - ni + 0.5) / (ni + 0.5))
+        qtf_weight = (self.k2 + 1) * qfi / (self.k2 + qfi)
+        return (idf, qtf_weight)
+
     def bm25(self, query_term, doc):
         """
         Returns a BM25 score for a document given a query term
         Summation for all query terms is done in the retrieval algorithm
         R and ri are set to 0 as there is no relevance information available
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
         """
+        idf, qtf_weight = self.get_term_constants(query_term)
         # Frequency of term in the document (document term frequency - dtf)
         fi = doc.get_dtf()
-        # Frequency of term in the query
-        qfi = self.query_terms.count(query_term)
-        # Number of documents containing the term (document frequency - df)
-        ni = self.inverted_index.get_df(query_term)
-        # Number of documents in the collection
-        N = self.inverted_index.get_total_docs()
-        # Length of the document
-        dl = self.inverted_index.get_doc_length(doc.get_doc_id())
-        # Average length of a document in the collection
-        avdl = self.inverted_index.get_average_doc_length()
-        K = self.k1 * ((1 - self.b) + self.b * (dl / avdl))
-        
-        score = math.log((N - ni + 0.5) / (ni + 0.5)) * ((self.k1 + 1) * fi / (K + fi)) * ((self.k2 + 1) * qfi / (self.k2 + qfi))
+        K = self.doc_length_norms[doc.get_doc_id()]
+
+        score = idf * ((self.k1 + 1) * fi / (K + fi)) * qtf_weight
         return score
 
+    def bm25_array(self, query_term, doc_ids, dtfs):
+        """
+        Returns the BM25 scores of many documents for a query term, see bm25
+        """
+        idf, qtf_weight = self.get_term_constants(query_term)
+        K = self.get_doc_length_norms_array()[doc_ids]
+        return idf * ((self.k1 + 1) * dtfs / (K + dtfs)) * qtf_weight
+
+    def bm25_max_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns an upper bound on the BM25 score of postings, see get_max_score
+        The score of a term with a positive IDF grows with the dtf and shrinks with the document length, the
+        score of a term with a negative IDF is never above 0
+        """
+        idf, qtf_weight = self.get_term_constants(query_term)
+        if idf <= 0:
+            return 0.0
+        K = self.normalize_doc_lengths(min_doc_length)
+        return idf * ((self.k1 + 1) * max_dtf / (K + max_dtf)) * qtf_weight
+
+    def bm25_min_score(self, query_term, max_dtf, min_doc_length):
+        """
+        Returns a lower bound on the BM25 score of postings, see get_min_score
+        The score of a term with a negative IDF shrinks as the dtf grows and the document length shrinks, the
+        score of a term with a positive IDF is never below 0
+        """
+        idf, qtf_weight = self.get_term_constants(query_term)
+        if idf >= 0:
+            return 0.0
+        K = self.normalize_doc_lengths(min_doc_length)
+        return idf * ((self.k1 + 1) * max_dtf / (K + max_dtf)) * qtf_weight
+
+    def prepare_jelinek_mercer(self, query_term):
+        """
+        Returns the smoothed probability of a term in the collection and its frequency in the query
+        str query_term: Query Term to prepare
+        """
+        # Frequency of term in the collection (collection term frequency - ctf)
+        cqi = self.inverted_index.get_ctf(query_term)
+        return (self.alphaD * (cqi / self.cl), self.qtfs[query_term])
+
     def jelinek_mercer(self, query_term, doc):
         """
         Returns a Jelinek-Mercer smoothed query likelihood score for a document given a query term
         Summation for all query terms is done in the retrieval algorithm
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
         """
+        background, qtf = self.get_term_constants(query_term)
         # Frequency of term in the document (document term frequency - dtf)
         fqiD = doc.get_dtf()
         # Length of the document
-        dl = self.inverted_index.get_doc_length(doc.get_doc_id())
+        dl = self.doc_lengths[doc.get_doc_id()]
+
+        score = math.log(((1 - self.alphaD) * (fqiD / dl)) + background)
+        return score * qtf
+
+    def jelinek_mercer_array(self, query_term, doc_ids, dtfs):
+        """
+        Returns the Jelinek-Mercer smoothed scores of many documents for a query term, see jelinek_mercer
+        """
+        background, qtf = self.get_term_constants(query_term)
+        dl = self.inverted_index.get_doc_lengths_array()[doc_ids]
+        return np.log(((1 - self.alphaD) * (dtfs / dl)) + background) * qtf
+
+    def prepare_dirichlet(self, query_term):
+        """
+        Returns the smoothed probability of a term in the collection and its frequency in the query
+        str query_term: Query Term to prepare
+        """
         # Frequency of term in the collection (collection term frequency - ctf)
         cqi = self.inverted_index.get_ctf(query_term)
-        # Total length of all documents in the collection
-        cl = self.inverted_index.get_collection_length()
-        
-        score = math.log(((1 - self.alphaD) * (fqiD / dl)) + (self.alphaD * (cqi / cl)))
-        return score * self.query_terms.count(query_term)
+        return (self.mu * (cqi / self.cl), self.qtfs[query_term])
 
     def dirichlet(self, query_term, doc):
         """
         Returns a Dirichlet smoothed query likelihood score for a document given a query term
         Summation for all query terms is done in the retrieval algorithm
         str query_term: Query Term to calculate the doc score for
-        class doc: Instance of Posting to be scored
+        class doc: Instance of Posting or PostingsCursor to be scored
         """
+        background, qtf = self.get_term_constants(query_term)
         # Frequency of term in the document (document term frequency - dtf)
         fqiD = doc.get_dtf()
-        # Length of the document
-        dl = self.inverted_index.get_doc_length(doc.get_doc_id())
-        # Frequency of term in the collection (collection term frequency - ctf)
-        cqi = self.inverted_index.get_ctf(query_term)
-        # Total length of all documents in the collection
-        cl = self.inverted_index.get_collection_length()
-        
-        score = math.log((fqiD + (self.mu * (cqi / cl))) / (dl + self.mu))
-        return score * self.query_terms.count(query_term)
+
+        score = math.log((fqiD + background) / self.doc_length_norms[doc.get_doc_id()])
+        return score * qtf
+
+    def dirichlet_array(self, query_term, doc_ids, dtfs):
+        """
+        Returns the Dirichlet smoothed scores of many documents for a query term, see dirichlet
+        """
+        background, qtf = self.get_term_constants(query_term)
+        return np.log((dtfs + background) / self.get_doc_length_norms_array()[doc_ids]) * qtf
@@ -0,0 +1,83 @@
+# Import built-in libraries
+import json
+
+# Import src files
+from InvertedIndex import InvertedIndex
+from LookupTable import LookupTable
+
+
+class Segment(InvertedIndex):
+    """
+    Class for a segment of the index stored in its own directory with its own inverted lists and lookup table
+    A segment holds the postings of a range of doc_ids which starts at its doc-id base
+    """
+
+    def __init__(self, config, compressed, segment_dir):
+        """
+        class config: Instance of the configuration for the index
+        bool compressed: Flag to choose between a compressed / uncompressed index
+        str segment_dir: Path of the directory of the segment
+        """
+        super().__init__(config, compressed)
+        self.segment_dir = segment_dir
+        self._first_doc_id = 0
+        self._number_of_docs = 0
+
+    def get_first_doc_id(self):
+        """
+        Returns the doc-id base - the ID of the first document in the segment
+        """
+        return self._first_doc_id
+
+    def get_number_of_docs(self):
+        """
+        Returns the number of documents in the segment
+        """
+        return self._number_of_docs
+
+    def set_doc_range(self, first_doc_id, number_of_docs):
+        """
+        Sets the range of doc_ids held in the segment
+        int first_doc_id: ID of the first document in the segment
+        int number_of_docs: Number of documents in the segment
+        """
+        self._first_doc_id = first_doc_id
+        self._number_of_docs = number_of_docs
+
+    def get_inverted_lists_file_path(self):
+        """
+        Returns the path of the inverted lists file of the segment
+        """
+        return self.segment_dir + '/' + self.config.inverted_lists_file_name
+
+    def get_lookup_table_file_path(self):
+        """
+        Returns the path of the lookup table file of the segment
+        """
+        return self.segment_dir + '/' + self.config.lookup_table_file_name
+
+    def get_segment_meta_file_path(self):
+        """
+        Returns the path of the file holding the doc-id range of the segment
+        """
+        return self.segment_dir + '/' + self.config.segment_meta_file_name
+
+    def get_inverted_list(self, term):
+        """
+        Returns the inverted list of a term in the segment, it is always read from disk
+        str term: Term to get the inverted list for
+        """
+        return self.read_inverted_list(term)
+
+    def load(self):
+        """
+        Loads the lookup table and doc-id range of the segment from disk and opens its inverted lists
+        """
+        with open(self.get_segment_meta_file_path(), 'r') as f:
+            segment_meta = json.load(f)
+            self.set_doc_range(segment_meta['firstDocId'], segment_meta['numberOfDocs'])
+        with open(self.get_lookup_table_file_path(), 'rb') as f:
+            lookup_table = LookupTable()
+            lookup_table.load(f)
+            self.load_lookup_table(lookup_table)
+        self.open_inverted_lists()
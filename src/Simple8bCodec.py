@@ -0,0 +1,65 @@
+# Import third-party libraries
+import numpy as np
+
+# Import src files
+from Codec import Codec
+
+
+class Simple8bCodec(Codec):
+    """
+    Codec for Simple-8b encoding, which packs as many integers as fit into each 64-bit word
+    The top 4 bits of a word select how many integers of how many bits the other 60 bits hold
+    """
+
+    # Number of integers and bits per integer in a word for each selector, selectors 0 and 1 are runs of zeros
+    selector_counts = np.array([240, 120, 60, 30, 20, 15, 12, 10, 8, 7, 6, 5, 4, 3, 2, 1], dtype=np.int64)
+    selector_bits = np.array([0, 0, 1, 2, 3, 4, 5, 6, 7, 8, 10, 12, 15, 20, 30, 60], dtype=np.int64)
+
+    def encode(self, num_list):
+        """
+        Encodes a list of integers and returns the bytearray and its size in bytes
+        Every word greedily takes the densest selector that fits the integers which follow
+        list num_list: List of non-negative integers below 2^60
+        """
+        words = []
+        i = 0
+        while i < len(num_list):
+            for selector in range(len(self.selector_counts)):
+                count = int(self.selector_counts[selector])
+                bits = int(self.selector_bits[selector])
+                chunk = num_list[i: i + count]
+                if len(chunk) < count or max(chunk) >= 1 << bits:
+                    continue
+                word = selector << 60
+                for j, num in enumerate(chunk):
+                    word |= num << (bits * j)
+                words.append(word)
+                i += count
+                break
+            else:
+                raise ValueError('Simple-8b cannot encode integers of 2^60 or more')
+        list_buffer = bytearray(np.array(words, dtype='<u8').tobytes())
+        return (list_buffer, len(list_buffer))
+
+    def decode(self, list_buffer, count):
+        """
+        Decodes a buffer and returns the NumPy array of integers
+        The words of each selector are unpacked together with array operations
+        buffer list_buffer: Buffer holding exactly the integers written by encode
+        int count: Number of integers in the buffer
+        """
+        words = np.frombuffer(list_buffer, dtype='<u8')
+        selectors = (words >> np.uint64(60)).astype(np.int64)
+        counts = self.selector_counts[selectors]
+        word_offsets = np.cumsum(counts) - counts
+        num_array = np.zeros(count, dtype=np.int64)
+        for selector in np.unique(selectors):
+            bits = int(self.selector_bits[selector])
+            if not bits:
+                continue
+            selector_count = int(self.selector_counts[selector])
+            is_selector = selectors == selector
+            shifts = np.arange(selector_count, dtype=np.uint64) * np.uint64(bits)
+            values = (words[is_selector][:, None] >> shifts) & np.uint64((1 << bits) - 1)
+            num_array[word_offsets[is_selector][:, None] + np.arange(selector_count)] = values
+        return num_array
@@ -0,0 +1,71 @@
+# Import built-in libraries
+import heapq
+import math
+
+
+class TopKCollector:
+    """
+    Class which collects the top k documents of a query from their scores
+    A bounded min-heap of (score, doc_id) keeps the k best documents seen so far, so collecting n scores takes
+    O(n log k) instead of sorting all of them. Documents are ranked by score, ties by doc_id, both descending,
+    which is the order of sorting (doc_id, score) pairs by (score, doc_id) in reverse
+    The score of the last of the top documents is the threshold a document has to reach to enter them, which
+    dynamic pruning uses to skip documents whose upper bound is below it
+    """
+
+    def __init__(self, count):
+        """
+        int count: Number of documents to collect
+        """
+        self.count = count
+        self._heap = []
+
+    def add(self, doc_id, score):
+        """
+        Adds a document if it ranks above the last of the top documents, which it then replaces
+        int doc_id: ID of the document
+        float score: Score of the document
+        """
+        if len(self._heap) < self.count:
+            heapq.heappush(self._heap, (score, doc_id))
+        elif self._heap and (score, doc_id) > self._heap[0]:
+            heapq.heapreplace(self._heap, (score, doc_id))
+
+    def add_all(self, scores):
+        """
+        Adds every document of a dictionary of scores
+        dict scores: Dictionary of {doc_id: score}
+        """
+        for doc_id, score in scores.items():
+            self.add(doc_id, score)
+
+    def is_full(self):
+        """
+        Returns True once count documents are collected, only then can a document be left out
+        """
+        return len(self._heap) >= self.count
+
+    def get_threshold(self):
+        """
+        Returns the score of the last of the top documents, -inf until count documents are collected
+        A document has to score at least this to enter the top documents, ties are broken by doc_id
+        """
+        if self.count <= 0:
+            return math.inf
+        if len(self._heap) < self.count:
+            return -math.inf
+        return self._heap[0][0]
+
+    def may_enter(self, bound):
+        """
+        Returns True if a document scoring at most bound may still enter the top documents
+        The bound is widened by a relative epsilon, as it is usually summed in a different order than the score it bounds
+        float bound: Upper bound on the score of the document
+        """
+        return bound + 1e-9 * (1 + abs(bound)) >= self.get_threshold()
+
+    def get_top_documents(self):
+        """
+        Returns the list of (doc_id, score) of the top documents sorted by score, ties by doc_id, both descending
+        """
+        return [(doc_id, score) for score, doc_id in sorted(self._heap, reverse=True)]
@@ -0,0 +1,24 @@
+# Import src files
+from Codec import Codec
+import utils
+
+
+class VByteCodec(Codec):
+    """
+    Codec for variable byte encoding, 7 bits of an integer per byte with the high bit set on the last byte
+    """
+
+    def encode(self, num_list):
+        """
+        Encodes a list of integers and returns the bytearray and its size in bytes
+        list num_list: List of non-negative integers
+        """
+        return utils.vbyte_encode(num_list)
+
+    def decode(self, list_buffer, count):
+        """
+        Decodes a buffer and returns the NumPy array of integers
+        buffer list_buffer: Buffer holding exactly the integers written by encode
+        int count: Number of integers in the buffer
+        """
+        return utils.vbyte_decode(list_buffer)
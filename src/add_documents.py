@@ -0,0 +1,32 @@
+# Import built-in libraries
+import argparse
+
+# Import src files
+from Indexer import Indexer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data_file_name',
+                        help='Set the name of the data file (in data_dir) with the scenes to add to the index')
+    parser.add_argument('--compressed', default=1,
+                        help='Set to 0 to return the uncompressed index, every index on disk is updated')
+    parser.add_argument('--index_dir', default='index',
+                        help='Set the name of the index directory')
+    parser.add_argument('--config_file_name', default='config',
+                        help='Set the name of the config file')
+    args = parser.parse_args()
+
+    # Create an indexer from the stored configuration of the index
+    indexer = Indexer(argparse.Namespace(
+        **{'index_dir': args.index_dir, 'config_file_name': args.config_file_name}))
+
+    inverted_index = indexer.add_documents(indexer.stream_data(args.data_file_name), int(args.compressed))
+    print('Index now has {} documents'.format(inverted_index.get_total_docs()))
+
+    # Let a background merge of segments finish before exiting
+    indexer.wait_for_merge()
+
+
+if __name__ == '__main__':
+    main()
@@ -69,7 +69,7 @@ def run_experiments(compressed=0, uncompressed=0):
     run_stats_generator(inverted_index, root_dir)
 
     print('Running retrieval model tasks..........')
-    run_retrieval_models_tasks(config, inverted_index, indexer, root_dir, top_k=10, judge_queries=[3], root_dir)
+    run_retrieval_models_tasks(config, inverted_index, indexer, root_dir, top_k=10, judge_queries=[3])
 
     print('Running inference network tasks..........')
     run_inference_network_tasks(config, inverted_index, indexer, root_dir, top_k=10, judge_queries=[6, 7, 8, 9, 10])
@@ -165,6 +165,12 @@ def run_timing_experiment(config, inverted_index, root_dir):
         end_time = time.time()
         print('Time Taken: ', end_time - start_time, 'seconds')
 
+    list_cache_stats = inverted_index.get_list_cache_stats()
+    if list_cache_stats:
+        print('Inverted list cache: ', list_cache_stats)
+    if query_index.result_cache is not None:
+        print('Query result cache: ', query_index.result_cache.get_stats())
+
 
 def run_stats_generator(index, root_dir):
     longest_play, shortest_play, longest_scene, shortest_scene, average_scene_length = get_data_stats(
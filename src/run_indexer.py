@@ -12,12 +12,40 @@ from utils import *
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--data_file_name', default='shakespeare-scenes.json',
+    parser.add_argument('--data_file_name', default='shakespeare-scenes.json.gz',
                         help='Set the name of the data file to load the data from')
     parser.add_argument('--compressed', default=1,
                         help='Set to 0 to not store compressed index')
     parser.add_argument('--in_memory', default=0,
                         help='Set to 1 if you want to store the whole index in memory')
+    parser.add_argument('--lazy_lists', default=0,
+                        help='Set to 1 to read the inverted lists of an in-memory index when they are first used instead of at startup')
+    parser.add_argument('--pin_lists', default=1,
+                        help='Set to 0 to read a lazily loaded inverted list from disk on every use instead of keeping it in memory')
+    parser.add_argument('--mmap_lists', default=1,
+                        help='Set to 0 to read inverted lists with a file read per term instead of a memory map')
+    parser.add_argument('--list_cache_size', default=0,
+                        help='Set the memory (in MB) for a cache of the most recently used inverted lists read from disk, 0 disables it')
+    parser.add_argument('--result_cache_size', default=0,
+                        help='Set the number of query results kept in a cache of recent queries, 0 disables it')
+    parser.add_argument('--result_cache_ttl', default=300,
+                        help='Set the number of seconds a cached query result stays valid')
+    parser.add_argument('--memory_budget', default=0,
+                        help='Set the memory (in MB) for postings after which a block is flushed to a sorted run file, 0 builds the whole index in memory')
+    parser.add_argument('--workers', default=1,
+                        help='Set the number of processes to build the index with, each indexes shards of consecutive doc_ids')
+    parser.add_argument('--merge_factor', default=10,
+                        help='Set the number of adjacent segments of added documents of the same size level which are merged into one')
+    parser.add_argument('--impact_ordered', default=0,
+                        help='Set to 1 to also build an impact-ordered index of quantized BM25 scores for score-at-a-time queries')
+    parser.add_argument('--impact_bits', default=8,
+                        help='Set the number of bits of a quantized impact in the impact-ordered index')
+    parser.add_argument('--doc_gaps_codec', default='vbyte',
+                        help='Set the codec for doc_id gaps in the compressed index (vbyte, pfordelta, simple8b or elias_gamma)')
+    parser.add_argument('--dtfs_codec', default='vbyte',
+                        help='Set the codec for document term frequencies in the compressed index')
+    parser.add_argument('--positions_codec', default='vbyte',
+                        help='Set the codec for position gaps in the compressed index')
     parser.add_argument('--retrieval_model', default='raw_counts',
                         help='Set the type of retrieval model for queries')
     parser.add_argument('--data_dir', default='data',
@@ -28,6 +56,8 @@ def main():
                         help='Set the name of the compressed index directory under index_dir')
     parser.add_argument('--uncompressed_dir', default='uncompressed',
                         help='Set the name of the uncompressed index directory under index_dir')
+    parser.add_argument('--runs_dir', default='runs',
+                        help='Set the name of the directory under index_dir for run files of a block-based build')
     parser.add_argument('--config_file_name', default='config',
                         help='Set the name of the config file')
     parser.add_argument('--inverted_lists_file_name', default='inverted_lists',
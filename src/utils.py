@@ -3,8 +3,66 @@ import sys
 import random
 import struct
 import json
+from bisect import bisect_left
+from itertools import accumulate
 from collections import defaultdict
 
+# Import third-party libraries
+import numpy as np
+
+
+def stream_json_array(file_buffer, chunk_size=1 << 16):
+    """
+    Yields the items of the first JSON array in a file one at a time without parsing the whole file
+    Only the item being decoded and one chunk of text are held in memory
+    buffer file_buffer: Text buffer for the JSON file
+    int chunk_size: Number of characters to read from the file at a time
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    # Skip everything up to and including the opening bracket of the array
+    while '[' not in buffer:
+        chunk = file_buffer.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+    buffer = buffer[buffer.index('[') + 1:]
+
+    end_of_file = False
+    while True:
+        # Drop whitespace and separators between items
+        buffer = buffer.lstrip(' \t\r\n,')
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+            # An item is followed by a separator, without one it may be a number cut short by the chunk, like 1. of 1.5
+            complete = buffer[end:end + 1] in (' ', '\t', '\r', '\n', ',', ']') if end < len(buffer) else end_of_file
+        except json.JSONDecodeError:
+            if end_of_file:
+                raise
+            complete = False
+        if not complete:
+            if end_of_file:
+                raise json.JSONDecodeError('Expecting \',\' delimiter', buffer, end)
+            # The item is incomplete, read more of the file and try again
+            chunk = file_buffer.read(chunk_size)
+            end_of_file = not chunk
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+
+
+def stream_json_lines(file_buffer):
+    """
+    Yields one JSON object per non-empty line of a file
+    buffer file_buffer: Text buffer for the JSON-lines file
+    """
+    for line in file_buffer:
+        if line.strip():
+            yield json.loads(line)
+
 
 def generate_random_terms_from_vocab(vocab, number_of_terms):
     terms = random.sample(vocab, number_of_terms)
@@ -81,7 +139,7 @@ def get_data_stats(index):
             shortest_scene = (scene_id, scene_num, scene_length)
         if scene_length >= longest_scene[2]:
             longest_scene = (scene_id, scene_num, scene_length)
-    average_scene_length = total_scene_length / len(docs_meta.keys())
+    average_scene_length = total_scene_length / len(docs_meta)
     plays_list = plays.items()
     sorted_plays_list = sorted(plays_list, key=lambda x: x[1], reverse=True)
     longest_play = sorted_plays_list[0]
@@ -102,12 +160,58 @@ def vbyte_encode(num_list):
         size_in_bytes += struct.calcsize('<B')
     return (list_buffer, size_in_bytes)
 
+# Buffers (in bytes) and delta lists shorter than this are decoded in a Python loop, as NumPy's per-call overhead is larger
+bulk_decode_threshold = 128
+
 # https://stackoverflow.com/questions/52668295/vbyte-decoder-in-information-retrieval
 # https://nlp.stanford.edu/IR-book/html/htmledition/variable-byte-codes-1.html
 def vbyte_decode(list_buffer):
+    """
+    Returns the numbers in a vbyte encoded buffer as a NumPy array
+    The terminator bytes of the whole buffer are found at once and every byte is shifted and ORed
+    into its number with array operations, short buffers fall back to a loop over the bytes
+    buffer list_buffer: Buffer of vbyte encoded numbers
+    """
+    if len(list_buffer) < bulk_decode_threshold:
+        num_list = []
+        i = 0
+        while i < len(list_buffer):
+            pointer = 0
+            byte = list_buffer[i]
+            num = byte & 0x7f
+            while byte & 0x80 == 0:
+                i += 1
+                pointer += 1
+                byte = list_buffer[i]
+                new_byte = byte & 0x7f
+                num |= new_byte << (7 * pointer)
+            num_list.append(num)
+            i += 1
+        return np.array(num_list, dtype=np.int64)
+    list_bytes = np.frombuffer(list_buffer, dtype=np.uint8)
+    # The last byte of every number has its high bit set
+    ends = np.flatnonzero(list_bytes & 0x80)
+    if len(ends) == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.empty(len(ends), dtype=np.int64)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    # Shift every byte by 7 bits for each byte before it in its number and OR the bytes of a number together
+    shifts = 7 * (np.arange(len(list_bytes)) - np.repeat(starts, ends - starts + 1))
+    values = (list_bytes & 0x7f).astype(np.int64) << shifts
+    return np.bitwise_or.reduceat(values, starts)
+
+def vbyte_decode_count(list_buffer, count, position=0):
+    """
+    Decodes count numbers from a vbyte encoded buffer starting at a byte position
+    Returns the list of numbers and the position of the byte after the last one decoded
+    buffer list_buffer: Buffer of vbyte encoded numbers
+    int count: Number of numbers to decode
+    int position: Position of the first byte to decode
+    """
     num_list = []
-    i = 0
-    while i < len(list_buffer):
+    i = position
+    for _ in range(count):
         pointer = 0
         byte = list_buffer[i]
         num = byte & 0x7f
@@ -115,11 +219,32 @@ def vbyte_decode(list_buffer):
             i += 1
             pointer += 1
             byte = list_buffer[i]
-            new_byte = byte & 0x7f
-            num |= new_byte << (7 * pointer)
+            num |= (byte & 0x7f) << (7 * pointer)
         num_list.append(num)
         i += 1
-    return num_list
+    return (num_list, i)
+
+def gallop(values, value, low=0):
+    """
+    Returns the index of the first item greater than or equal to value in a sorted list, searching from low
+    The steps from low double until one passes value (exponential / galloping search), then the last step is
+    binary searched, so the cost grows with the log of the distance moved instead of the length of the list
+    list values: Sorted list to search
+    int value: Value to search for
+    int low: Index to start the search from, every item before it is taken to be smaller than value
+    """
+    if low >= len(values) or values[low] >= value:
+        return low
+    # values[previous] < value, and values[position] >= value unless position is past the end
+    previous = low
+    step = 1
+    position = low + 1
+    while position < len(values) and values[position] < value:
+        previous = position
+        step *= 2
+        position = previous + step
+    return bisect_left(values, value, previous + 1, min(position, len(values)))
+
 
 def delta_encode(positions):
     delta_encoded_positions = []
@@ -130,13 +255,29 @@ def delta_encode(positions):
         previous_position = position
     return delta_encoded_positions
 
-def delta_decode(delta_encoded_positions):
-    positions = []
-    previous_position = 0
-    for delta_encoded_position in delta_encoded_positions:
-        position = delta_encoded_position + previous_position
-        positions.append(position)
-        previous_position = position
+def delta_decode(delta_encoded_positions, lengths=None):
+    """
+    Returns the NumPy array of positions from their deltas as a cumulative sum
+    If lengths are given, the deltas are runs of the given lengths which are decoded separately
+    list delta_encoded_positions: Deltas of the positions (a list or a NumPy array)
+    list lengths: Lengths of the runs of deltas, each run starts from 0
+    """
+    if len(delta_encoded_positions) < bulk_decode_threshold:
+        if isinstance(delta_encoded_positions, np.ndarray):
+            delta_encoded_positions = delta_encoded_positions.tolist()
+        if lengths is None:
+            return np.array(list(accumulate(delta_encoded_positions)), dtype=np.int64)
+        positions = []
+        for run_length in lengths:
+            positions += accumulate(delta_encoded_positions[len(positions): len(positions) + run_length])
+        return np.array(positions, dtype=np.int64)
+    positions = np.cumsum(delta_encoded_positions, dtype=np.int64)
+    if lengths is not None:
+        # Take off the sum of the deltas of the runs before each run, an empty run may start after the last delta
+        lengths = np.asarray(lengths, dtype=np.int64)
+        run_starts = np.cumsum(lengths) - lengths
+        run_bases = np.concatenate(([0], positions))[run_starts]
+        positions -= np.repeat(run_bases, lengths)
     return positions
 
 def generate_trecrun_file(filename, query_results):
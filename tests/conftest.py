@@ -0,0 +1,146 @@
+# Import built-in libraries
+import os
+import sys
+import json
+import random
+import argparse
+
+# Import third-party libraries
+import pytest
+
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir + '/src')
+
+# Import src files
+from Indexer import Indexer
+from Query import Query
+
+
+def make_scenes(number_of_scenes, first_scene_num=0, seed=0):
+    """
+    Returns synthetic scenes whose terms follow a Zipf-like distribution, so a few terms occur in nearly every
+    scene (with a negative BM25 IDF) and lists of common terms span several blocks
+    int number_of_scenes: Number of scenes to make
+    int first_scene_num: sceneNum of the first scene, scenes added later continue the numbering
+    int seed: Seed of the random generator
+    """
+    rng = random.Random(seed)
+    vocabulary = ['term' + str(i) for i in range(2000)]
+    weights = [1 / (i + 1) for i in range(len(vocabulary))]
+    scenes = []
+    for scene_num in range(first_scene_num, first_scene_num + number_of_scenes):
+        play_id = 'play_' + str(scene_num // 20)
+        scenes.append({
+            'playId': play_id,
+            'sceneId': play_id + ':' + str(scene_num % 20),
+            'sceneNum': scene_num,
+            'text': ' '.join(rng.choices(vocabulary, weights, k=rng.randint(10, 200)))
+        })
+    return scenes
+
+
+def write_scenes(path, scenes):
+    """
+    Writes scenes to a JSON-lines data file
+    str path: Path of the data file
+    list scenes: Scenes to write
+    """
+    with open(path, 'w') as f:
+        for scene in scenes:
+            f.write(json.dumps(scene) + '\n')
+
+
+def search(indexer, inverted_index, query_string, **params):
+    """
+    Returns the (sceneId, score) pairs a Query with the given params retrieves, scores rounded to 9 places
+    """
+    query = Query(indexer.config, inverted_index, **params)
+    return [(doc['sceneId'], round(doc['score'], 9)) for doc in query.get_documents(query_string)]
+
+
+# Queries over common, rare and repeated terms of make_scenes
+queries = [
+    'term17 term40',
+    'term0 term1 term2',
+    'term5 term40 term120 term7',
+    'term250',
+    'term1 term1 term9',
+    'term30 term30 term60 term90',
+    'term0 term50 term99 term150 term200 term2 term11'
+]
+
+
+class IndexBuilder:
+    """
+    Builds indexes of a corpus under a temporary directory and closes them once the test is done
+    """
+
+    def __init__(self, tmp_path):
+        """
+        Path tmp_path: Temporary directory of the test
+        """
+        self.tmp_path = tmp_path
+        self.indexes = []
+        os.makedirs(str(tmp_path) + '/data', exist_ok=True)
+
+    def get_args(self, index_name, **params):
+        """
+        Returns the arguments of an Indexer for an index in the temporary directory
+        Paths in the config are relative to the repository, so the temporary directory is reached from there
+        str index_name: Name of the index directory
+        """
+        args = {
+            'data_dir': os.path.relpath(str(self.tmp_path) + '/data', root_dir),
+            'index_dir': os.path.relpath(str(self.tmp_path) + '/' + index_name, root_dir),
+            'config_file_name': 'config'
+        }
+        args.update(params)
+        return argparse.Namespace(**args)
+
+    def write_data(self, data_file_name, scenes):
+        """
+        Writes scenes to a data file in the temporary data directory
+        """
+        write_scenes(str(self.tmp_path) + '/data/' + data_file_name, scenes)
+
+    def build(self, scenes, index_name='index', compressed=1, **params):
+        """
+        Builds (or loads) an index of the scenes and returns the indexer and the index
+        list scenes: Scenes to index
+        str index_name: Name of the index directory
+        int compressed: Flag to choose between a compressed / uncompressed index
+        """
+        data_file_name = index_name + '.jsonl'
+        self.write_data(data_file_name, scenes)
+        indexer = Indexer(self.get_args(index_name, data_file_name=data_file_name, compressed=compressed, **params))
+        return indexer, self.track(indexer.get_inverted_index(compressed))
+
+    def load(self, index_name='index', compressed=1, **params):
+        """
+        Loads an existing index with its stored configuration and returns the indexer and the index
+        """
+        indexer = Indexer(self.get_args(index_name, compressed=compressed, **params))
+        return indexer, self.track(indexer.get_inverted_index(compressed))
+
+    def track(self, inverted_index):
+        """
+        Closes the index at the end of the test
+        """
+        self.indexes.append(inverted_index)
+        return inverted_index
+
+    def close(self):
+        for inverted_index in self.indexes:
+            inverted_index.close()
+
+
+@pytest.fixture
+def index_builder(tmp_path):
+    builder = IndexBuilder(tmp_path)
+    yield builder
+    builder.close()
+
+
+@pytest.fixture(scope='session')
+def scenes():
+    return make_scenes(400)
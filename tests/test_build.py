@@ -0,0 +1,124 @@
+# Import built-in libraries
+import os
+import struct
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from Indexer import Indexer
+from InvertedIndex import InvertedIndex
+from conftest import queries, search
+
+
+def get_results(indexer, inverted_index, mode='doc', retrieval_model='bm25'):
+    return [search(indexer, inverted_index, query_string, mode=mode, retrieval_model=retrieval_model, count=20)
+            for query_string in queries]
+
+
+def get_postings(inverted_index):
+    postings = {}
+    for term in inverted_index.get_vocabulary():
+        inverted_list = inverted_index.get_inverted_list(term)
+        postings[term] = (inverted_list.get_doc_ids().tolist(), inverted_list.get_dtfs().tolist(),
+                          inverted_list.get_positions().tolist())
+    return postings
+
+
+def test_loaded_index_matches_built_index(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes)
+    built_results = get_results(indexer, inverted_index)
+    indexer, inverted_index = index_builder.load()
+    assert get_results(indexer, inverted_index) == built_results
+
+
+def test_missing_index_is_rebuilt(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes)
+    built_results = get_results(indexer, inverted_index)
+    os.remove(inverted_index.get_inverted_lists_file_path())
+    indexer, inverted_index = index_builder.build(scenes)
+    assert get_results(indexer, inverted_index) == built_results
+
+
+def test_load_errors_are_raised(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes)
+    # Only a missing index or one in another format is rebuilt, a truncated file isn't hidden by a rebuild
+    with open(indexer.root_dir + '/' + indexer.config.index_dir + '/' + indexer.config.docs_meta_file_name, 'wb') as f:
+        f.write(b'DOC')
+    with pytest.raises(struct.error):
+        index_builder.load()
+
+
+@pytest.mark.parametrize('compressed', [0, 1])
+def test_block_based_build_matches_in_memory_build(index_builder, scenes, monkeypatch, compressed):
+    indexer, inverted_index = index_builder.build(scenes, 'in_memory', compressed)
+    # Inflate the estimated size of a position so a budget of 1 MB flushes a run every few dozen scenes
+    monkeypatch.setattr(Indexer, 'position_size_estimate', 200)
+    run_sizes = []
+    add_run = Indexer.add_run
+    monkeypatch.setattr(Indexer, 'add_run', lambda self, index: run_sizes.append(len(index.get_map())) or add_run(self, index))
+    block_indexer, block_inverted_index = index_builder.build(scenes, 'block_based', compressed, memory_budget=1)
+    assert len(run_sizes) > 2
+    assert block_inverted_index.get_collection_stats() == inverted_index.get_collection_stats()
+    assert get_postings(block_inverted_index) == get_postings(inverted_index)
+    assert get_results(block_indexer, block_inverted_index) == get_results(indexer, inverted_index)
+    assert not os.path.exists(block_indexer.root_dir + '/' + block_indexer.config.index_dir + '/runs')
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_merge_fan_in_is_bounded(index_builder, scenes, monkeypatch, workers):
+    indexer, inverted_index = index_builder.build(scenes, 'in_memory')
+    monkeypatch.setattr(Indexer, 'position_size_estimate', 1000)
+    monkeypatch.setattr(Indexer, 'scenes_per_shard', 10)
+    monkeypatch.setattr(Indexer, 'max_merge_fan_in', 3)
+    numbers_of_runs = []
+    reduce_runs = Indexer.reduce_runs
+
+    def count_runs(self):
+        numbers_of_runs.append(len(self.run_file_names))
+        reduce_runs(self)
+        numbers_of_runs.append(len(self.run_file_names))
+
+    monkeypatch.setattr(Indexer, 'reduce_runs', count_runs)
+    if workers > 1:
+        block_indexer, block_inverted_index = index_builder.build(scenes, 'parallel', workers=workers)
+    else:
+        block_indexer, block_inverted_index = index_builder.build(scenes, 'block_based', memory_budget=1)
+    # The runs are merged in several passes down to at most max_merge_fan_in runs for the final merge
+    assert numbers_of_runs[0] > 9
+    assert numbers_of_runs[1] <= 3
+    assert get_postings(block_inverted_index) == get_postings(inverted_index)
+    assert get_results(block_indexer, block_inverted_index) == get_results(indexer, inverted_index)
+
+
+@pytest.mark.parametrize('compressed', [0, 1])
+def test_parallel_build_matches_in_memory_build(index_builder, scenes, monkeypatch, compressed):
+    indexer, inverted_index = index_builder.build(scenes, 'in_memory', compressed)
+    monkeypatch.setattr(Indexer, 'scenes_per_shard', 25)
+    parallel_indexer, parallel_inverted_index = index_builder.build(scenes, 'parallel', compressed, workers=3)
+    assert parallel_inverted_index.get_collection_stats() == inverted_index.get_collection_stats()
+    for term in inverted_index.get_vocabulary():
+        for stat in ('get_df', 'get_ctf', 'get_max_dtf', 'get_min_doc_length'):
+            assert getattr(parallel_inverted_index, stat)(term) == getattr(inverted_index, stat)(term)
+    assert get_postings(parallel_inverted_index) == get_postings(inverted_index)
+    assert get_results(parallel_indexer, parallel_inverted_index) == get_results(indexer, inverted_index)
+    assert not os.path.exists(parallel_indexer.root_dir + '/' + parallel_indexer.config.index_dir + '/runs')
+
+
+@pytest.mark.parametrize('pin_lists', [0, 1])
+def test_lazy_lists_are_read_on_use(index_builder, scenes, monkeypatch, pin_lists):
+    indexer, inverted_index = index_builder.build(scenes)
+    results = get_results(indexer, inverted_index)
+    terms_read = []
+    read_inverted_list_with_segments = InvertedIndex.read_inverted_list_with_segments
+    monkeypatch.setattr(InvertedIndex, 'read_inverted_list_with_segments',
+                        lambda self, term: terms_read.append(term) or read_inverted_list_with_segments(self, term))
+    lazy_indexer, lazy_inverted_index = index_builder.load(in_memory=1, lazy_lists=1, pin_lists=pin_lists)
+    # No list is read when the index is loaded
+    assert terms_read == []
+    for _ in range(3):
+        lazy_inverted_index.get_inverted_list('term5')
+    # A pinned list is read once and kept, otherwise it is read again on every use
+    assert terms_read == ['term5'] * (1 if pin_lists else 3)
+    assert get_results(lazy_indexer, lazy_inverted_index) == results
+    assert len(terms_read) > 3
@@ -0,0 +1,70 @@
+# Import built-in libraries
+import os
+
+# Import src files
+from QueryResultCache import QueryResultCache
+from conftest import queries, search, make_scenes
+
+
+def get_results(indexer, inverted_index):
+    return [search(indexer, inverted_index, query_string, count=20) for query_string in queries]
+
+
+def get_cache_stats(indexer):
+    config = indexer.config
+    return QueryResultCache.get_shared_cache(config.result_cache_size, config.result_cache_ttl).get_stats()
+
+
+def test_generation_changes_on_every_build(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes, result_cache_size=100)
+    generation = inverted_index.get_generation()
+    collection_stats_file_path = indexer.root_dir + '/' + indexer.config.index_dir + '/' + indexer.config.collection_stats_file_name
+    collection_stats = os.stat(collection_stats_file_path)
+    os.remove(inverted_index.get_inverted_lists_file_path())
+    indexer, inverted_index = index_builder.build(scenes, result_cache_size=100)
+    # The collection stats file is rewritten with the same size and modification time
+    os.utime(collection_stats_file_path, ns=(collection_stats.st_atime_ns, collection_stats.st_mtime_ns))
+    assert inverted_index.get_generation() != generation
+    assert index_builder.load(result_cache_size=100)[1].get_generation() == inverted_index.get_generation()
+
+
+def test_cached_results_are_not_returned_once_documents_are_added(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes[:300], result_cache_size=100)
+    results = get_results(indexer, inverted_index)
+    hits = get_cache_stats(indexer)['hits']
+    assert get_results(indexer, inverted_index) == results
+    assert get_cache_stats(indexer)['hits'] == hits + len(queries)
+
+    inverted_index = index_builder.track(indexer.add_documents(scenes[300:], 1))
+    indexer.wait_for_merge()
+    added_results = get_results(indexer, inverted_index)
+    assert added_results != results
+    uncached_indexer, uncached_inverted_index = index_builder.load(result_cache_size=0)
+    assert get_results(uncached_indexer, uncached_inverted_index) == added_results
+
+
+def test_cached_results_are_not_returned_once_the_index_is_rebuilt(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes, result_cache_size=100)
+    results = get_results(indexer, inverted_index)
+    os.remove(inverted_index.get_inverted_lists_file_path())
+    indexer, inverted_index = index_builder.build(make_scenes(400, seed=1), result_cache_size=100)
+    rebuilt_results = get_results(indexer, inverted_index)
+    assert rebuilt_results != results
+    uncached_indexer, uncached_inverted_index = index_builder.load(result_cache_size=0)
+    assert get_results(uncached_indexer, uncached_inverted_index) == rebuilt_results
+
+
+def test_list_cache(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes[:300])
+    cached_indexer, cached_inverted_index = index_builder.load(list_cache_size=64)
+    results = get_results(indexer, inverted_index)
+    assert get_results(cached_indexer, cached_inverted_index) == results
+    assert get_results(cached_indexer, cached_inverted_index) == results
+    list_cache_stats = cached_inverted_index.get_list_cache_stats()
+    assert list_cache_stats['hits'] > 0
+    assert 0 < list_cache_stats['sizeInBytes'] <= list_cache_stats['budgetInBytes']
+    # An index loaded after documents are added reads the lists of the new segment
+    added_inverted_index = index_builder.track(indexer.add_documents(scenes[300:], 1))
+    cached_indexer, cached_inverted_index = index_builder.load(list_cache_size=64)
+    assert get_results(cached_indexer, cached_inverted_index) == get_results(indexer, added_inverted_index)
+    indexer.wait_for_merge()
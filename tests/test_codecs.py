@@ -0,0 +1,84 @@
+# Import built-in libraries
+import random
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from CodecRegistry import CodecRegistry
+from Simple8bCodec import Simple8bCodec
+from test_build import get_postings, get_results
+
+codec_names = ['vbyte', 'pfordelta', 'simple8b', 'elias_gamma']
+
+rng = random.Random(0)
+num_lists = {
+    'empty': [],
+    'zero': [0],
+    'one': [1],
+    'small': [rng.randint(0, 15) for _ in range(300)],
+    # Mostly small numbers with a few large ones, which PForDelta stores as exceptions
+    'outliers': [rng.randint(0, 7) if i % 17 else rng.randint(1 << 20, 1 << 40) for i in range(400)],
+    'equal': [5] * 130,
+    'zeros': [0] * 500,
+    'powers_of_two': [(1 << bits) - 1 for bits in range(41)] + [1 << bits for bits in range(41)],
+    'partial_block': [rng.randint(0, 1000) for _ in range(129)]
+}
+
+
+def round_trip(codec_name, num_list):
+    codec = CodecRegistry.get_codec(codec_name)
+    list_buffer, size_in_bytes = codec.encode(num_list)
+    assert size_in_bytes == len(list_buffer)
+    # Decode from a read-only view, like the memory-mapped lists
+    return codec.decode(memoryview(bytes(list_buffer)), len(num_list)).tolist()
+
+
+@pytest.mark.parametrize('codec_name', codec_names)
+@pytest.mark.parametrize('list_name', sorted(num_lists))
+def test_round_trip(codec_name, list_name):
+    assert round_trip(codec_name, num_lists[list_name]) == num_lists[list_name]
+
+
+@pytest.mark.parametrize('selector', range(len(Simple8bCodec.selector_counts)))
+def test_simple8b_selectors(selector):
+    count = int(Simple8bCodec.selector_counts[selector])
+    bits = int(Simple8bCodec.selector_bits[selector])
+    # The largest integers of the selector fill exactly one word of it
+    num_list = [(1 << bits) - 1] * count
+    list_buffer, size_in_bytes = Simple8bCodec().encode(num_list)
+    assert size_in_bytes == 8
+    assert list_buffer[7] >> 4 == selector
+    assert Simple8bCodec().decode(list_buffer, count).tolist() == num_list
+
+
+def test_simple8b_rejects_large_integers():
+    with pytest.raises(ValueError):
+        Simple8bCodec().encode([1 << 60])
+
+
+def test_pfordelta_exceptions_are_patched():
+    num_list = [3] * 127 + [(1 << 40) + 3]
+    codec = CodecRegistry.get_codec('pfordelta')
+    list_buffer, size_in_bytes = codec.encode(num_list)
+    # The reference, a bit width of 0 and one exception, no low bits, the exception index and its high bits
+    assert list_buffer[1:3] == bytes([0, 1])
+    assert codec.decode(list_buffer, len(num_list)).tolist() == num_list
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        CodecRegistry.get_codec('gzip')
+
+
+@pytest.mark.parametrize('codec_name', codec_names[1:])
+def test_build_with_codec_matches_vbyte_build(index_builder, scenes, codec_name):
+    indexer, inverted_index = index_builder.build(scenes, 'vbyte')
+    codec_indexer, codec_inverted_index = index_builder.build(
+        scenes, codec_name, doc_gaps_codec=codec_name, dtfs_codec=codec_name, positions_codec=codec_name)
+    assert get_postings(codec_inverted_index) == get_postings(inverted_index)
+    assert get_results(codec_indexer, codec_inverted_index) == get_results(indexer, inverted_index)
+    # The codecs are stored in the index config, so the index loads with them
+    loaded_indexer, loaded_inverted_index = index_builder.load(codec_name)
+    assert type(loaded_inverted_index.get_codecs()[0]) is CodecRegistry.codecs[codec_name]
+    assert get_results(loaded_indexer, loaded_inverted_index) == get_results(indexer, inverted_index)
@@ -0,0 +1,60 @@
+# Import built-in libraries
+import io
+import struct
+
+# Import src files
+from DocsMeta import DocsMeta
+
+doc_metas = [
+    {'playId': 'hamlet', 'sceneId': 'hamlet:0', 'sceneNum': 0, 'sceneLength': 1200},
+    {'playId': 'hamlet', 'sceneId': 'hamlet:1', 'sceneNum': 1, 'sceneLength': 0x01020304,
+     'document_vector_position': 1 << 40, 'document_vector_size': 77},
+    {'playId': 'émigré', 'sceneId': 'émigré:0', 'sceneNum': -1, 'sceneLength': 3}
+]
+
+
+def dump_docs_meta(docs_meta):
+    file_buffer = io.BytesIO()
+    docs_meta.dump(file_buffer)
+    return file_buffer.getvalue()
+
+
+def make_docs_meta():
+    docs_meta = DocsMeta()
+    for doc_id, doc_meta in enumerate(doc_metas):
+        docs_meta.update_doc_meta(doc_id, doc_meta)
+    return docs_meta
+
+
+def test_round_trip():
+    loaded_docs_meta = DocsMeta()
+    loaded_docs_meta.load(io.BytesIO(dump_docs_meta(make_docs_meta())))
+    assert len(loaded_docs_meta) == 3
+    assert [doc_meta for doc_id, doc_meta in loaded_docs_meta.items()] == doc_metas
+    assert list(loaded_docs_meta.get_doc_lengths()) == [1200, 0x01020304, 3]
+    assert loaded_docs_meta.get_string_id('hamlet') == 0
+    assert dump_docs_meta(loaded_docs_meta) == dump_docs_meta(make_docs_meta())
+
+
+def test_columns_are_little_endian():
+    binary = dump_docs_meta(make_docs_meta())
+    # The scene length column follows the header
+    position = struct.calcsize(DocsMeta.format_header)
+    assert binary[position + 4: position + 8] == struct.pack('<i', 0x01020304)
+
+
+def test_byte_swapped_host(monkeypatch):
+    # A big-endian host swaps the columns to little-endian and back
+    binary = dump_docs_meta(make_docs_meta())
+    monkeypatch.setattr(DocsMeta, 'swap_bytes', True)
+    swapped_binary = dump_docs_meta(make_docs_meta())
+    assert swapped_binary != binary
+    loaded_docs_meta = DocsMeta()
+    loaded_docs_meta.load(io.BytesIO(swapped_binary))
+    assert [doc_meta for doc_id, doc_meta in loaded_docs_meta.items()] == doc_metas
+
+
+def test_empty():
+    loaded_docs_meta = DocsMeta()
+    loaded_docs_meta.load(io.BytesIO(dump_docs_meta(DocsMeta())))
+    assert len(loaded_docs_meta) == 0
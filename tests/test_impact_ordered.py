@@ -0,0 +1,86 @@
+# Import built-in libraries
+import json
+
+# Import third-party libraries
+import numpy as np
+import pytest
+
+# Import src files
+from ImpactOrderedList import ImpactOrderedList
+from conftest import IndexBuilder, queries, search
+
+
+@pytest.fixture(scope='module')
+def impact_indexes(tmp_path_factory, scenes):
+    builder = IndexBuilder(tmp_path_factory.mktemp('impact_ordered'))
+    yield {impact_bits: builder.build(scenes, 'index_' + str(impact_bits), impact_ordered=1, impact_bits=impact_bits)
+           for impact_bits in (8, 16)}
+    builder.close()
+
+
+def test_impact_ordered_list_round_trip():
+    impact_ordered_list = ImpactOrderedList()
+    for impact, doc_ids in ((255, [3, 7]), (1, [0, 200, 1 << 20]), (-1, [5]), (-255, [1, 2, 4])):
+        impact_ordered_list.add_segment(impact, np.array(doc_ids, dtype=np.int64))
+    list_binary, size_in_bytes = impact_ordered_list.postings_to_bytearray()
+    assert size_in_bytes == len(list_binary)
+    read_list = ImpactOrderedList()
+    read_list.bytearray_to_segments(memoryview(bytes(list_binary)))
+    assert [read_list.get_impact(i) for i in range(4)] == [255, 1, -1, -255]
+    assert [read_list.get_doc_ids(i).tolist() for i in range(4)] == [[3, 7], [0, 200, 1 << 20], [5], [1, 2, 4]]
+    assert read_list.get_df() == 9
+
+
+def test_score_matches_doc(impact_indexes):
+    # With 16 bits the quantization error is too small to change the ranking of these queries
+    indexer, inverted_index = impact_indexes[16]
+    for query_string in queries:
+        doc_results = search(indexer, inverted_index, query_string, mode='doc', retrieval_model='bm25', count=10)
+        score_results = search(indexer, inverted_index, query_string, mode='score', retrieval_model='bm25', count=10)
+        assert [scene_id for scene_id, score in score_results] == [scene_id for scene_id, score in doc_results]
+        assert [score for scene_id, score in score_results] == pytest.approx([score for scene_id, score in doc_results], abs=1e-3)
+
+
+def test_score_approximates_doc(impact_indexes):
+    indexer, inverted_index = impact_indexes[8]
+    # Queries of common terms only, whose scores are all negative, rank like the others
+    for query_string in queries + ['term0 term1 term2 term3', 'term0 term0 term1']:
+        doc_results = search(indexer, inverted_index, query_string, mode='doc', retrieval_model='bm25', count=10)
+        score_results = search(indexer, inverted_index, query_string, mode='score', retrieval_model='bm25', count=10)
+        assert len(score_results) == 10
+        assert len({scene_id for scene_id, score in doc_results} & {scene_id for scene_id, score in score_results}) >= 8
+
+
+def test_postings_budget(impact_indexes):
+    indexer, inverted_index = impact_indexes[8]
+    query_string = 'term0 term50 term99'
+    full_results = search(indexer, inverted_index, query_string, mode='score', retrieval_model='bm25', count=1000)
+    assert len(full_results) == len(set(np.concatenate([inverted_index.get_inverted_list(query_term).get_doc_ids()
+                                                        for query_term in query_string.split()]).tolist()))
+    # Only the documents of the postings processed before the budget runs out are ranked
+    assert len(search(indexer, inverted_index, query_string, mode='score', retrieval_model='bm25', count=1000, postings_budget=50)) <= 50
+    assert search(indexer, inverted_index, query_string, mode='score', retrieval_model='bm25', count=1000,
+                  postings_budget=10 ** 6) == full_results
+
+
+def test_other_models_are_rejected(impact_indexes):
+    indexer, inverted_index = impact_indexes[8]
+    with pytest.raises(ValueError):
+        search(indexer, inverted_index, 'term17', mode='score', retrieval_model='dirichlet')
+
+
+def test_index_of_another_format_is_rebuilt(index_builder, scenes):
+    indexer, inverted_index = index_builder.build(scenes[:100], impact_ordered=1)
+    results = search(indexer, inverted_index, 'term0 term1', mode='score', retrieval_model='bm25')
+    impact_meta_file_path = inverted_index.get_impact_ordered_dir() + '/' + indexer.config.impact_meta_file_name
+    with open(impact_meta_file_path, 'r') as f:
+        impact_meta = json.load(f)
+    del impact_meta['version']
+    with open(impact_meta_file_path, 'w') as f:
+        json.dump(impact_meta, f)
+    indexer, inverted_index = index_builder.load(impact_ordered=1)
+    assert inverted_index.get_impact_meta()['version'] == ImpactOrderedList.format_version
+    assert search(indexer, inverted_index, 'term0 term1', mode='score', retrieval_model='bm25') == results
+    # Without a memory map the lists are read from the file held open with the lookup table
+    indexer, inverted_index = index_builder.load(impact_ordered=1, mmap_lists=0)
+    assert search(indexer, inverted_index, 'term0 term1', mode='score', retrieval_model='bm25') == results
@@ -0,0 +1,115 @@
+# Import built-in libraries
+import random
+
+# Import third-party libraries
+import numpy as np
+import pytest
+
+# Import src files
+from InvertedList import InvertedList
+
+
+def make_inverted_list(number_of_postings, seed=0):
+    rng = random.Random(seed)
+    inverted_list = InvertedList()
+    doc_id = 0
+    for _ in range(number_of_postings):
+        doc_id += rng.randint(1, 5)
+        inverted_list.add_posting_with_positions(doc_id, sorted(rng.sample(range(500), rng.randint(1, 6))))
+    return inverted_list
+
+
+def read_back(inverted_list, compressed, doc_lengths=None):
+    inverted_list_binary, size_in_bytes = inverted_list.postings_to_bytearray(compressed, doc_lengths=doc_lengths)
+    read_list = InvertedList()
+    read_list.bytearray_to_postings(memoryview(bytes(inverted_list_binary)), compressed, inverted_list.get_df())
+    return read_list
+
+
+@pytest.mark.parametrize('compressed', [0, 1])
+@pytest.mark.parametrize('number_of_postings', [0, 1, 128, 129, 300])
+def test_round_trip(compressed, number_of_postings):
+    inverted_list = make_inverted_list(number_of_postings)
+    read_list = read_back(inverted_list, compressed)
+    assert read_list.get_df() == inverted_list.get_df()
+    assert read_list.get_doc_ids().tolist() == inverted_list.get_doc_ids().tolist()
+    assert read_list.get_dtfs().tolist() == inverted_list.get_dtfs().tolist()
+    assert read_list.get_positions().tolist() == inverted_list.get_positions().tolist()
+    assert len(read_list.get_blocks()) == (number_of_postings + InvertedList.block_size - 1) // InvertedList.block_size
+
+
+def test_skip_table():
+    inverted_list = make_inverted_list(300)
+    doc_ids = inverted_list.get_doc_ids()
+    dtfs = inverted_list.get_dtfs()
+    doc_lengths = np.arange(int(doc_ids[-1]) + 1, dtype=np.int64)[::-1] + 10
+    blocks = read_back(inverted_list, 1, doc_lengths).get_blocks()
+    for block_index, block_start in enumerate(range(0, 300, InvertedList.block_size)):
+        block_end = min(block_start + InvertedList.block_size, 300)
+        block = blocks[block_index]
+        # Every statistic of a block is read from the skip table without decoding the block
+        assert block.get_last_doc_id() == doc_ids[block_end - 1]
+        assert block.get_number_of_postings() == block_end - block_start
+        assert block.get_max_dtf() == dtfs[block_start: block_end].max()
+        assert block.get_min_doc_length(None) == doc_lengths[doc_ids[block_start: block_end]].min()
+
+
+def test_cursor_skip_to():
+    inverted_list = make_inverted_list(300)
+    doc_ids = inverted_list.get_doc_ids().tolist()
+    cursor = read_back(inverted_list, 1).get_cursor()
+    # Skipping to a doc_id before the current posting doesn't move the cursor
+    cursor.skip_to(0)
+    assert cursor.get_doc_id() == doc_ids[0]
+    # Skipping to the last doc_id of a block stays in the block, the next doc_id moves to the next block
+    cursor.skip_to(doc_ids[127])
+    assert cursor.get_doc_id() == doc_ids[127]
+    cursor.skip_to(doc_ids[127] + 1)
+    assert cursor.get_doc_id() == doc_ids[128]
+    cursor.skip_to(doc_ids[50])
+    assert cursor.get_doc_id() == doc_ids[128]
+    # A doc_id missing from the list moves to the next one in the list
+    missing = [doc_id for doc_id in range(doc_ids[200], doc_ids[-1]) if doc_id not in doc_ids][0]
+    cursor.skip_to(missing)
+    assert cursor.get_doc_id() == min(doc_id for doc_id in doc_ids if doc_id > missing)
+    cursor.skip_to(doc_ids[-1])
+    assert cursor.get_doc_id() == doc_ids[-1]
+    assert cursor.get_dtf() == inverted_list.get_dtfs()[-1]
+    cursor.skip_to(doc_ids[-1] + 1)
+    assert not cursor.has_more()
+    assert cursor.get_doc_id() == -1
+    assert cursor.get_dtf() == 0
+    assert cursor.get_term_positions() == []
+
+
+def test_cursor_skips_blocks_without_decoding_them():
+    inverted_list = make_inverted_list(600)
+    doc_ids = inverted_list.get_doc_ids().tolist()
+    read_list = read_back(inverted_list, 1)
+    cursor = read_list.get_cursor()
+    cursor.skip_to(doc_ids[550])
+    assert cursor.get_doc_id() == doc_ids[550]
+    assert cursor.get_term_positions() == inverted_list.get_positions()[
+        inverted_list.get_position_offsets()[550]: inverted_list.get_position_offsets()[551]].tolist()
+    # Only the first block and the block of the doc_id were decoded
+    decoded = [block_index for block_index, block in enumerate(read_list.get_blocks()) if block._doc_ids is not None]
+    assert decoded == [0, 4]
+    assert cursor.get_block_of(doc_ids[-1]) is read_list.get_blocks()[-1]
+    assert cursor.get_block_of(doc_ids[-1] + 1) is None
+
+
+def test_cursor_on_an_empty_list():
+    cursor = read_back(InvertedList(), 1).get_cursor()
+    assert not cursor.has_more()
+    cursor.skip_to(10)
+    assert cursor.get_doc_id() == -1
+
+
+def test_cursor_visits_every_posting():
+    inverted_list = make_inverted_list(300)
+    cursor = read_back(inverted_list, 1).get_cursor()
+    doc_ids = []
+    while cursor.has_more():
+        doc_ids.append(cursor.get_doc_id())
+        cursor.move_to_next()
+    assert doc_ids == inverted_list.get_doc_ids().tolist()
@@ -0,0 +1,74 @@
+# Import built-in libraries
+import struct
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from LookupTable import LookupTable
+
+
+def load_lookup_table(path, lookup_table):
+    with open(path, 'wb') as f:
+        LookupTable().dump(lookup_table, f)
+    loaded_lookup_table = LookupTable()
+    with open(path, 'rb') as f:
+        loaded_lookup_table.load(f)
+    return loaded_lookup_table
+
+
+def test_round_trip(tmp_path):
+    lookup_table = {
+        'zebra': {'df': 1, 'ctf': 2, 'weight': 0.5},
+        'apple': {'df': 3, 'ctf': 1 << 40, 'weight': -1.25},
+        'émigré': {'df': 2, 'ctf': 7, 'weight': 3.0}
+    }
+    loaded_lookup_table = load_lookup_table(str(tmp_path / 'lookup_table'), lookup_table)
+    assert len(loaded_lookup_table) == 3
+    assert list(loaded_lookup_table.keys()) == sorted(lookup_table)
+    assert dict(loaded_lookup_table.items()) == lookup_table
+    assert loaded_lookup_table.get_ctf('apple') == 1 << 40
+    assert type(loaded_lookup_table.get_df('zebra')) is int
+    assert loaded_lookup_table['émigré'] == lookup_table['émigré']
+    assert 'banana' not in loaded_lookup_table
+    with pytest.raises(KeyError):
+        loaded_lookup_table.get_df('banana')
+    loaded_lookup_table.close()
+
+
+def test_column_type_comes_from_every_value(tmp_path):
+    # The first term holds an integer weight, a later one a float
+    lookup_table = {'apple': {'df': 1, 'weight': 2}, 'zebra': {'df': 4, 'weight': 0.75}}
+    loaded_lookup_table = load_lookup_table(str(tmp_path / 'lookup_table'), lookup_table)
+    assert loaded_lookup_table['zebra'] == {'df': 4, 'weight': 0.75}
+    assert loaded_lookup_table['apple'] == {'df': 1, 'weight': 2.0}
+    assert type(loaded_lookup_table['apple']['weight']) is float
+    assert type(loaded_lookup_table['apple']['df']) is int
+    loaded_lookup_table.close()
+
+
+def test_columns_are_little_endian(tmp_path):
+    path = str(tmp_path / 'lookup_table')
+    loaded_lookup_table = load_lookup_table(path, {'term': {'df': 0x0102030405060708}})
+    loaded_lookup_table.close()
+    with open(path, 'rb') as f:
+        binary = f.read()
+    # The column follows the header and the column description
+    position = struct.calcsize(LookupTable.format_header) + struct.calcsize(LookupTable.format_column)
+    assert binary[position: position + 8] == struct.pack('<q', 0x0102030405060708)
+
+
+def test_empty_table(tmp_path):
+    loaded_lookup_table = load_lookup_table(str(tmp_path / 'lookup_table'), {})
+    assert len(loaded_lookup_table) == 0
+    assert 'term' not in loaded_lookup_table
+    loaded_lookup_table.close()
+
+
+def test_rejects_other_formats(tmp_path):
+    path = str(tmp_path / 'lookup_table')
+    with open(path, 'w') as f:
+        f.write('{"term": {"df": 1}}' + ' ' * 64)
+    with open(path, 'rb') as f:
+        with pytest.raises(ValueError):
+            LookupTable().load(f)
@@ -0,0 +1,72 @@
+# Import third-party libraries
+import pytest
+
+# Import src files
+from InferenceNetwork import InferenceNetwork
+from conftest import IndexBuilder, queries, search
+
+retrieval_models = ['raw_counts', 'vector_space', 'bm25', 'jelinek_mercer', 'dirichlet']
+# Queries without repeated terms, which every mode scores the same way
+distinct_queries = [query_string for query_string in queries if len(set(query_string.split())) == len(query_string.split())]
+
+
+@pytest.fixture(scope='module')
+def index(tmp_path_factory, scenes):
+    builder = IndexBuilder(tmp_path_factory.mktemp('query'))
+    yield builder.build(scenes)
+    builder.close()
+
+
+@pytest.mark.parametrize('retrieval_model', retrieval_models)
+def test_vectorized_term_matches_term(index, retrieval_model):
+    indexer, inverted_index = index
+    for query_string in queries:
+        assert (search(indexer, inverted_index, query_string, mode='vectorized_term', retrieval_model=retrieval_model, count=20)
+                == search(indexer, inverted_index, query_string, mode='term', retrieval_model=retrieval_model, count=20))
+
+
+@pytest.mark.parametrize('retrieval_model', ['raw_counts', 'vector_space', 'bm25'])
+def test_doc_matches_term(index, retrieval_model):
+    # Terms absent from a document score 0 with these models, so both modes score the same documents
+    indexer, inverted_index = index
+    for query_string in distinct_queries:
+        assert (search(indexer, inverted_index, query_string, mode='doc', retrieval_model=retrieval_model, count=20)
+                == search(indexer, inverted_index, query_string, mode='term', retrieval_model=retrieval_model, count=20))
+
+
+@pytest.mark.parametrize('mode', ['wand', 'block_max_wand'])
+@pytest.mark.parametrize('retrieval_model', ['vector_space', 'bm25', 'dirichlet'])
+@pytest.mark.parametrize('count', [1, 10, 50])
+def test_wand_matches_doc(index, mode, retrieval_model, count):
+    indexer, inverted_index = index
+    for query_string in queries:
+        assert (search(indexer, inverted_index, query_string, mode=mode, retrieval_model=retrieval_model, count=count)
+                == search(indexer, inverted_index, query_string, mode='doc', retrieval_model=retrieval_model, count=count))
+
+
+def get_inference_network_results(inverted_index, query_string, operator, count):
+    documents = InferenceNetwork(inverted_index, query_string, operator).get_documents(count)
+    return [(document['sceneId'], round(document['score'], 9)) for document in documents]
+
+
+@pytest.mark.parametrize('operator', ['And', 'Sum', 'Or', 'Max'])
+@pytest.mark.parametrize('count', [1, 10, 50])
+def test_max_score_matches_exhaustive_inference_network(index, monkeypatch, operator, count):
+    indexer, inverted_index = index
+    results = [get_inference_network_results(inverted_index, query_string, operator, count) for query_string in queries]
+    monkeypatch.setattr(InferenceNetwork, 'can_use_max_score', lambda self, count: False)
+    assert [get_inference_network_results(inverted_index, query_string, operator, count) for query_string in queries] == results
+
+
+@pytest.mark.parametrize('retrieval_model', retrieval_models)
+def test_conjunctive_modes_agree(index, retrieval_model):
+    indexer, inverted_index = index
+    for query_string in queries + ['term3 term3 term3', 'term0 term250 term250']:
+        conj_term_results = search(indexer, inverted_index, query_string, mode='conj_term', retrieval_model=retrieval_model, count=20)
+        assert conj_term_results == search(indexer, inverted_index, query_string, mode='conj_doc', retrieval_model=retrieval_model, count=20)
+        # Every document returned holds every query term
+        for scene_id, score in conj_term_results:
+            doc_id = [doc_id for doc_id in range(inverted_index.get_total_docs())
+                      if inverted_index.get_doc_meta(doc_id)['sceneId'] == scene_id][0]
+            for query_term in query_string.split():
+                assert doc_id in inverted_index.get_inverted_list(query_term).get_doc_ids()
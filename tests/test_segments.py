@@ -0,0 +1,41 @@
+# Import built-in libraries
+import os
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from conftest import queries, search, make_scenes
+
+
+def get_results(indexer, inverted_index):
+    return [search(indexer, inverted_index, query_string, count=20) for query_string in queries]
+
+
+@pytest.mark.parametrize('mmap_lists', [0, 1])
+def test_reader_keeps_its_lists_when_the_index_is_rebuilt(index_builder, scenes, mmap_lists):
+    index_builder.build(scenes)
+    indexer, inverted_index = index_builder.load(mmap_lists=mmap_lists)
+    results = get_results(indexer, inverted_index)
+    # Drop the collection stats so the next build rebuilds the index in place with other scenes
+    os.remove(indexer.root_dir + '/' + indexer.config.index_dir + '/' + indexer.config.collection_stats_file_name)
+    rebuilt_indexer, rebuilt_inverted_index = index_builder.build(make_scenes(300, seed=1))
+    assert get_results(rebuilt_indexer, rebuilt_inverted_index) != results
+    assert get_results(indexer, inverted_index) == results
+
+
+def test_reader_survives_a_background_merge(index_builder, scenes):
+    index_builder.build(scenes[:200], merge_factor=2)
+    indexer, inverted_index = index_builder.load()
+    index_builder.track(indexer.add_documents(scenes[200:300], 1))
+    indexer.wait_for_merge()
+    reader_indexer, reader = index_builder.load()
+    results = get_results(reader_indexer, reader)
+    # Adding another segment merges the main index and both segments while the reader is open
+    index_builder.track(indexer.add_documents(scenes[300:], 1))
+    indexer.wait_for_merge()
+    assert get_results(reader_indexer, reader) == results
+    merged_indexer, merged_inverted_index = index_builder.load()
+    assert not merged_inverted_index.get_segments()
+    full_indexer, full_inverted_index = index_builder.build(scenes, 'full')
+    assert get_results(merged_indexer, merged_inverted_index) == get_results(full_indexer, full_inverted_index)
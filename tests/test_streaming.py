@@ -0,0 +1,68 @@
+# Import built-in libraries
+import io
+import gzip
+import json
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from Indexer import Indexer
+import utils
+
+# Strings with escapes, quotes, brackets and non-ASCII characters, which chunk boundaries fall inside of
+tricky_scenes = [
+    {'playId': 'a', 'sceneId': 'a:0', 'sceneNum': 0, 'text': 'say \\"hi\\" [to] {them}, \\\\ \\u00e9 \\ud83d\\ude00 é'},
+    {'playId': 'b', 'sceneId': 'b:1', 'sceneNum': 1, 'text': '', 'extra': [1, 2.5, -3e2, None, True, False]},
+    {'playId': 'ü', 'sceneId': 'ü:2', 'sceneNum': 12345678901, 'text': ']]],,,' * 20}
+]
+
+
+def get_json_text(scenes):
+    # The corpus is an array in an object, with whitespace between items
+    return '{"corpus" : [\n  ' + ',\n  '.join(json.dumps(scene, ensure_ascii=False) for scene in scenes) + '\n]\n}\n'
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 5, 7, 64, 1 << 16])
+def test_stream_json_array(chunk_size):
+    text = get_json_text(tricky_scenes)
+    scenes = list(utils.stream_json_array(io.StringIO(text), chunk_size))
+    assert scenes == json.loads(text)['corpus']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 64])
+def test_stream_json_array_of_numbers(chunk_size):
+    # A number cut by a chunk boundary is read whole
+    text = '[123456789, 1.5e10 ,-42,0 ]'
+    assert list(utils.stream_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize('text', ['', '{}', '[]', '{"corpus": []}', '  [ \n ]'])
+def test_stream_empty_json_array(text):
+    assert list(utils.stream_json_array(io.StringIO(text), 2)) == []
+
+
+@pytest.mark.parametrize('text', ['[{"a": 1}, {"a": ', '[1x]', '[1'])
+def test_stream_malformed_json_array(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(utils.stream_json_array(io.StringIO(text), 4))
+
+
+def test_stream_json_lines():
+    text = '\n'.join(json.dumps(scene) for scene in tricky_scenes) + '\n\n  \n'
+    assert list(utils.stream_json_lines(io.StringIO(text))) == [json.loads(line) for line in text.split('\n') if line.strip()]
+
+
+@pytest.mark.parametrize('data_file_name', ['scenes.json', 'scenes.json.gz', 'scenes.jsonl', 'scenes.jsonl.gz'])
+def test_stream_data(index_builder, scenes, data_file_name):
+    scenes = scenes[:50] + tricky_scenes
+    if '.jsonl' in data_file_name:
+        text = ''.join(json.dumps(scene) + '\n' for scene in scenes)
+    else:
+        text = get_json_text(scenes)
+    data_file_path = str(index_builder.tmp_path) + '/data/' + data_file_name
+    opener = gzip.open if data_file_name.endswith('.gz') else open
+    with opener(data_file_path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    indexer = Indexer(index_builder.get_args('index', data_file_name=data_file_name))
+    assert list(indexer.stream_data()) == scenes
@@ -0,0 +1,74 @@
+# Import built-in libraries
+import math
+import random
+
+# Import third-party libraries
+import pytest
+
+# Import src files
+from TopKCollector import TopKCollector
+
+
+def get_reference_top_documents(scores, count):
+    # The sort term-at-a-time retrieval ranked documents with before the collector
+    return sorted(scores.items(), key=lambda x: (x[1], x[0]), reverse=True)[:count]
+
+
+@pytest.mark.parametrize('count', [0, 1, 3, 10, 100, 1000])
+def test_top_documents_match_sort(count):
+    rng = random.Random(count)
+    # Few distinct scores, so most documents tie with others
+    scores = {doc_id: rng.choice([0.5, 1.0, 1.5, 2.0]) for doc_id in rng.sample(range(10000), 500)}
+    top_k_collector = TopKCollector(count)
+    top_k_collector.add_all(scores)
+    assert top_k_collector.get_top_documents() == get_reference_top_documents(scores, count)
+
+
+def test_ties_are_broken_by_doc_id():
+    top_k_collector = TopKCollector(2)
+    for doc_id in (5, 1, 9, 3):
+        top_k_collector.add(doc_id, 1.0)
+    # Of equal scores the highest doc_ids are kept, whatever order they are added in
+    assert top_k_collector.get_top_documents() == [(9, 1.0), (5, 1.0)]
+    # A document scoring the threshold enters only if its doc_id ranks above the last one
+    top_k_collector.add(4, 1.0)
+    assert top_k_collector.get_top_documents() == [(9, 1.0), (5, 1.0)]
+    top_k_collector.add(7, 1.0)
+    assert top_k_collector.get_top_documents() == [(9, 1.0), (7, 1.0)]
+
+
+def test_threshold_before_count_is_reached():
+    top_k_collector = TopKCollector(3)
+    for doc_id, score in ((0, 5.0), (1, -2.0)):
+        top_k_collector.add(doc_id, score)
+        # No document can be left out until count documents are collected
+        assert not top_k_collector.is_full()
+        assert top_k_collector.get_threshold() == -math.inf
+        assert top_k_collector.may_enter(-1e300)
+    top_k_collector.add(2, 3.0)
+    assert top_k_collector.is_full()
+    assert top_k_collector.get_threshold() == -2.0
+    assert not top_k_collector.may_enter(-3.0)
+    top_k_collector.add(3, 4.0)
+    assert top_k_collector.get_threshold() == 3.0
+
+
+def test_count_of_zero():
+    top_k_collector = TopKCollector(0)
+    assert top_k_collector.is_full()
+    assert top_k_collector.get_threshold() == math.inf
+    assert not top_k_collector.may_enter(1e300)
+    top_k_collector.add(0, 1.0)
+    assert top_k_collector.get_top_documents() == []
+
+
+@pytest.mark.parametrize('threshold', [0.0, 1.0, -1.0, 12345.678, -0.001])
+def test_bound_within_epsilon_of_threshold(threshold):
+    top_k_collector = TopKCollector(1)
+    top_k_collector.add(0, threshold)
+    epsilon = 1e-9 * (1 + abs(threshold))
+    assert top_k_collector.may_enter(threshold)
+    # A bound summed in another order may come out slightly below the score it bounds
+    assert top_k_collector.may_enter(threshold - epsilon / 2)
+    assert top_k_collector.may_enter(math.nextafter(threshold, -math.inf))
+    assert not top_k_collector.may_enter(threshold - 2 * epsilon)
@@ -0,0 +1,126 @@
+# Import built-in libraries
+import random
+from bisect import bisect_left
+
+# Import third-party libraries
+import numpy as np
+import pytest
+
+# Import src files
+import utils
+
+
+@pytest.mark.parametrize('low', [0, 1, 5, 99, 100, 150])
+def test_gallop_matches_bisect(low):
+    values = list(range(0, 300, 3))
+    for value in range(-1, 302):
+        expected = max(bisect_left(values, value), low) if low < len(values) else low
+        assert utils.gallop(values, value, low) == expected
+
+
+def test_gallop_edge_cases():
+    assert utils.gallop([], 5) == 0
+    assert utils.gallop([7], 7) == 0
+    assert utils.gallop([7], 8) == 1
+    # Values before low are taken to be smaller, a value at or before low returns low
+    assert utils.gallop([1, 2, 3, 4], 1, 2) == 2
+    # Runs of equal values return the first one from low
+    assert utils.gallop([1, 2, 2, 2, 2, 2, 2, 2, 3], 2) == 1
+    # Steps which overshoot the end are clipped to it
+    assert utils.gallop(list(range(10)), 9, 0) == 9
+    assert utils.gallop(list(range(10)), 100, 3) == 10
+
+
+def vbyte_decode_reference(list_buffer):
+    num_list = []
+    num = 0
+    shift = 0
+    for byte in list_buffer:
+        num |= (byte & 0x7f) << shift
+        shift += 7
+        if byte & 0x80:
+            num_list.append(num)
+            num = 0
+            shift = 0
+    return num_list
+
+
+def delta_decode_reference(delta_encoded_positions, lengths):
+    positions = []
+    start = 0
+    for run_length in lengths:
+        position = 0
+        for delta in delta_encoded_positions[start: start + run_length]:
+            position += delta
+            positions.append(position)
+        start += run_length
+    return positions
+
+
+rng = random.Random(0)
+num_lists = {
+    'empty': [],
+    'one': [5],
+    'small': [rng.randint(0, 127) for _ in range(300)],
+    'mixed': [rng.choice([rng.randint(0, 127), rng.randint(128, 1 << 14), rng.randint(1 << 14, 1 << 40)]) for _ in range(300)],
+    # The bytes of a number of several bytes end exactly at the end of the buffer
+    'multi_byte_last': [1] * 200 + [1 << 35]
+}
+
+
+@pytest.fixture(params=['loop', 'bulk'])
+def decode_path(request, monkeypatch):
+    # A threshold of 0 decodes every input, empty ones too, with array operations
+    if request.param == 'bulk':
+        monkeypatch.setattr(utils, 'bulk_decode_threshold', 0)
+    return request.param
+
+
+@pytest.mark.parametrize('list_name', sorted(num_lists))
+def test_vbyte_decode_matches_reference(decode_path, list_name):
+    list_buffer, size_in_bytes = utils.vbyte_encode(num_lists[list_name])
+    assert vbyte_decode_reference(list_buffer) == num_lists[list_name]
+    assert utils.vbyte_decode(memoryview(bytes(list_buffer))).tolist() == num_lists[list_name]
+
+
+@pytest.mark.parametrize('list_name', sorted(num_lists))
+def test_vbyte_decode_count_matches_reference(list_name):
+    num_list = num_lists[list_name]
+    list_buffer = bytes(utils.vbyte_encode(num_list)[0])
+    for count in sorted({0, 1, len(num_list) // 2, len(num_list)}):
+        if count > len(num_list):
+            continue
+        decoded, position = utils.vbyte_decode_count(list_buffer, count)
+        assert decoded == num_list[:count]
+        assert position == len(utils.vbyte_encode(num_list[:count])[0])
+        # The rest of the buffer decodes from the returned position
+        assert vbyte_decode_reference(list_buffer[position:]) == num_list[count:]
+
+
+def test_vbyte_decode_count_stops_at_the_count():
+    list_buffer = bytes(utils.vbyte_encode([300, 1 << 20, 7])[0])
+    assert utils.vbyte_decode_count(list_buffer, 2) == ([300, 1 << 20], 5)
+    assert utils.vbyte_decode_count(list_buffer, 1, 2) == ([1 << 20], 5)
+    with pytest.raises(IndexError):
+        utils.vbyte_decode_count(list_buffer, 4)
+
+
+@pytest.mark.parametrize('number_of_runs', [0, 1, 5, 60])
+def test_delta_decode_matches_reference(decode_path, number_of_runs):
+    run_rng = random.Random(number_of_runs)
+    lengths = [run_rng.randint(0, 8) for _ in range(number_of_runs)]
+    delta_encoded_positions = []
+    for run_length in lengths:
+        delta_encoded_positions += utils.delta_encode(sorted(run_rng.sample(range(1000), run_length)))
+    assert (utils.delta_decode(delta_encoded_positions, lengths).tolist()
+            == delta_decode_reference(delta_encoded_positions, lengths))
+    assert (utils.delta_decode(np.array(delta_encoded_positions, dtype=np.int64), lengths).tolist()
+            == delta_decode_reference(delta_encoded_positions, lengths))
+    assert (utils.delta_decode(delta_encoded_positions).tolist()
+            == delta_decode_reference(delta_encoded_positions, [len(delta_encoded_positions)]))
+
+
+def test_delta_decode_with_empty_runs(decode_path):
+    assert utils.delta_decode([], []).tolist() == []
+    assert utils.delta_decode([], [0, 0]).tolist() == []
+    assert utils.delta_decode([2, 3, 4], [0, 2, 0, 1, 0]).tolist() == [2, 5, 4]